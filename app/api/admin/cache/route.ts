@@ -0,0 +1,40 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getServerSession } from 'next-auth'
+import { authOptions } from '@/lib/auth'
+import { queryOne } from '@/lib/mysql'
+import { getCacheStats } from '@/lib/redis'
+
+export const dynamic = 'force-dynamic'
+
+// GET - počítadla cache této instance (L1 v paměti, L2 Redis)
+export async function GET(request: NextRequest) {
+  try {
+    const session = await getServerSession(authOptions)
+    
+    if (!(session?.user as any)?.id) {
+      return NextResponse.json(
+        { message: 'Neautorizovaný přístup' },
+        { status: 401 }
+      )
+    }
+
+    // Kontrola admin statusu
+    const userId = (session!.user as any).id
+    const user = await queryOne('SELECT isAdmin FROM users WHERE id = ?', [userId])
+    
+    if (!user || !user.isAdmin) {
+      return NextResponse.json(
+        { message: 'Nemáte oprávnění' },
+        { status: 403 }
+      )
+    }
+
+    return NextResponse.json(getCacheStats())
+  } catch (error) {
+    console.error('Error loading cache stats:', error)
+    return NextResponse.json(
+      { message: 'Chyba při načítání statistik cache' },
+      { status: 500 }
+    )
+  }
+}
@@ -2,9 +2,16 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne } from '@/lib/mysql'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 
 export const dynamic = 'force-dynamic'
 
+// Naposledy aktivní první; id jako poslední klíč pro keyset stránkování (?limit=&cursor=)
+const adminConversationKeys: KeysetKey[] = [
+  { column: 'c.updatedAt', field: 'updatedAt', direction: 'DESC' },
+  { column: 'c.id', field: 'id', direction: 'DESC' },
+]
+
 export async function GET(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -27,8 +34,17 @@ export async function GET(request: NextRequest) {
       )
     }
 
+    const pageRequest = readKeysetParams(new URL(request.url).searchParams, adminConversationKeys)
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', conversations: [] },
+        { status: 400 }
+      )
+    }
+    const keyset = pageRequest.values ? keysetWhere(adminConversationKeys, pageRequest.values) : null
+
     // Načtení všech konverzací s informacemi o účastnících a produktu
-    const conversations = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         c.id,
         c.productId,
@@ -49,10 +65,20 @@ export async function GET(request: NextRequest) {
       LEFT JOIN products p ON c.productId = p.id
       LEFT JOIN users u1 ON c.participant1Id = u1.id
       LEFT JOIN users u2 ON c.participant2Id = u2.id
-      ORDER BY c.updatedAt DESC
-    `, [])
+      ${keyset ? `WHERE ${keyset.sql}` : ''}
+      ORDER BY ${keysetOrderBy(adminConversationKeys)}
+      ${pageRequest.enabled ? 'LIMIT ?' : ''}
+    `, [...(keyset?.params || []), ...(pageRequest.enabled ? [pageRequest.limit + 1] : [])])
+
+    if (!pageRequest.enabled) {
+      return NextResponse.json({ conversations: rows })
+    }
 
-    return NextResponse.json({ conversations })
+    const page = toKeysetPage(rows, pageRequest.limit, adminConversationKeys)
+    return NextResponse.json({
+      conversations: page.items,
+      pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+    })
   } catch (error) {
     console.error('Error loading conversations:', error)
     return NextResponse.json(
@@ -2,9 +2,16 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne } from '@/lib/mysql'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 
 export const dynamic = 'force-dynamic'
 
+// Nejnovější první; id jako poslední klíč pro keyset stránkování (?limit=&cursor=)
+const adminProductKeys: KeysetKey[] = [
+  { column: 'p.createdAt', field: 'createdAt', direction: 'DESC' },
+  { column: 'p.id', field: 'id', direction: 'DESC' },
+]
+
 export async function GET(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -27,18 +34,37 @@ export async function GET(request: NextRequest) {
       )
     }
 
+    const pageRequest = readKeysetParams(new URL(request.url).searchParams, adminProductKeys)
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', products: [] },
+        { status: 400 }
+      )
+    }
+    const keyset = pageRequest.values ? keysetWhere(adminProductKeys, pageRequest.values) : null
+
     // Načtení všech inzerátů s informacemi o uživatelích
-    const products = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         p.id, p.title, p.description, p.price, p.mainImage, p.images,
         p.location, p.isActive, p.isSold, p.userId, p.createdAt,
         u.name as userName
       FROM products p
       LEFT JOIN users u ON p.userId = u.id
-      ORDER BY p.createdAt DESC
-    `, [])
+      ${keyset ? `WHERE ${keyset.sql}` : ''}
+      ORDER BY ${keysetOrderBy(adminProductKeys)}
+      ${pageRequest.enabled ? 'LIMIT ?' : ''}
+    `, [...(keyset?.params || []), ...(pageRequest.enabled ? [pageRequest.limit + 1] : [])])
+
+    if (!pageRequest.enabled) {
+      return NextResponse.json({ products: rows })
+    }
 
-    return NextResponse.json({ products })
+    const page = toKeysetPage(rows, pageRequest.limit, adminProductKeys)
+    return NextResponse.json({
+      products: page.items,
+      pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+    })
   } catch (error) {
     console.error('Error loading products:', error)
     return NextResponse.json(
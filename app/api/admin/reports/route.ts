@@ -2,9 +2,16 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne } from '@/lib/mysql'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 
 export const dynamic = 'force-dynamic'
 
+// Nejnovější první; id jako poslední klíč pro keyset stránkování (?limit=&cursor=)
+const adminReportKeys: KeysetKey[] = [
+  { column: 'r.createdAt', field: 'createdAt', direction: 'DESC' },
+  { column: 'r.id', field: 'id', direction: 'DESC' },
+]
+
 export async function GET(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -28,6 +35,15 @@ export async function GET(request: NextRequest) {
     }
 
     const { searchParams } = new URL(request.url)
+    const pageRequest = readKeysetParams(searchParams, adminReportKeys)
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', reports: [] },
+        { status: 400 }
+      )
+    }
+    const keyset = pageRequest.values ? keysetWhere(adminReportKeys, pageRequest.values) : null
+
     const status = searchParams.get('status') || 'all'
 
     // Sestavení WHERE podmínek
@@ -39,12 +55,17 @@ export async function GET(request: NextRequest) {
       params.push(status)
     }
 
+    if (keyset) {
+      whereConditions.push(keyset.sql)
+      params.push(...keyset.params)
+    }
+
     const whereClause = whereConditions.length > 0 
       ? `WHERE ${whereConditions.join(' AND ')}` 
       : ''
 
     // Načtení všech nahlášení s informacemi o uživateli
-    const reports = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         r.id,
         r.type,
@@ -61,10 +82,19 @@ export async function GET(request: NextRequest) {
       FROM reports r
       LEFT JOIN users u ON r.userId = u.id
       ${whereClause}
-      ORDER BY r.createdAt DESC
-    `, params)
+      ORDER BY ${keysetOrderBy(adminReportKeys)}
+      ${pageRequest.enabled ? 'LIMIT ?' : ''}
+    `, pageRequest.enabled ? [...params, pageRequest.limit + 1] : params)
+
+    if (!pageRequest.enabled) {
+      return NextResponse.json({ reports: rows })
+    }
 
-    return NextResponse.json({ reports })
+    const page = toKeysetPage(rows, pageRequest.limit, adminReportKeys)
+    return NextResponse.json({
+      reports: page.items,
+      pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+    })
   } catch (error) {
     console.error('Error loading reports:', error)
     return NextResponse.json(
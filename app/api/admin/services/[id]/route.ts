@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { queryOne, update, query } from '@/lib/mysql'
+import { invalidateServiceCache } from '@/lib/services'
 
 export const dynamic = 'force-dynamic'
 
@@ -40,6 +41,7 @@ export async function PATCH(
       'UPDATE services SET isActive = ?, updatedAt = NOW() WHERE id = ?',
       [isActive ? 1 : 0, serviceId]
     )
+    await invalidateServiceCache(serviceId)
 
     return NextResponse.json({ 
       message: `Servis byl ${isActive ? 'schválen' : 'zamítnut'}` 
@@ -83,6 +85,7 @@ export async function DELETE(
 
     // Smazání servisu (cascade smaže i recenze)
     await query('DELETE FROM services WHERE id = ?', [serviceId])
+    await invalidateServiceCache(serviceId)
 
     return NextResponse.json({ message: 'Servis byl smazán' })
   } catch (error) {
@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { queryOne, query, update } from '@/lib/mysql'
+import { invalidateServiceCache } from '@/lib/services'
 
 export const dynamic = 'force-dynamic'
 
@@ -66,6 +67,7 @@ export async function DELETE(
       'UPDATE services SET rating = ?, reviewCount = ?, updatedAt = NOW() WHERE id = ?',
       [newRating, newReviewCount, review.serviceId]
     )
+    await invalidateServiceCache(review.serviceId)
 
     return NextResponse.json({ message: 'Recenze byla smazána' })
   } catch (error) {
@@ -2,9 +2,16 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne } from '@/lib/mysql'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 
 export const dynamic = 'force-dynamic'
 
+// Nejnovější první; id jako poslední klíč pro keyset stránkování (?limit=&cursor=)
+const adminServiceKeys: KeysetKey[] = [
+  { column: 's.createdAt', field: 'createdAt', direction: 'DESC' },
+  { column: 's.id', field: 'id', direction: 'DESC' },
+]
+
 export async function GET(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -27,8 +34,17 @@ export async function GET(request: NextRequest) {
       )
     }
 
+    const pageRequest = readKeysetParams(new URL(request.url).searchParams, adminServiceKeys)
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', services: [] },
+        { status: 400 }
+      )
+    }
+    const keyset = pageRequest.values ? keysetWhere(adminServiceKeys, pageRequest.values) : null
+
     // Načtení všech servisů s informacemi o uživateli
-    const services = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         s.id,
         s.name,
@@ -48,11 +64,20 @@ export async function GET(request: NextRequest) {
         u.email as userEmail
       FROM services s
       LEFT JOIN users u ON s.userId = u.id
-      ORDER BY s.createdAt DESC
-    `, [])
+      ${keyset ? `WHERE ${keyset.sql}` : ''}
+      ORDER BY ${keysetOrderBy(adminServiceKeys)}
+      ${pageRequest.enabled ? 'LIMIT ?' : ''}
+    `, [...(keyset?.params || []), ...(pageRequest.enabled ? [pageRequest.limit + 1] : [])])
+
+    const page = pageRequest.enabled
+      ? toKeysetPage(rows, pageRequest.limit, adminServiceKeys)
+      : { items: rows, nextCursor: null, hasNext: false }
 
     return NextResponse.json({ 
-      services: (services as any[]).map((s) => ({
+      ...(pageRequest.enabled
+        ? { pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext } }
+        : {}),
+      services: page.items.map((s) => ({
         ...s,
         additionalImages: s.additionalImages ? JSON.parse(s.additionalImages) : null,
         rating: s.rating !== null && s.rating !== undefined ? parseFloat(String(s.rating)) : undefined,
@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { queryOne } from '@/lib/mysql'
+import { readMarketplaceStats, startStatsReconciler } from '@/lib/stats'
 
 export const dynamic = 'force-dynamic'
 
@@ -27,17 +28,15 @@ export async function GET(request: NextRequest) {
       )
     }
 
-    // Načtení statistik
-    const totalUsers = await queryOne('SELECT COUNT(*) as count FROM users', [])
-    const activeProducts = await queryOne('SELECT COUNT(*) as count FROM products WHERE isActive = 1 AND isSold = 0', [])
-    const totalProducts = await queryOne('SELECT COUNT(*) as count FROM products', [])
-    const pendingReports = await queryOne('SELECT COUNT(*) as count FROM products WHERE isActive = 0', [])
+    // Načtení statistik (průběžně udržované čítače, viz lib/stats.ts)
+    startStatsReconciler()
+    const stats = await readMarketplaceStats()
 
     return NextResponse.json({
-      totalUsers: totalUsers?.count || 0,
-      activeProducts: activeProducts?.count || 0,
-      totalProducts: totalProducts?.count || 0,
-      pendingReports: pendingReports?.count || 0
+      totalUsers: stats.usersTotal,
+      activeProducts: stats.productsActive,
+      totalProducts: stats.productsTotal,
+      pendingReports: stats.productsInactive
     })
   } catch (error) {
     console.error('Error loading admin stats:', error)
@@ -2,9 +2,16 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne } from '@/lib/mysql'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 
 export const dynamic = 'force-dynamic'
 
+// Nejnovější první; id jako poslední klíč pro keyset stránkování (?limit=&cursor=)
+const adminUserKeys: KeysetKey[] = [
+  { column: 'createdAt', field: 'createdAt', direction: 'DESC' },
+  { column: 'id', field: 'id', direction: 'DESC' },
+]
+
 export async function GET(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -27,16 +34,35 @@ export async function GET(request: NextRequest) {
       )
     }
 
+    const pageRequest = readKeysetParams(new URL(request.url).searchParams, adminUserKeys)
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', users: [] },
+        { status: 400 }
+      )
+    }
+    const keyset = pageRequest.values ? keysetWhere(adminUserKeys, pageRequest.values) : null
+
     // Načtení všech uživatelů
-    const users = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         id, name, email, image, isVerified, isBanned, isAdmin, reputation, 
         createdAt, lastLoginAt
       FROM users 
-      ORDER BY createdAt DESC
-    `, [])
+      ${keyset ? `WHERE ${keyset.sql}` : ''}
+      ORDER BY ${keysetOrderBy(adminUserKeys)}
+      ${pageRequest.enabled ? 'LIMIT ?' : ''}
+    `, [...(keyset?.params || []), ...(pageRequest.enabled ? [pageRequest.limit + 1] : [])])
+
+    if (!pageRequest.enabled) {
+      return NextResponse.json({ users: rows })
+    }
 
-    return NextResponse.json({ users })
+    const page = toKeysetPage(rows, pageRequest.limit, adminUserKeys)
+    return NextResponse.json({
+      users: page.items,
+      pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+    })
   } catch (error) {
     console.error('Error loading users:', error)
     return NextResponse.json(
@@ -2,10 +2,33 @@ import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, queryOne, insert, update } from '@/lib/mysql'
+import { invalidateUserStats } from '@/lib/user-stats'
+import { KeysetKey, decodeCursor, keysetOrderBy, keysetWhere, parseLimit, toKeysetPage } from '@/lib/pagination'
 
 // Force dynamic rendering - requires session data
 export const dynamic = 'force-dynamic'
 
+// Inbox: naposledy aktivní první. lastMessageAt je u konverzace bez zpráv čas založení, takže nová
+// konverzace je nahoře a řadicí klíč nikdy není NULL. id jako poslední klíč pro keyset stránkování.
+const inboxKeys: KeysetKey[] = [
+  { column: 'lastMessageAt', field: 'inboxAt', direction: 'DESC' },
+  { column: 'id', field: 'id', direction: 'DESC' },
+]
+
+// lastMessage je zkrácený náhled poslední zprávy, inboxAt řadicí klíč (pro cursor)
+const inboxSelect = `SELECT c.id, c.productId, c.participant1Id, c.participant2Id, c.createdAt, c.updatedAt,
+         c.closedById, c.closeReason, c.closedAt, c.hiddenForUserId,
+         c.lastMessageId,
+         c.lastMessagePreview as lastMessage,
+         CASE WHEN c.lastMessageId IS NULL THEN NULL ELSE c.lastMessageAt END as lastMessageAt,
+         c.lastMessageAt as inboxAt,
+         p.title as productTitle, p.mainImage as productImage,
+         u.id as otherUserId, u.name as otherUserName, u.image as otherUserImage, u.nickname as otherUserNickname`
+
+// Druhý účastník se připojuje jedním JOINem podle aktuálního uživatele (parametr)
+const inboxJoins = `JOIN products p ON c.productId = p.id
+       JOIN users u ON u.id = CASE WHEN c.participant1Id = ? THEN c.participant2Id ELSE c.participant1Id END`
+
 export async function POST(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -75,8 +98,8 @@ export async function POST(request: NextRequest) {
     
     try {
       await insert(
-        `INSERT INTO conversations (id, productId, participant1Id, participant2Id, createdAt, updatedAt)
-         VALUES (?, ?, ?, ?, NOW(), NOW())`,
+        `INSERT INTO conversations (id, productId, participant1Id, participant2Id, createdAt, updatedAt, lastMessageAt)
+         VALUES (?, ?, ?, ?, NOW(3), NOW(3), NOW(3))`,
         [conversationId, productId, participant1Id, participant2Id]
       )
     } catch (insertError: any) {
@@ -100,6 +123,9 @@ export async function POST(request: NextRequest) {
       throw insertError
     }
 
+    // Počet konverzací je ve statistikách obou účastníků
+    await invalidateUserStats(participant1Id, participant2Id)
+
     return NextResponse.json(
       { 
         message: 'Konverzace byla vytvořena',
@@ -129,42 +155,67 @@ export async function GET(request: NextRequest) {
     }
 
     const userId = (session!.user as any).id
+    const { searchParams } = new URL(request.url)
+
+    // Jedna konverzace (např. právě otevřená z inzerátu, která není na první stránce inboxu)
+    const conversationId = searchParams.get('conversationId')
+    if (conversationId) {
+      const conversations = await query(
+        `${inboxSelect}
+         FROM conversations c
+         ${inboxJoins}
+         WHERE c.id = ? AND (c.participant1Id = ? OR c.participant2Id = ?)`,
+        [userId, conversationId, userId, userId]
+      )
+      return NextResponse.json(
+        { conversations },
+        { status: 200 }
+      )
+    }
 
-    // Načtení konverzací uživatele - skrýt uzavřené konverzace pokud je uzavřel aktuální uživatel, nebo pokud je skryl
-    const conversations = await query(
-      `SELECT c.*, 
-              p.title as productTitle, p.mainImage as productImage,
-              CASE 
-                WHEN c.participant1Id = ? THEN u2.id
-                ELSE u1.id
-              END as otherUserId,
-              CASE 
-                WHEN c.participant1Id = ? THEN u2.name
-                ELSE u1.name
-              END as otherUserName,
-              CASE 
-                WHEN c.participant1Id = ? THEN u2.image
-                ELSE u1.image
-              END as otherUserImage,
-              CASE 
-                WHEN c.participant1Id = ? THEN u2.nickname
-                ELSE u1.nickname
-              END as otherUserNickname,
-              (SELECT content FROM messages WHERE conversationId = c.id ORDER BY createdAt DESC LIMIT 1) as lastMessage,
-              (SELECT createdAt FROM messages WHERE conversationId = c.id ORDER BY createdAt DESC LIMIT 1) as lastMessageAt
-       FROM conversations c
-       JOIN products p ON c.productId = p.id
-       JOIN users u1 ON c.participant1Id = u1.id
-       JOIN users u2 ON c.participant2Id = u2.id
-       WHERE (c.participant1Id = ? OR c.participant2Id = ?)
-         AND (c.closedById IS NULL OR c.closedById != ?)
-         AND (c.hiddenForUserId IS NULL OR c.hiddenForUserId != ?)
-       ORDER BY lastMessageAt DESC, c.updatedAt DESC`,
-      [userId, userId, userId, userId, userId, userId, userId, userId]
+    const cursor = searchParams.get('cursor')
+    const cursorValues = decodeCursor(cursor, inboxKeys)
+    if (cursor && !cursorValues) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', conversations: [] },
+        { status: 400 }
+      )
+    }
+    const limit = parseLimit(searchParams.get('limit'), 30)
+    const keyset = cursorValues ? keysetWhere(inboxKeys, cursorValues) : null
+
+    // Inbox čte jen denormalizované sloupce konverzace (lastMessage* udržuje POST /api/messages).
+    // Uživatel může být participant1 i participant2 - každá větev je jeden rozsahový průchod
+    // indexem (participantXId, lastMessageAt, id) s LIMIT, sloučí se a ořízne na stránku.
+    // Skryté konverzace a konverzace uzavřené aktuálním uživatelem se nezobrazují.
+    const inboxBranch = (participantColumn: string) => `(
+      SELECT id, lastMessageAt FROM conversations
+      WHERE ${participantColumn} = ?
+        AND (closedById IS NULL OR closedById != ?)
+        AND (hiddenForUserId IS NULL OR hiddenForUserId != ?)
+        ${keyset ? `AND ${keyset.sql}` : ''}
+      ORDER BY ${keysetOrderBy(inboxKeys)}
+      LIMIT ?
+    )`
+    const branchParams = [userId, userId, userId, ...(keyset?.params || []), limit + 1]
+
+    const rows = await query<any[]>(
+      `${inboxSelect}
+       FROM (${inboxBranch('participant1Id')} UNION ALL ${inboxBranch('participant2Id')}) inbox
+       JOIN conversations c ON c.id = inbox.id
+       ${inboxJoins}
+       ORDER BY inbox.lastMessageAt DESC, inbox.id DESC
+       LIMIT ?`,
+      [...branchParams, ...branchParams, userId, limit + 1]
     )
 
+    const page = toKeysetPage(rows, limit, inboxKeys)
+
     return NextResponse.json(
-      { conversations },
+      {
+        conversations: page.items,
+        pagination: { limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+      },
       { status: 200 }
     )
 
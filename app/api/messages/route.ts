@@ -1,11 +1,28 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { query, queryOne, insert, update } from '@/lib/mysql'
+import { query, queryOne } from '@/lib/mysql'
+import { invalidateUserStats } from '@/lib/user-stats'
+import { publishMessage } from '@/lib/realtime'
+import { sendMessage } from '@/lib/messages'
+import { KeysetKey, decodeCursor, keysetOrderBy, keysetWhere, parseLimit, toKeysetPage } from '@/lib/pagination'
 
 // Force dynamic rendering - requires session data
 export const dynamic = 'force-dynamic'
 
+// Historie zpráv od nejnovější; nextCursor vede ke starším zprávám
+const messageHistoryKeys: KeysetKey[] = [
+  { column: 'm.createdAt', field: 'createdAt', direction: 'DESC' },
+  { column: 'm.id', field: 'id', direction: 'DESC' },
+]
+
+const MESSAGES_PAGE_SIZE = 50
+
+const messageSelect = `SELECT m.*,
+         u.name as senderName, u.image as senderImage, u.nickname as senderNickname
+       FROM messages m
+       JOIN users u ON m.senderId = u.id`
+
 export async function POST(request: NextRequest) {
   try {
     const session = await getServerSession(authOptions)
@@ -29,59 +46,40 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    // Zkontrolovat, jestli konverzace existuje a uživatel je účastník
-    const conversation = await queryOne(
-      `SELECT id, participant1Id, participant2Id FROM conversations WHERE id = ?`,
-      [conversationId]
-    )
+    // Ověření účastníků, uložení zprávy a poslední zprávy konverzace v jedné transakci (lib/messages.ts)
+    const result = await sendMessage({ conversationId, senderId: userId, receiverId, content })
 
-    if (!conversation) {
+    if (result.status === 'not_found') {
       return NextResponse.json(
         { message: 'Konverzace nebyla nalezena' },
         { status: 404 }
       )
     }
 
-    // Ověřit, že uživatel je účastník konverzace
-    if (conversation.participant1Id !== userId && conversation.participant2Id !== userId) {
+    if (result.status === 'forbidden') {
       return NextResponse.json(
         { message: 'Nemáte oprávnění odesílat zprávy do této konverzace' },
         { status: 403 }
       )
     }
 
-    // Ověřit, že receiverId je druhý účastník
-    const otherParticipant = conversation.participant1Id === userId 
-      ? conversation.participant2Id 
-      : conversation.participant1Id
-
-    if (receiverId !== otherParticipant) {
+    if (result.status === 'invalid_receiver') {
       return NextResponse.json(
         { message: 'Neplatný příjemce zprávy' },
         { status: 400 }
       )
     }
 
-    // Vytvořit zprávu
-    const messageId = `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
-    
-    await insert(
-      `INSERT INTO messages (id, content, conversationId, senderId, receiverId, createdAt)
-       VALUES (?, ?, ?, ?, ?, NOW())`,
-      [messageId, content, conversationId, userId, receiverId]
-    )
+    const message = result.message
 
-    // Aktualizovat updatedAt konverzace
-    await update(
-      `UPDATE conversations SET updatedAt = NOW() WHERE id = ?`,
-      [conversationId]
-    )
+    // Odeslané / přijaté zprávy a poslední aktivita ve statistikách obou stran
+    await invalidateUserStats(userId, receiverId)
 
-    // Načíst vytvořenou zprávu
-    const message = await queryOne(
-      `SELECT * FROM messages WHERE id = ?`,
-      [messageId]
-    )
+    // Doručení otevřeným streamům obou účastníků (GET /api/messages/stream) - zpráva je už uložená,
+    // selhání doručení se jen zaloguje (klient si ji dočte při dalším připojení)
+    await publishMessage(message).catch((error) => {
+      console.error('Error publishing message:', error)
+    })
 
     return NextResponse.json(
       { 
@@ -142,19 +140,70 @@ export async function GET(request: NextRequest) {
       )
     }
 
-    // Načíst zprávy
-    const messages = await query(
-      `SELECT m.*, 
-              u.name as senderName, u.image as senderImage, u.nickname as senderNickname
-       FROM messages m
-       JOIN users u ON m.senderId = u.id
-       WHERE m.conversationId = ?
-       ORDER BY m.createdAt ASC`,
-      [conversationId]
+    const limit = parseLimit(searchParams.get('limit'), MESSAGES_PAGE_SIZE)
+
+    // Režim since: jen zprávy novější než poslední zpráva, kterou klient má (obnovení = jen rozdíl)
+    const since = searchParams.get('since')
+    if (since) {
+      const sinceMessage = await queryOne(
+        'SELECT id, createdAt FROM messages WHERE id = ? AND conversationId = ?',
+        [since, conversationId]
+      )
+      if (!sinceMessage) {
+        return NextResponse.json(
+          { message: 'Neplatný parametr since', messages: [] },
+          { status: 400 }
+        )
+      }
+
+      const newerKeys = messageHistoryKeys.map((key) => ({ ...key, direction: 'ASC' as const }))
+      const newer = keysetWhere(newerKeys, [sinceMessage.createdAt, sinceMessage.id])
+      const rows = await query<any[]>(
+        `${messageSelect}
+         WHERE m.conversationId = ? AND ${newer.sql}
+         ORDER BY ${keysetOrderBy(newerKeys)}
+         LIMIT ?`,
+        [conversationId, ...newer.params, limit + 1]
+      )
+
+      // Víc než limit nových zpráv - klient pokračuje se since = id poslední vrácené
+      return NextResponse.json(
+        {
+          messages: rows.slice(0, limit),
+          pagination: { limit, hasNext: rows.length > limit },
+        },
+        { status: 200 }
+      )
+    }
+
+    // Historie: nejnovějších N zpráv, cursor stránkuje do minulosti po (createdAt, id).
+    // Rozsahový průchod idx_messages_conversationId_createdAt odzadu (id je v indexu jako primární klíč).
+    const cursor = searchParams.get('cursor')
+    const cursorValues = decodeCursor(cursor, messageHistoryKeys)
+    if (cursor && !cursorValues) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', messages: [] },
+        { status: 400 }
+      )
+    }
+    const older = cursorValues ? keysetWhere(messageHistoryKeys, cursorValues) : null
+
+    const rows = await query<any[]>(
+      `${messageSelect}
+       WHERE m.conversationId = ? ${older ? `AND ${older.sql}` : ''}
+       ORDER BY ${keysetOrderBy(messageHistoryKeys)}
+       LIMIT ?`,
+      [conversationId, ...(older?.params || []), limit + 1]
     )
 
+    // Stránka se načítá od nejnovější, klient zprávy zobrazuje od nejstarší
+    const page = toKeysetPage(rows, limit, messageHistoryKeys)
+
     return NextResponse.json(
-      { messages },
+      {
+        messages: page.items.reverse(),
+        pagination: { limit, nextCursor: page.nextCursor, hasNext: page.hasNext },
+      },
       { status: 200 }
     )
 
@@ -0,0 +1,159 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getServerSession } from 'next-auth'
+import { authOptions } from '@/lib/auth'
+import { query } from '@/lib/mysql'
+import { RealtimeEvent, RealtimeMessage, subscribeToUserEvents } from '@/lib/realtime'
+
+// Force dynamic rendering - requires session data
+export const dynamic = 'force-dynamic'
+export const runtime = 'nodejs'
+
+const HEARTBEAT_MS = Number(process.env.MESSAGES_STREAM_HEARTBEAT_MS || 25000)
+// Víc zmeškaných zpráv se nedočítá - klient dostane resync a načte inbox a otevřenou konverzaci znovu
+const CATCH_UP_LIMIT = 200
+
+// Server-Sent Events: nové zprávy uživatele (příchozí i odeslané z jiných karet).
+// Id události je id zprávy - EventSource ho po výpadku pošle v hlavičce Last-Event-ID a stream
+// doručí zprávy, které mezitím přišly. Při prvním připojení lze poslat ?lastEventId=.
+export async function GET(request: NextRequest) {
+  const session = await getServerSession(authOptions)
+
+  if (!(session?.user as any)?.id) {
+    return NextResponse.json(
+      { message: 'Neautorizovaný přístup' },
+      { status: 401 }
+    )
+  }
+
+  const userId = (session!.user as any).id as string
+  const lastEventId =
+    request.headers.get('last-event-id') || new URL(request.url).searchParams.get('lastEventId')
+
+  const encoder = new TextEncoder()
+  let close = () => {}
+
+  const stream = new ReadableStream<Uint8Array>({
+    start(controller) {
+      let closed = false
+      let cursor = lastEventId || null
+      // Během dočítání z DB se živé zprávy jen řadí do fronty, aby nepředběhly starší
+      let catchingUp = false
+      let pending: RealtimeEvent[] = []
+      const sentIds = new Set<string>()
+
+      const write = (chunk: string) => {
+        if (closed) return
+        try {
+          controller.enqueue(encoder.encode(chunk))
+        } catch {
+          close()
+        }
+      }
+
+      const sendMessage = (message: RealtimeMessage) => {
+        if (sentIds.has(message.id)) return
+        sentIds.add(message.id)
+        // Stačí pamatovat poslední zprávy - starší se znovu neobjeví
+        if (sentIds.size > CATCH_UP_LIMIT * 2) sentIds.delete(sentIds.values().next().value as string)
+        cursor = message.id
+        write(`id: ${message.id}\nevent: message\ndata: ${JSON.stringify(message)}\n\n`)
+      }
+
+      const catchUp = async () => {
+        if (!cursor) return
+        catchingUp = true
+        try {
+          const missed = await loadMessagesAfter(userId, cursor)
+          if (missed === null) {
+            write('event: resync\ndata: {}\n\n')
+          } else {
+            missed.forEach(sendMessage)
+          }
+        } catch (error) {
+          console.error('[Realtime] Dočtení zmeškaných zpráv selhalo:', error)
+          write('event: resync\ndata: {}\n\n')
+        } finally {
+          catchingUp = false
+          const queued = pending
+          pending = []
+          queued.forEach(handleEvent)
+        }
+      }
+
+      const handleEvent = (event: RealtimeEvent) => {
+        if (catchingUp) {
+          pending.push(event)
+          return
+        }
+        if (event.type === 'message') {
+          sendMessage(event.message)
+        } else if (cursor) {
+          catchUp()
+        } else {
+          // Bez známé poslední zprávy se nedá dočíst - klient načte data znovu sám
+          write('event: resync\ndata: {}\n\n')
+        }
+      }
+
+      const unsubscribe = subscribeToUserEvents(userId, handleEvent)
+      const heartbeat = setInterval(() => write(': ping\n\n'), HEARTBEAT_MS)
+
+      close = () => {
+        if (closed) return
+        closed = true
+        clearInterval(heartbeat)
+        unsubscribe()
+        try {
+          controller.close()
+        } catch {
+          // Stream už je zavřený
+        }
+      }
+      request.signal.addEventListener('abort', close)
+
+      // Klient se po výpadku připojí znovu sám za 3 s
+      write('retry: 3000\n\n')
+      catchUp()
+    },
+    cancel() {
+      close()
+    },
+  })
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no',
+    },
+  })
+}
+
+// Zprávy uživatele novější než zpráva lastMessageId, nejstarší první. null = nelze navázat
+// (neznámé id nebo příliš mnoho zmeškaných zpráv).
+async function loadMessagesAfter(userId: string, lastMessageId: string) {
+  const rows = await query<any[]>(
+    `SELECT m.id, m.content, m.conversationId, m.senderId, m.receiverId, m.createdAt
+     FROM messages seen
+     JOIN messages m
+       ON m.createdAt > seen.createdAt OR (m.createdAt = seen.createdAt AND m.id > seen.id)
+     WHERE seen.id = ?
+       AND (seen.senderId = ? OR seen.receiverId = ?)
+       AND (m.senderId = ? OR m.receiverId = ?)
+     ORDER BY m.createdAt ASC, m.id ASC
+     LIMIT ?`,
+    [lastMessageId, userId, userId, userId, userId, CATCH_UP_LIMIT + 1]
+  )
+
+  if (!Array.isArray(rows) || rows.length > CATCH_UP_LIMIT) return null
+  if (rows.length === 0) {
+    // Rozlišit "žádné nové zprávy" od neznámého id
+    const known = await query<any[]>(
+      'SELECT id FROM messages WHERE id = ? AND (senderId = ? OR receiverId = ?)',
+      [lastMessageId, userId, userId]
+    )
+    return Array.isArray(known) && known.length > 0 ? [] : null
+  }
+  return rows as RealtimeMessage[]
+}
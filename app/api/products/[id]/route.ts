@@ -1,7 +1,12 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { query, update, queryOne } from '@/lib/mysql'
+import { query, queryOne, withTransaction } from '@/lib/mysql'
+import { invalidateProductCaches, getProductDetail } from '@/lib/products'
+import { recordProductView, visitorFingerprint } from '@/lib/views'
+import { applyProductStatsChange, lockProductStatsRow } from '@/lib/stats'
+import { parseImageVariants } from '@/lib/images'
+import { setObjectRefs } from '@/lib/stored-objects'
 
 // Force dynamic rendering - requires session data
 export const dynamic = 'force-dynamic'
@@ -22,7 +27,7 @@ export async function DELETE(request: NextRequest, { params }: { params: { id: s
 
     // Kontrola, zda inzerát patří uživateli
     const product = await queryOne(
-      'SELECT id, userId FROM products WHERE id = ?',
+      'SELECT id, userId, listingType, category FROM products WHERE id = ?',
       [productId]
     )
 
@@ -40,11 +45,14 @@ export async function DELETE(request: NextRequest, { params }: { params: { id: s
       )
     }
 
-    // Smazání inzerátu
-    const affectedRows = await update(
-      'DELETE FROM products WHERE id = ?',
-      [productId]
-    )
+    // Smazání inzerátu a úprava statistik tržiště v jedné transakci
+    const affectedRows = await withTransaction(async (connection) => {
+      const before = await lockProductStatsRow(connection, productId)
+      if (!before) return 0
+      const [result] = await connection.execute('DELETE FROM products WHERE id = ?', [productId])
+      await applyProductStatsChange(connection, before, null)
+      return (result as any).affectedRows as number
+    })
 
     if (affectedRows === 0) {
       return NextResponse.json(
@@ -53,6 +61,8 @@ export async function DELETE(request: NextRequest, { params }: { params: { id: s
       )
     }
 
+    await invalidateProductCaches(product)
+
     return NextResponse.json({
       message: 'Inzerát byl úspěšně smazán'
     })
@@ -83,7 +93,7 @@ export async function PATCH(request: NextRequest, { params }: { params: { id: st
 
     // Kontrola, zda inzerát patří uživateli
     const product = await queryOne(
-      'SELECT id, userId FROM products WHERE id = ?',
+      'SELECT id, userId, listingType, category FROM products WHERE id = ?',
       [productId]
     )
 
@@ -161,7 +171,20 @@ export async function PATCH(request: NextRequest, { params }: { params: { id: st
 
     if (updateFields.length > 1) { // Více než jen updatedAt
       const sql = `UPDATE products SET ${updateFields.join(', ')} WHERE id = ?`
-      const affectedRows = await update(sql, updateValues)
+      // Prodej / deaktivace mění statistiky tržiště - stav před a po změně ve stejné transakci
+      const affectedRows = await withTransaction(async (connection) => {
+        const before = await lockProductStatsRow(connection, productId)
+        if (!before) return 0
+        const [result] = await connection.execute(sql, updateValues)
+        await applyProductStatsChange(connection, before, await lockProductStatsRow(connection, productId))
+        if (body.images) {
+          // Obrázky, na které inzerát přestal odkazovat, uklidí garbage collector (lib/stored-objects.ts)
+          const [rows] = await connection.execute('SELECT mainImage FROM products WHERE id = ?', [productId])
+          const mainImage = (rows as any[])[0]?.mainImage
+          await setObjectRefs(connection, 'product', productId, [mainImage].concat(body.images))
+        }
+        return (result as any).affectedRows as number
+      })
 
       if (affectedRows === 0) {
         return NextResponse.json(
@@ -170,6 +193,12 @@ export async function PATCH(request: NextRequest, { params }: { params: { id: st
         )
       }
 
+      // Při změně kategorie zastarají výpisy staré i nové kategorie
+      await invalidateProductCaches(
+        product,
+        ...(body.category ? [{ listingType: product.listingType, category: body.category }] : [])
+      )
+
       return NextResponse.json({
         message: 'Inzerát byl úspěšně aktualizován'
       })
@@ -195,14 +224,10 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
     const { searchParams } = new URL(request.url)
     const trackView = searchParams.get('trackView') === 'true'
 
-    // Načtení inzerátu
-    const product = await queryOne(
-      `SELECT p.*, u.id as userId, u.name as userName, u.email as userEmail, u.phone as userPhone, u.image as userImage, u.nickname as userNickname, u.isVerified as userIsVerified, u.reputation as userReputation, COALESCE(p.viewCount, 0) as viewCount
-       FROM products p 
-       JOIN users u ON p.userId = u.id 
-       WHERE p.id = ?`,
-      [productId]
-    )
+    // Načtení inzerátu (read-through cache, neexistující id se cachují krátce jako záporný záznam)
+    const cachedProduct = await getProductDetail(productId)
+    // Kopie - cachovaný objekt sdílí souběžné požadavky
+    const product = cachedProduct ? { ...cachedProduct } : null
 
     if (!product) {
       return NextResponse.json(
@@ -211,19 +236,15 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
       )
     }
 
-    // Increment viewCount pokud je požadováno
-    // Ochrana proti spamu je na klientovi (localStorage s časovým limitem)
+    // Zobrazení se deduplikuje na serveru (návštěvník + okno) a do DB se zapisuje dávkově (lib/views.ts),
+    // detail tak nikdy nečeká na zápis. Vrácený počet zahrnuje i zatím nezapsaná zobrazení.
     if (trackView) {
       try {
-        await update(
-          `UPDATE products SET viewCount = COALESCE(viewCount, 0) + 1 WHERE id = ?`,
-          [productId]
-        )
-        // Aktualizovat viewCount v response
-        product.viewCount = (parseInt(product.viewCount) || 0) + 1
+        const pendingViews = await recordProductView(productId, visitorFingerprint(request.headers))
+        product.viewCount = (parseInt(product.viewCount) || 0) + pendingViews
       } catch (error) {
-        console.error('Error incrementing view count:', error)
-        // Pokračovat i když increment selže
+        console.error('Error recording product view:', error)
+        // Pokračovat i když záznam selže
       }
     }
 
@@ -247,6 +268,7 @@ export async function GET(request: NextRequest, { params }: { params: { id: stri
       category: categoryMap[product.category] || product.category,
       condition: conditionMap[product.condition] || product.condition,
       images: product.images ? JSON.parse(product.images) : [],
+      imageVariants: parseImageVariants(product.imageVariants),
       price: parseFloat(product.price),
       viewCount: parseInt(product.viewCount) || 0
     }
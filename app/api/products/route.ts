@@ -1,15 +1,30 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { query, queryOne, insert } from '@/lib/mysql'
+import { query, queryOne, withTransaction } from '@/lib/mysql'
 import { sanitizeInput } from '@/lib/utils'
-import { storeFile } from '@/lib/storage'
-import { getCache, setCache, invalidateCacheByPrefix } from '@/lib/redis'
+import { StoredFile, storeFiles } from '@/lib/storage'
+import { VariantSource, parseImageVariants, recordImageVariants, storedImageSource } from '@/lib/images'
+import { MultipartUpload, UPLOAD_MAX_FILE_SIZE, UPLOAD_MAX_TOTAL_SIZE, UploadError, parseMultipartUpload } from '@/lib/multipart'
+import { commitUploadSession } from '@/lib/upload-sessions'
+import { setObjectRefs } from '@/lib/stored-objects'
+import { getCacheGeneration, getOrRevalidate } from '@/lib/redis'
+import { ProductListQuery, buildProductListQuery, productListSql, productCountSql, invalidateProductCaches } from '@/lib/products'
+import { toKeysetPage, cachedCount } from '@/lib/pagination'
+import { applyProductStatsChange, lockProductStatsRow } from '@/lib/stats'
+import { createHash } from 'crypto'
 
 // Force dynamic rendering - requires session data for POST
 export const dynamic = 'force-dynamic'
 
+const PRODUCT_UPLOAD_LIMITS = {
+  files: { images: 10 },
+  maxFileSize: UPLOAD_MAX_FILE_SIZE,
+  maxTotalSize: UPLOAD_MAX_TOTAL_SIZE,
+}
+
 export async function POST(request: NextRequest) {
+  let upload: MultipartUpload | null = null
   try {
     const session = await getServerSession(authOptions)
     
@@ -20,7 +35,9 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    const formData = await request.formData()
+    // Formulář se čte streamem (lib/multipart.ts) - obrázky jdou rovnou do dočasných souborů,
+    // příliš velký soubor nebo ne-obrázek ukončí čtení hned
+    const formData = (upload = await parseMultipartUpload(request, PRODUCT_UPLOAD_LIMITS))
     
     // Získání dat z formuláře
     const title = sanitizeInput(formData.get('title') as string || '')
@@ -98,165 +115,49 @@ export async function POST(request: NextRequest) {
 
     // Zpracování obrázků - hlavní obrázek se označí podle indexu z frontendu
     const images: string[] = []
-    const imageFiles = formData.getAll('images') as File[]
     const mainImageIndexRaw = formData.get('mainImageIndex')
     const mainImageIndex = mainImageIndexRaw ? parseInt(mainImageIndexRaw as string, 10) : 0 // Default: první obrázek
+    const uploadSessionId = formData.get('uploadSessionId')
+    // Velikost, počet a typ (magic bytes) hlídal už parser; prázdné části přeskočil, index zachoval
+    const uploads = formData.files('images')
     
-    if (imageFiles.length === 0) {
+    if (uploads.length === 0 && !uploadSessionId) {
       return NextResponse.json(
         { message: 'Přidejte alespoň jeden obrázek' },
         { status: 400 }
       )
     }
 
-    if (imageFiles.length > 10) {
-      return NextResponse.json(
-        { message: 'Maximálně 10 obrázků' },
-        { status: 400 }
+    let storedUploads: Array<{ index: number; file: StoredFile | null }>
+    if (uploadSessionId) {
+      // Obrázky nahrál prohlížeč přímo do úložiště (POST /api/uploads) - tady se jen ověří a zaevidují
+      storedUploads = await commitUploadSession(uploadSessionId, (session!.user as any).id, 'products')
+    } else {
+      // Soubory se nahrávají souběžně (omezeně, lib/storage.ts) a streamují se rovnou do cíle.
+      // Adresa je hash obsahu - fotka, která už v úložišti je, se znovu nenahrává.
+      // Výsledky drží původní pořadí; soubor, který se nepodařilo uložit, se vynechá.
+      const storedFiles = await storeFiles(
+        uploads.map((file) => ({
+          source: file,
+          originalName: `image_${file.index}${file.extension}`,
+        })),
+        'products'
       )
+      storedUploads = uploads.map((upload, position) => ({ index: upload.index, file: storedFiles[position] }))
     }
 
-    // Validace obrázků (s fallbackem dle přípony pro případy, kdy chybí MIME type)
-    const allowedExtensions = new Set(['.png', '.jpg', '.jpeg', '.webp', '.gif', '.heic', '.heif'])
-    const allowedMimes = new Set(['image/png','image/jpeg','image/webp','image/gif','image/jpg','image/x-png','image/pjpeg','image/heic','image/heif','image/heic-sequence','image/heif-sequence','application/octet-stream','binary/octet-stream'])
-    const getExtension = (name: string): string => {
-      const m = (name || '').toLowerCase().match(/\.[a-z0-9]+$/)
-      return m ? m[0] : ''
-    }
-    const sniffImage = async (f: File): Promise<boolean> => {
-      try {
-        const arr = new Uint8Array(await f.arrayBuffer())
-        if (arr.length >= 8) {
-          // PNG signature
-          const isPng = arr[0] === 0x89 && arr[1] === 0x50 && arr[2] === 0x4E && arr[3] === 0x47 && arr[4] === 0x0D && arr[5] === 0x0A && arr[6] === 0x1A && arr[7] === 0x0A
-          if (isPng) return true
-        }
-        if (arr.length >= 3) {
-          // JPEG signature FF D8 FF
-          const isJpeg = arr[0] === 0xFF && arr[1] === 0xD8 && arr[2] === 0xFF
-          if (isJpeg) return true
-        }
-        if (arr.length >= 12) {
-          // WEBP: RIFF....WEBP
-          const riff = String.fromCharCode(arr[0],arr[1],arr[2],arr[3])
-          const webp = String.fromCharCode(arr[8],arr[9],arr[10],arr[11])
-          const isWebp = riff === 'RIFF' && webp === 'WEBP'
-          if (isWebp) return true
-        }
-        if (arr.length >= 6) {
-          // GIF87a or GIF89a
-          const hdr = String.fromCharCode(arr[0],arr[1],arr[2],arr[3],arr[4],arr[5])
-          if (hdr === 'GIF87a' || hdr === 'GIF89a') return true
-        }
-        if (arr.length >= 12) {
-          // HEIC/HEIF brand in ftyp box
-          const brand = String.fromCharCode(arr[8],arr[9],arr[10],arr[11])
-          if (brand.toLowerCase().includes('heic') || brand.toLowerCase().includes('heif')) return true
-        }
-      } catch {}
-      return false
-    }
-    const isImageFile = async (f: File): Promise<boolean> => {
-      if (f.type && (f.type.startsWith('image/') || allowedMimes.has(f.type))) return true
-      const ext = getExtension(f.name || '')
-      if (allowedExtensions.has(ext)) return true
-      return await sniffImage(f)
-    }
-
-    for (const file of imageFiles) {
-      if (file.size > 5 * 1024 * 1024) { // 5MB limit
-        return NextResponse.json(
-          { message: `Obrázek ${file.name} je příliš velký (max 5MB)` },
-          { status: 400 }
-        )
-      }
-      
-      if (!(await isImageFile(file))) {
-        return NextResponse.json(
-          { message: `Soubor ${file.name} není obrázek (podporované: PNG, JPG, JPEG, WEBP, GIF)` },
-          { status: 400 }
-        )
-      }
-    }
+    // Validace indexu hlavního obrázku - defaultně první (index 0)
+    const validMainImageIndex = storedUploads.some((upload) => upload.index === mainImageIndex) ? mainImageIndex : 0
 
-    // Uložení každého obrázku v původním pořadí - každý jen jednou
     let mainImagePath: string | null = null
-    
-    // Validace indexu hlavního obrázku - defaultně první (index 0)
-    const validMainImageIndex = (mainImageIndex !== undefined && mainImageIndex !== null && mainImageIndex >= 0 && mainImageIndex < imageFiles.length) 
-      ? mainImageIndex 
-      : 0
-    
-    for (let i = 0; i < imageFiles.length; i++) {
-      const file = imageFiles[i]
-      
-      // Přeskočit prázdné nebo neplatné soubory
-      if (!file || file.size === 0) {
-        console.warn(`[WARN] Přeskakuji prázdný nebo neplatný soubor na indexu ${i}`)
-        continue
-      }
-      
-      try {
-        // Detekce přípony z názvu souboru - zachování původní přípony
-        let fileExtension = getExtension(file.name || '')
-        
-        // Pokud není přípona v názvu, zkus detekovat z MIME type
-        if (!fileExtension || fileExtension === '') {
-          if (file.type) {
-            if (file.type === 'image/jpeg' || file.type === 'image/jpg') {
-              fileExtension = '.jpg'
-            } else if (file.type === 'image/png') {
-              fileExtension = '.png'
-            } else if (file.type === 'image/webp') {
-              fileExtension = '.webp'
-            } else if (file.type === 'image/gif') {
-              fileExtension = '.gif'
-            } else if (file.type === 'image/heic' || file.type === 'image/heif') {
-              fileExtension = '.heic'
-            }
-          }
-        }
-        
-        // Pokud stále není přípona, použij .jpg jako fallback
-        if (!fileExtension || fileExtension === '') {
-          fileExtension = '.jpg'
-        }
-        
-        // Normalizace .jpeg -> .jpg pro konzistenci
-        if (fileExtension.toLowerCase() === '.jpeg') {
-          fileExtension = '.jpg'
-        }
-        
-        // Vytvoření unikátního názvu souboru
-        const randomString = Math.random().toString(36).substring(2, 15)
-        const fileName = `${baseTimestamp}_${i}_${randomString}${fileExtension}`
-        const filePath = join(uploadsDir, fileName)
-        
-        // Konverze File na Buffer a uložení - validace před uložením
-        const bytes = await file.arrayBuffer()
-        if (bytes.byteLength === 0) {
-          console.warn(`[WARN] Přeskakuji prázdný soubor: ${file.name}`)
-          continue
-        }
-        
-        const buffer = Buffer.from(bytes)
-        const storedFile = await storeFile(
-          buffer,
-          file.name || `image_${i}${fileExtension}`,
-          'products'
-        )
-        
-        const savedPath = storedFile.url
-        images.push(savedPath)
-        
-        // Nastavit hlavní obrázek podle indexu z frontendu (nebo první pokud není vybrán)
-        if (i === validMainImageIndex) {
-          mainImagePath = savedPath
-        }
-      } catch (error) {
-        console.error(`Chyba při ukládání obrázku ${file.name || `index ${i}`}:`, error)
-        // Pokračovat s dalšími obrázky místo ukončení
-        continue
+    const storedImages: VariantSource[] = []
+    for (const { index, file: storedFile } of storedUploads) {
+      if (!storedFile) continue
+      images.push(storedFile.url)
+      storedImages.push(storedImageSource(storedFile))
+      // Nastavit hlavní obrázek podle indexu z frontendu (nebo první pokud není vybrán)
+      if (index === validMainImageIndex) {
+        mainImagePath = storedFile.url
       }
     }
     
@@ -299,29 +200,33 @@ export async function POST(request: NextRequest) {
     // Generování unikátního ID pro produkt
     const productId = `product_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
 
-    // Vytvoření produktu v databázi
-    await insert(
-      `INSERT INTO products (id, title, description, price, listingType, category, subcategory, \`condition\`, mainImage, images, location, userId, isActive, isSold, createdAt, updatedAt) 
-       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW(), NOW())`,
-      [
-        productId,              // 1. id
-        title,                  // 2. title
-        description,            // 3. description
-        price,                  // 4. price
-        // Explicitní mapování: nabizim -> NABIZIM (Nabídka), shanim -> SHANIM (Poptávka)
-        listingTypeRaw === 'nabizim' ? 'NABIZIM' : 'SHANIM',  // 5. listingType
-        categoryMap[category],   // 6. category
-        subcategory || null,     // 7. subcategory
-        finalCondition,         // 8. condition
-        mainImagePath,          // 9. mainImage
-        JSON.stringify(images), // 10. images
-        location,               // 11. location
-        (session!.user as any).id, // 12. userId
-        true,                   // 13. isActive
-        false                   // 14. isSold
-        // createdAt a updatedAt jsou NOW() v SQL
-      ]
-    )
+    // Vytvoření produktu v databázi - ve stejné transakci se upraví statistiky tržiště (lib/stats.ts)
+    await withTransaction(async (connection) => {
+      await connection.execute(
+        `INSERT INTO products (id, title, description, price, listingType, category, subcategory, \`condition\`, mainImage, images, location, userId, isActive, isSold, createdAt, updatedAt) 
+         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NOW(), NOW())`,
+        [
+          productId,              // 1. id
+          title,                  // 2. title
+          description,            // 3. description
+          price,                  // 4. price
+          // Explicitní mapování: nabizim -> NABIZIM (Nabídka), shanim -> SHANIM (Poptávka)
+          listingTypeRaw === 'nabizim' ? 'NABIZIM' : 'SHANIM',  // 5. listingType
+          categoryMap[category],   // 6. category
+          subcategory || null,     // 7. subcategory
+          finalCondition,         // 8. condition
+          mainImagePath,          // 9. mainImage
+          JSON.stringify(images), // 10. images
+          location,               // 11. location
+          (session!.user as any).id, // 12. userId
+          true,                   // 13. isActive
+          false                   // 14. isSold
+          // createdAt a updatedAt jsou NOW() v SQL
+        ]
+      )
+      await applyProductStatsChange(connection, null, await lockProductStatsRow(connection, productId))
+      await setObjectRefs(connection, 'product', productId, [mainImagePath, ...images])
+    })
 
     // Získání vytvořeného produktu s uživatelem
     const product = await queryOne(
@@ -332,8 +237,19 @@ export async function POST(request: NextRequest) {
       [productId]
     )
 
-    await invalidateCacheByPrefix('products:list:')
-    await invalidateCacheByPrefix('stats:summary')
+    const cacheScope = {
+      id: productId,
+      userId: (session!.user as any).id,
+      listingType: listingTypeRaw === 'nabizim' ? 'NABIZIM' : 'SHANIM',
+      category: categoryMap[category],
+    }
+    await invalidateProductCaches(cacheScope)
+
+    // Zmenšené varianty obrázků (lib/images.ts) se generují na pozadí - inzerát je vidět hned
+    // s originály, po dokončení se cache zneplatní a výpisy přejdou na varianty
+    recordImageVariants('products', productId, storedImages)
+      .then((recorded) => (recorded ? invalidateProductCaches(cacheScope) : undefined))
+      .catch((error) => console.error('Chyba při generování variant obrázků:', error))
 
     return NextResponse.json(
       { 
@@ -344,232 +260,160 @@ export async function POST(request: NextRequest) {
     )
 
   } catch (error) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ message: error.message }, { status: error.status })
+    }
     console.error('Product creation error:', error)
     return NextResponse.json(
       { message: 'Nastala chyba při vytváření produktu' },
       { status: 500 }
     )
+  } finally {
+    // Dočasné soubory z formuláře - obsah je v tuto chvíli v úložišti
+    await upload?.cleanup()
   }
 }
 
 export async function GET(request: NextRequest) {
   try {
     const { searchParams } = new URL(request.url)
-    const cacheKey = getProductsCacheKey(searchParams)
-    const cacheTtl = Number(process.env.PRODUCTS_CACHE_TTL_SECONDS || 60)
-
-    if (cacheTtl > 0) {
-      const cachedResponse = await getCache<{ products: any[]; pagination: any }>(cacheKey)
-      if (cachedResponse) {
-        return NextResponse.json(cachedResponse)
-      }
-    }
-    
-    // Získání parametrů pro filtrování a stránkování
-    const page = parseInt(searchParams.get('page') || '1')
-    const limit = parseInt(searchParams.get('limit') || '12')
-    const category = searchParams.get('category')
-    const listingType = searchParams.get('listingType') // 'nabizim' | 'shanim'
-    const search = searchParams.get('search')
-    const minPrice = searchParams.get('minPrice')
-    const maxPrice = searchParams.get('maxPrice')
-    const condition = searchParams.get('condition')
-    const location = searchParams.get('location')
-    const sort = searchParams.get('sort') || 'newest'
-
-    // Vytvoření WHERE podmínek
-    let whereConditions = ['p.isActive = 1', 'p.isSold = 0']
-    const params: any[] = []
-
-    if (category) {
-      const categoryMap: { [key: string]: string } = {
-        'airsoft-weapons': 'AIRSOFT_WEAPONS',
-        'military-equipment': 'MILITARY_EQUIPMENT',
-        'other': 'OTHER'
-      }
-      // Zajistit, že category je v mapě před přidáním podmínky
-      const mappedCategory = categoryMap[category.toLowerCase().trim()]
-      if (mappedCategory) {
-        whereConditions.push('p.category = ?')
-        params.push(mappedCategory)
-      }
-    }
+    const listQuery = buildProductListQuery(searchParams)
 
-    if (listingType) {
-      const lt = listingType === 'shanim' ? 'SHANIM' : 'NABIZIM'
-      whereConditions.push('p.listingType = ?')
-      params.push(lt)
-    }
-
-    if (search) {
-      // Použít case-insensitive vyhledávání pomocí LOWER() pro lepší kompatibilitu
-      whereConditions.push('(LOWER(p.title) LIKE LOWER(?) OR LOWER(p.description) LIKE LOWER(?) OR LOWER(p.subcategory) LIKE LOWER(?))')
-      const searchTerm = `%${search.trim()}%`
-      params.push(searchTerm, searchTerm, searchTerm)
-    }
-
-    if (minPrice) {
-      whereConditions.push('p.price >= ?')
-      params.push(parseFloat(minPrice))
-    }
-
-    if (maxPrice) {
-      whereConditions.push('p.price <= ?')
-      params.push(parseFloat(maxPrice))
-    }
+    // Generace tagu se mění při každé změně inzerátu, který do výpisu patří - klíč starší generace už nikdo nečte
+    const generation = await getCacheGeneration(listQuery.cacheTag)
+    const cacheKey = getProductsCacheKey(searchParams, generation)
+    const cacheTtl = Number(process.env.PRODUCTS_CACHE_TTL_SECONDS || 60)
 
-    if (condition) {
-      const conditionMap: { [key: string]: string } = {
-        'new': 'NEW',
-        'light-damage': 'LIGHT_DAMAGE',
-        'major-damage': 'MAJOR_DAMAGE',
-        'non-functional': 'NON_FUNCTIONAL'
-      }
-      const mappedCondition = conditionMap[condition]
-      if (mappedCondition) {
-        whereConditions.push('p.`condition` = ?')
-        params.push(mappedCondition)
-      }
+    if (listQuery.cursorInvalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor' },
+        { status: 400 }
+      )
     }
 
-    if (location) {
-      const locationMap: { [key: string]: string } = {
-        'praha': 'Praha',
-        'brno': 'Brno',
-        'ostrava': 'Ostrava',
-        'plzen': 'Plzeň',
-        'hradec-kralove': 'Hradec Králové',
-        'ceske-budejovice': 'České Budějovice',
-        'olomouc': 'Olomouc',
-        'liberec': 'Liberec'
+    // Stale-while-revalidate: po měkkém TTL se vrací stará stránka a obnoví ji na pozadí jediný požadavek
+    const { value: responsePayload, state } = await getOrRevalidate(
+      cacheKey,
+      () => loadProductList(listQuery, generation),
+      {
+        ttlSeconds: cacheTtl,
+        staleSeconds: Number(process.env.PRODUCTS_CACHE_STALE_SECONDS || 300),
       }
-      whereConditions.push('p.location = ?')
-      params.push(locationMap[location])
-    }
-
-    // Vytvoření ORDER BY podmínek
-    let orderBy = 'p.createdAt DESC'
-    
-    switch (sort) {
-      case 'newest':
-        orderBy = 'p.createdAt DESC'
-        break
-      case 'oldest':
-        orderBy = 'p.createdAt ASC'
-        break
-      case 'price-low':
-        orderBy = 'p.price ASC'
-        break
-      case 'price-high':
-        orderBy = 'p.price DESC'
-        break
-      case 'name-asc':
-        orderBy = 'p.title ASC'
-        break
-      case 'name-desc':
-        orderBy = 'p.title DESC'
-        break
-    }
+    )
 
-    const whereClause = whereConditions.length > 0 ? `WHERE ${whereConditions.join(' AND ')}` : ''
+    // X-Cache slouží pro měření úspěšnosti cache (load_tests/products_load.py)
+    return NextResponse.json(responsePayload, {
+      headers: { 'X-Cache': state },
+    })
 
-    // Získání produktů s paginací
-    const offset = (page - 1) * limit
-    
-    const products = await query(
-      `SELECT p.*, u.id as userId, u.name as userName, u.email as userEmail, u.image as userImage, u.isVerified as userIsVerified, COALESCE(p.viewCount, 0) as viewCount
-       FROM products p 
-       JOIN users u ON p.userId = u.id 
-       ${whereClause}
-       ORDER BY ${orderBy}
-       LIMIT ? OFFSET ?`,
-      [...params, limit, offset]
+  } catch (error) {
+    console.error('Products fetch error:', error)
+    return NextResponse.json(
+      { message: 'Nastala chyba při načítání produktů' },
+      { status: 500 }
     )
+  }
+}
 
-    // Získání celkového počtu
-    const countResult = await queryOne(
-      `SELECT COUNT(*) as total FROM products p ${whereClause}`,
-      params
-    )
-    const totalCount = countResult.total
+async function loadProductList(listQuery: ProductListQuery, generation: number) {
+  const { page, limit, withTotal, useKeyset, useRelevance, sortKeys } = listQuery
+
+  // Získání produktů s paginací
+  const listSql = productListSql(listQuery)
+  const rows = await query<any[]>(listSql.sql, listSql.params)
+  const { items: products, nextCursor, hasNext } = toKeysetPage(Array.isArray(rows) ? rows : [], limit, sortKeys)
+
+  // Celkový počet - v offset režimu kvůli totalPages, v cursor režimu jen na vyžádání; cachovaný
+  let totalCount: number | null = null
+  if (!useKeyset || withTotal) {
+    const countSql = productCountSql(listQuery)
+    const countKey = `products:list:count:g${generation}:${createHash('sha1').update(listQuery.filterClause + JSON.stringify(listQuery.filterParams)).digest('hex')}`
+    totalCount = await cachedCount(countKey, async () => {
+      const countResult = await queryOne(countSql.sql, countSql.params)
+      return Number(countResult?.total) || 0
+    })
+  }
 
-    const totalPages = Math.ceil(totalCount / limit)
+  const totalPages = totalCount !== null ? Math.ceil(totalCount / limit) : null
 
-    // Mapování pro zobrazení
-    const categoryMapDisplay: { [key: string]: string } = {
-      'AIRSOFT_WEAPONS': 'Airsoft zbraně',
-      'MILITARY_EQUIPMENT': 'Military vybavení',
-      'OTHER': 'Ostatní'
-    }
+  // Mapování pro zobrazení
+  const categoryMapDisplay: { [key: string]: string } = {
+    'AIRSOFT_WEAPONS': 'Airsoft zbraně',
+    'MILITARY_EQUIPMENT': 'Military vybavení',
+    'OTHER': 'Ostatní'
+  }
 
-    const conditionMapDisplay: { [key: string]: string } = {
-      'NEW': 'Nový',
-      'LIGHT_DAMAGE': 'Lehké poškození',
-      'MAJOR_DAMAGE': 'Větší poškození',
-      'NON_FUNCTIONAL': 'Nefunkční'
-    }
+  const conditionMapDisplay: { [key: string]: string } = {
+    'NEW': 'Nový',
+    'LIGHT_DAMAGE': 'Lehké poškození',
+    'MAJOR_DAMAGE': 'Větší poškození',
+    'NON_FUNCTIONAL': 'Nefunkční'
+  }
 
-    // Transformace dat pro frontend
-    const transformedProducts = Array.isArray(products) ? products.map((product: any) => {
-      // Parsování obrázků
-      let images: string[] = []
-      try {
-        if (product.images) {
-          if (typeof product.images === 'string') {
-            const parsed = JSON.parse(product.images)
-            images = Array.isArray(parsed) ? parsed : []
-          } else if (Array.isArray(product.images)) {
-            images = product.images
-          }
-          // Filtrovat pouze validní stringy
-          images = images.filter((img: any) => img && typeof img === 'string' && img.trim().length > 0)
+  // Transformace dat pro frontend
+  const transformedProducts = Array.isArray(products) ? products.map((product: any) => {
+    // Parsování obrázků
+    let images: string[] = []
+    try {
+      if (product.images) {
+        if (typeof product.images === 'string') {
+          const parsed = JSON.parse(product.images)
+          images = Array.isArray(parsed) ? parsed : []
+        } else if (Array.isArray(product.images)) {
+          images = product.images
         }
-      } catch (e) {
-        images = []
-      }
-
-      return {
-        ...product,
-        images,
-        price: parseFloat(product.price) || 0,
-        viewCount: parseInt(product.viewCount) || 0,
-        category: categoryMapDisplay[product.category] || product.category,
-        condition: conditionMapDisplay[product.condition] || product.condition
-      }
-    }) : []
-
-    const responsePayload = {
-      products: transformedProducts,
-      pagination: {
-        page,
-        limit,
-        totalCount,
-        totalPages,
-        hasNext: page < totalPages,
-        hasPrev: page > 1
+        // Filtrovat pouze validní stringy
+        images = images.filter((img: any) => img && typeof img === 'string' && img.trim().length > 0)
       }
+    } catch (e) {
+      images = []
     }
 
-    if (cacheTtl > 0) {
-      await setCache(cacheKey, responsePayload, cacheTtl)
+    // Výpis posílá jen varianty titulního obrázku - celou mapu má detail
+    const { imageVariants, ...listed } = product
+    const cover = product.mainImage || images[0]
+    const mainImageVariants = cover ? parseImageVariants(imageVariants)[cover] || null : null
+
+    return {
+      ...listed,
+      images,
+      mainImageVariants,
+      price: parseFloat(product.price) || 0,
+      viewCount: parseInt(product.viewCount) || 0,
+      category: categoryMapDisplay[product.category] || product.category,
+      condition: conditionMapDisplay[product.condition] || product.condition
     }
-
-    return NextResponse.json(responsePayload)
-
-  } catch (error) {
-    console.error('Products fetch error:', error)
-    return NextResponse.json(
-      { message: 'Nastala chyba při načítání produktů' },
-      { status: 500 }
-    )
+  }) : []
+
+  const responsePayload = {
+    products: transformedProducts,
+    pagination: useKeyset
+      ? {
+          limit,
+          totalCount,
+          nextCursor: useRelevance ? null : nextCursor,
+          hasNext,
+        }
+      : {
+          page,
+          limit,
+          totalCount,
+          totalPages,
+          hasNext,
+          hasPrev: page > 1,
+          // Umožní přejít z číslovaných stránek na cursor
+          nextCursor: useRelevance ? null : nextCursor,
+        }
   }
+
+  return responsePayload
 }
 
-function getProductsCacheKey(searchParams: URLSearchParams) {
+function getProductsCacheKey(searchParams: URLSearchParams, generation: number) {
   const entries = Array.from(searchParams.entries())
     .map(([key, value]) => [key, value ?? ''] as const)
     .sort(([a], [b]) => a.localeCompare(b))
 
   const serialized = entries.map(([key, value]) => `${key}=${value}`).join('&')
-  return `products:list:${serialized}`
+  return `products:list:g${generation}:${serialized}`
 }
\ No newline at end of file
@@ -1,11 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { query, queryOne, insert, update } from '@/lib/mysql'
+import { query, queryOne, update, withTransaction } from '@/lib/mysql'
+import { invalidateServiceCache } from '@/lib/services'
 import { sanitizeInput } from '@/lib/utils'
-import { writeFile, mkdir } from 'fs/promises'
-import { join } from 'path'
 import { randomBytes } from 'crypto'
+import { storeFile } from '@/lib/storage'
+import { setObjectRefs } from '@/lib/stored-objects'
+import { MultipartUpload, UPLOAD_MAX_FILE_SIZE, UPLOAD_MAX_TOTAL_SIZE, UploadError, parseMultipartUpload } from '@/lib/multipart'
 
 // Force dynamic rendering
 export const dynamic = 'force-dynamic'
@@ -59,11 +61,19 @@ export async function GET(
   }
 }
 
+const REVIEW_UPLOAD_LIMITS = {
+  files: { images: 10 },
+  maxFileSize: UPLOAD_MAX_FILE_SIZE,
+  maxTotalSize: UPLOAD_MAX_TOTAL_SIZE,
+  extensions: ['.jpg', '.png', '.webp', '.gif'],
+}
+
 // POST - vytvoření nové recenze
 export async function POST(
   request: NextRequest,
   { params }: { params: { id: string } }
 ) {
+  let upload: MultipartUpload | null = null
   try {
     const session = await getServerSession(authOptions)
     
@@ -110,7 +120,8 @@ export async function POST(
       )
     }
 
-    const formData = await request.formData()
+    // Tělo se čte až po kontrolách výše - odmítnutý požadavek obrázky vůbec nepřijímá (lib/multipart.ts)
+    const formData = (upload = await parseMultipartUpload(request, REVIEW_UPLOAD_LIMITS))
     
     // Získání dat z formuláře
     const ratingSpeed = parseInt(formData.get('ratingSpeed') as string)
@@ -133,47 +144,15 @@ export async function POST(
     const now = new Date()
 
     // Zpracování obrázků
-    const imageFiles = formData.getAll('images') as File[]
+    const imageFiles = formData.files('images')
     const imagePaths: string[] = []
 
-    if (imageFiles && imageFiles.length > 0) {
+    if (imageFiles.length > 0) {
       try {
-        const uploadDir = join(process.cwd(), 'public', 'uploads', 'reviews')
-        await mkdir(uploadDir, { recursive: true })
-
         for (const imageFile of imageFiles) {
-          if (imageFile.size > 0) {
-            // Validace velikosti (max 5MB)
-            if (imageFile.size > 5 * 1024 * 1024) {
-              return NextResponse.json(
-                { message: 'Obrázek je příliš velký. Maximální velikost je 5MB.' },
-                { status: 400 }
-              )
-            }
-
-            // Validace typu
-            const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/gif']
-            if (!validTypes.includes(imageFile.type)) {
-              return NextResponse.json(
-                { message: 'Neplatný formát obrázku. Povolené formáty: JPEG, PNG, WEBP, GIF' },
-                { status: 400 }
-              )
-            }
-
-            // Generování unikátního názvu souboru
-            const timestamp = Date.now()
-            const randomStr = randomBytes(8).toString('hex')
-            const extension = imageFile.name.split('.').pop() || 'jpg'
-            const fileName = `${timestamp}_${randomStr}.${extension}`
-            const filePath = join(uploadDir, fileName)
-
-            // Konverze File na Buffer a uložení
-            const bytes = await imageFile.arrayBuffer()
-            const buffer = Buffer.from(bytes)
-            await writeFile(filePath, buffer)
-
-            imagePaths.push(`/uploads/reviews/${fileName}`)
-          }
+          // Uložení pod adresou podle obsahu (lib/storage.ts) - stejná fotka se znovu nenahrává
+          const stored = await storeFile(imageFile, `image_${imageFile.index}${imageFile.extension}`, 'reviews')
+          imagePaths.push(stored.url)
         }
       } catch (error) {
         console.error('Chyba při ukládání obrázků:', error)
@@ -184,27 +163,30 @@ export async function POST(
       }
     }
 
-    // Vložení recenze do databáze
-    await insert(
-      `INSERT INTO service_reviews (
-        id, serviceId, userId, ratingSpeed, ratingQuality, ratingCommunication,
-        ratingPrice, ratingOverall, comment, images, createdAt, updatedAt
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-      [
-        id,
-        serviceId,
-        userId,
-        ratingSpeed,
-        ratingQuality,
-        ratingCommunication,
-        ratingPrice,
-        ratingOverall,
-        comment || null,
-        JSON.stringify(imagePaths),
-        now,
-        now
-      ]
-    )
+    // Vložení recenze do databáze spolu s odkazy na uložené obrázky (lib/stored-objects.ts)
+    await withTransaction(async (connection) => {
+      await connection.execute(
+        `INSERT INTO service_reviews (
+          id, serviceId, userId, ratingSpeed, ratingQuality, ratingCommunication,
+          ratingPrice, ratingOverall, comment, images, createdAt, updatedAt
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+        [
+          id,
+          serviceId,
+          userId,
+          ratingSpeed,
+          ratingQuality,
+          ratingCommunication,
+          ratingPrice,
+          ratingOverall,
+          comment || null,
+          JSON.stringify(imagePaths),
+          now,
+          now
+        ]
+      )
+      await setObjectRefs(connection, 'review', id, imagePaths)
+    })
 
     // Přepočítání průměrného hodnocení servisu
     const avgRatings = await queryOne(
@@ -229,18 +211,24 @@ export async function POST(
       'UPDATE services SET rating = ?, reviewCount = ?, updatedAt = ? WHERE id = ?',
       [avgRating, reviewCount, now, serviceId]
     )
+    await invalidateServiceCache(serviceId)
 
     return NextResponse.json({
       message: 'Recenze byla úspěšně přidána',
       reviewId: id
     })
   } catch (error: any) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ message: error.message }, { status: error.status })
+    }
     console.error('Chyba při vytváření recenze:', error)
     
     return NextResponse.json(
       { message: 'Chyba při vytváření recenze' },
       { status: 500 }
     )
+  } finally {
+    await upload?.cleanup()
   }
 }
 
@@ -1,12 +1,12 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { queryOne, update } from '@/lib/mysql'
+import { queryOne, withTransaction } from '@/lib/mysql'
 import { sanitizeInput } from '@/lib/utils'
-import { writeFile, mkdir, unlink } from 'fs/promises'
-import { join } from 'path'
-import { randomBytes } from 'crypto'
-import { existsSync } from 'fs'
+import { getServiceDetail, invalidateServiceCache } from '@/lib/services'
+import { storeFile } from '@/lib/storage'
+import { VariantSource, parseImageVariants, recordImageVariants, storedImageSource } from '@/lib/images'
+import { setObjectRefs } from '@/lib/stored-objects'
 
 // Force dynamic rendering
 export const dynamic = 'force-dynamic'
@@ -26,31 +26,8 @@ export async function GET(
       )
     }
 
-    const service = await queryOne(
-      `SELECT 
-        s.id,
-        s.name,
-        s.description,
-        s.location,
-        s.contactEmail,
-        s.contactPhone,
-        s.image,
-        s.additionalImages,
-        s.rating,
-        s.reviewCount,
-        s.createdAt,
-        s.updatedAt,
-        s.userId,
-        u.name as userName,
-        u.email as userEmail,
-        u.image as userImage,
-        u.isVerified as userIsVerified,
-        u.reputation as userReputation
-      FROM services s
-      LEFT JOIN users u ON s.userId = u.id
-      WHERE s.id = ? AND s.isActive = true`,
-      [serviceId]
-    )
+    // Read-through cache, neexistující id se cachují krátce jako záporný záznam
+    const service = await getServiceDetail(serviceId)
 
     if (!service) {
       return NextResponse.json(
@@ -68,6 +45,7 @@ export async function GET(
       contactPhone: service.contactPhone,
       image: service.image,
       additionalImages: service.additionalImages ? JSON.parse(service.additionalImages) : null,
+      imageVariants: parseImageVariants(service.imageVariants),
       rating: service.rating !== null && service.rating !== undefined 
         ? parseFloat(String(service.rating)) 
         : undefined,
@@ -164,6 +142,9 @@ export async function PATCH(
       )
     }
 
+    // Nově uložené obrázky pro generování variant (lib/images.ts)
+    const storedImages: VariantSource[] = []
+
     // Zpracování hlavní fotky
     let mainImagePath: string | undefined = existingService.image
     const mainImageFile = formData.get('image') as File | null
@@ -187,35 +168,11 @@ export async function PATCH(
           )
         }
 
-        // Vytvoření adresáře pokud neexistuje
-        const uploadDir = join(process.cwd(), 'public', 'uploads', 'services')
-        await mkdir(uploadDir, { recursive: true })
-
-        // Generování unikátního názvu souboru
-        const timestamp = Date.now()
-        const randomStr = randomBytes(8).toString('hex')
-        const extension = mainImageFile.name.split('.').pop() || 'jpg'
-        const fileName = `${timestamp}_${randomStr}.${extension}`
-        const filePath = join(uploadDir, fileName)
-
-        // Konverze File na Buffer a uložení
-        const bytes = await mainImageFile.arrayBuffer()
-        const buffer = Buffer.from(bytes)
-        await writeFile(filePath, buffer)
-
-        mainImagePath = `/uploads/services/${fileName}`
-
-        // Smazání starého obrázku
-        if (existingService.image) {
-          const oldImagePath = join(process.cwd(), 'public', existingService.image)
-          if (existsSync(oldImagePath)) {
-            try {
-              await unlink(oldImagePath)
-            } catch (e) {
-              console.error(`Chyba při mazání starého obrázku:`, e)
-            }
-          }
-        }
+        // Uložení pod adresou podle obsahu (lib/storage.ts). Starý obrázek se nemaže - může ho
+        // sdílet jiný záznam; bez odkazů ho uklidí garbage collector (lib/stored-objects.ts)
+        const stored = await storeFile(mainImageFile, mainImageFile.name, 'services')
+        mainImagePath = stored.url
+        storedImages.push(storedImageSource(stored))
       } catch (error) {
         console.error('Chyba při ukládání obrázku:', error)
         return NextResponse.json(
@@ -261,9 +218,6 @@ export async function PATCH(
           )
         }
 
-        const uploadDir = join(process.cwd(), 'public', 'uploads', 'services')
-        await mkdir(uploadDir, { recursive: true })
-
         for (const imageFile of additionalImageFiles) {
           if (imageFile.size > 0) {
             // Validace velikosti (max 5MB)
@@ -283,19 +237,9 @@ export async function PATCH(
               )
             }
 
-            // Generování unikátního názvu souboru
-            const timestamp = Date.now()
-            const randomStr = randomBytes(8).toString('hex')
-            const extension = imageFile.name.split('.').pop() || 'jpg'
-            const fileName = `${timestamp}_${randomStr}.${extension}`
-            const filePath = join(uploadDir, fileName)
-
-            // Konverze File na Buffer a uložení
-            const bytes = await imageFile.arrayBuffer()
-            const buffer = Buffer.from(bytes)
-            await writeFile(filePath, buffer)
-
-            additionalImages.push(`/uploads/services/${fileName}`)
+            const stored = await storeFile(imageFile, imageFile.name, 'services')
+            additionalImages.push(stored.url)
+            storedImages.push(storedImageSource(stored))
           }
         }
       } catch (error) {
@@ -313,48 +257,48 @@ export async function PATCH(
       try {
         const deleteImagesArray = JSON.parse(deleteImagesParam as string) as string[]
         for (const imagePath of deleteImagesArray) {
-          // Odebrat z pole
+          // Odebrat z pole - soubor uklidí garbage collector, až na něj nic neodkazuje
           additionalImages = additionalImages.filter(img => img !== imagePath)
-          
-          // Smazat soubor z disku
-          const fullPath = join(process.cwd(), 'public', imagePath)
-          if (existsSync(fullPath)) {
-            try {
-              await unlink(fullPath)
-            } catch (e) {
-              console.error(`Chyba při mazání obrázku ${imagePath}:`, e)
-            }
-          }
         }
       } catch (e) {
         console.error('Chyba při mazání obrázků:', e)
       }
     }
 
-    // Aktualizace servisu v databázi
-    await update(
-      `UPDATE services SET 
-        name = ?,
-        description = ?,
-        location = ?,
-        contactEmail = ?,
-        contactPhone = ?,
-        image = ?,
-        additionalImages = ?,
-        updatedAt = ?
-      WHERE id = ?`,
-      [
-        name,
-        description,
-        location,
-        contactEmail,
-        contactPhone || null,
-        mainImagePath || null,
-        JSON.stringify(additionalImages),
-        now,
-        serviceId
-      ]
-    )
+    // Aktualizace servisu spolu s odkazy na uložené obrázky (lib/stored-objects.ts)
+    await withTransaction(async (connection) => {
+      await connection.execute(
+        `UPDATE services SET 
+          name = ?,
+          description = ?,
+          location = ?,
+          contactEmail = ?,
+          contactPhone = ?,
+          image = ?,
+          additionalImages = ?,
+          updatedAt = ?
+        WHERE id = ?`,
+        [
+          name,
+          description,
+          location,
+          contactEmail,
+          contactPhone || null,
+          mainImagePath || null,
+          JSON.stringify(additionalImages),
+          now,
+          serviceId
+        ]
+      )
+      await setObjectRefs(connection, 'service', serviceId, [mainImagePath, ...additionalImages])
+    })
+
+    await invalidateServiceCache(serviceId)
+
+    // Varianty nových obrázků se generují na pozadí, po dokončení se detail zneplatní znovu
+    recordImageVariants('services', serviceId, storedImages)
+      .then((recorded) => (recorded ? invalidateServiceCache(serviceId) : undefined))
+      .catch((error) => console.error('Chyba při generování variant obrázků:', error))
 
     return NextResponse.json({
       message: 'Servis byl úspěšně upraven',
@@ -1,11 +1,14 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
-import { query, queryOne, insert } from '@/lib/mysql'
+import { query, queryOne, withTransaction } from '@/lib/mysql'
 import { sanitizeInput } from '@/lib/utils'
-import { writeFile, mkdir } from 'fs/promises'
-import { join } from 'path'
+import { KeysetKey, keysetOrderBy, keysetWhere, readKeysetParams, toKeysetPage } from '@/lib/pagination'
 import { randomBytes } from 'crypto'
+import { storeFile } from '@/lib/storage'
+import { VariantSource, parseImageVariants, recordImageVariants, storedImageSource } from '@/lib/images'
+import { MultipartUpload, UPLOAD_MAX_FILE_SIZE, UPLOAD_MAX_TOTAL_SIZE, UploadError, parseMultipartUpload } from '@/lib/multipart'
+import { setObjectRefs } from '@/lib/stored-objects'
 
 // Force dynamic rendering
 export const dynamic = 'force-dynamic'
@@ -17,6 +20,15 @@ export async function GET(request: NextRequest) {
     const search = searchParams.get('search') || ''
     const location = searchParams.get('location') || ''
     const sort = searchParams.get('sort') || 'newest'
+    const sortKeys = serviceSortKeys[sort] || serviceSortKeys.newest
+    const pageRequest = readKeysetParams(searchParams, sortKeys)
+
+    if (pageRequest.invalid) {
+      return NextResponse.json(
+        { message: 'Neplatný cursor', services: [] },
+        { status: 400 }
+      )
+    }
 
     // Sestavení WHERE podmínek - zobrazit jen schválené servisy (isActive = true)
     const whereConditions: string[] = ['s.isActive = true']
@@ -35,33 +47,25 @@ export async function GET(request: NextRequest) {
       params.push(`%${location}%`)
     }
 
+    // Keyset stránkování - pokračovat za posledním řádkem předchozí stránky
+    if (pageRequest.values) {
+      const keyset = keysetWhere(sortKeys, pageRequest.values)
+      whereConditions.push(keyset.sql)
+      params.push(...keyset.params)
+    }
+
     const whereClause = whereConditions.length > 0 
       ? `WHERE ${whereConditions.join(' AND ')}` 
       : ''
 
-    // Řazení
-    let orderBy = 's.createdAt DESC'
-    switch (sort) {
-      case 'oldest':
-        orderBy = 's.createdAt ASC'
-        break
-      case 'name-asc':
-        orderBy = 's.name ASC'
-        break
-      case 'name-desc':
-        orderBy = 's.name DESC'
-        break
-      case 'rating-high':
-        orderBy = 's.rating DESC, s.reviewCount DESC'
-        break
-      case 'rating-low':
-        orderBy = 's.rating ASC, s.reviewCount ASC'
-        break
-      default:
-        orderBy = 's.createdAt DESC'
+    // Řazení (id jako poslední klíč kvůli stabilnímu pořadí)
+    const orderBy = keysetOrderBy(sortKeys)
+    const limitClause = pageRequest.enabled ? 'LIMIT ?' : ''
+    if (pageRequest.enabled) {
+      params.push(pageRequest.limit + 1)
     }
 
-    const services = await query(`
+    const rows = await query<any[]>(`
       SELECT 
         s.id,
         s.name,
@@ -71,6 +75,7 @@ export async function GET(request: NextRequest) {
         s.contactPhone,
         s.image,
         s.additionalImages,
+        s.imageVariants,
         s.rating,
         s.reviewCount,
         s.createdAt,
@@ -80,10 +85,18 @@ export async function GET(request: NextRequest) {
       LEFT JOIN users u ON s.userId = u.id
       ${whereClause}
       ORDER BY ${orderBy}
+      ${limitClause}
     `, params)
 
+    const page = pageRequest.enabled
+      ? toKeysetPage(rows, pageRequest.limit, sortKeys)
+      : { items: rows, nextCursor: null, hasNext: false }
+
     return NextResponse.json({ 
-      services: (services as any[]).map((s) => ({
+      ...(pageRequest.enabled
+        ? { pagination: { limit: pageRequest.limit, nextCursor: page.nextCursor, hasNext: page.hasNext } }
+        : {}),
+      services: page.items.map((s) => ({
         id: s.id,
         name: s.name,
         description: s.description,
@@ -93,6 +106,8 @@ export async function GET(request: NextRequest) {
         contact: s.contactEmail || s.contactPhone || '',
         image: s.image,
         additionalImages: s.additionalImages ? JSON.parse(s.additionalImages) : null,
+        // Varianty titulního obrázku (lib/images.ts), null = zobrazit originál
+        mainImageVariants: s.image ? parseImageVariants(s.imageVariants)[s.image] || null : null,
         rating: s.rating !== null && s.rating !== undefined ? parseFloat(String(s.rating)) : undefined,
         reviewCount: s.reviewCount || 0,
         createdAt: s.createdAt,
@@ -108,8 +123,47 @@ export async function GET(request: NextRequest) {
   }
 }
 
+// Klíče řazení pro ORDER BY i keyset stránkování; NULL hodnocení se řadí jako 0
+const serviceSortKeys: Record<string, KeysetKey[]> = {
+  newest: [
+    { column: 's.createdAt', field: 'createdAt', direction: 'DESC' },
+    { column: 's.id', field: 'id', direction: 'DESC' },
+  ],
+  oldest: [
+    { column: 's.createdAt', field: 'createdAt', direction: 'ASC' },
+    { column: 's.id', field: 'id', direction: 'ASC' },
+  ],
+  'name-asc': [
+    { column: 's.name', field: 'name', direction: 'ASC' },
+    { column: 's.id', field: 'id', direction: 'ASC' },
+  ],
+  'name-desc': [
+    { column: 's.name', field: 'name', direction: 'DESC' },
+    { column: 's.id', field: 'id', direction: 'DESC' },
+  ],
+  'rating-high': [
+    { column: 'COALESCE(s.rating, 0)', field: 'rating', direction: 'DESC', fallback: 0 },
+    { column: 's.reviewCount', field: 'reviewCount', direction: 'DESC' },
+    { column: 's.id', field: 'id', direction: 'DESC' },
+  ],
+  'rating-low': [
+    { column: 'COALESCE(s.rating, 0)', field: 'rating', direction: 'ASC', fallback: 0 },
+    { column: 's.reviewCount', field: 'reviewCount', direction: 'ASC' },
+    { column: 's.id', field: 'id', direction: 'ASC' },
+  ],
+}
+
+// Hlavní fotka + nejvýš 10 dodatečných; HEIC se u servisů nepřijímá
+const SERVICE_UPLOAD_LIMITS = {
+  files: { image: 1, additionalImages: 10 },
+  maxFileSize: UPLOAD_MAX_FILE_SIZE,
+  maxTotalSize: UPLOAD_MAX_TOTAL_SIZE,
+  extensions: ['.jpg', '.png', '.webp', '.gif'],
+}
+
 // POST - vytvoření nového servisu
 export async function POST(request: NextRequest) {
+  let upload: MultipartUpload | null = null
   try {
     const session = await getServerSession(authOptions)
     
@@ -120,7 +174,8 @@ export async function POST(request: NextRequest) {
       )
     }
 
-    const formData = await request.formData()
+    // Formulář se čte streamem s limity velikosti a kontrolou typu (lib/multipart.ts)
+    const formData = (upload = await parseMultipartUpload(request, SERVICE_UPLOAD_LIMITS))
     
     // Získání dat z formuláře
     const name = sanitizeInput(formData.get('name') as string || '')
@@ -158,46 +213,19 @@ export async function POST(request: NextRequest) {
     const id = randomBytes(16).toString('hex')
     const now = new Date()
 
-    // Zpracování hlavní fotky
+    // Uložené obrázky pro generování variant (lib/images.ts)
+    const storedImages: VariantSource[] = []
+
+    // Zpracování hlavní fotky (velikost a typ ověřil parser)
     let imagePath: string | null = null
-    const imageFile = formData.get('image') as File | null
+    const imageFile = formData.files('image')[0]
 
-    if (imageFile && imageFile.size > 0) {
+    if (imageFile) {
       try {
-        // Validace velikosti (max 5MB)
-        if (imageFile.size > 5 * 1024 * 1024) {
-          return NextResponse.json(
-            { message: 'Obrázek je příliš velký. Maximální velikost je 5MB.' },
-            { status: 400 }
-          )
-        }
-
-        // Validace typu
-        const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/gif']
-        if (!validTypes.includes(imageFile.type)) {
-          return NextResponse.json(
-            { message: 'Neplatný formát obrázku. Povolené formáty: JPEG, PNG, WEBP, GIF' },
-            { status: 400 }
-          )
-        }
-
-        // Vytvoření adresáře pokud neexistuje
-        const uploadDir = join(process.cwd(), 'public', 'uploads', 'services')
-        await mkdir(uploadDir, { recursive: true })
-
-        // Generování unikátního názvu souboru
-        const timestamp = Date.now()
-        const randomStr = randomBytes(8).toString('hex')
-        const extension = imageFile.name.split('.').pop() || 'jpg'
-        const fileName = `${timestamp}_${randomStr}.${extension}`
-        const filePath = join(uploadDir, fileName)
-
-        // Konverze File na Buffer a uložení
-        const bytes = await imageFile.arrayBuffer()
-        const buffer = Buffer.from(bytes)
-        await writeFile(filePath, buffer)
-
-        imagePath = `/uploads/services/${fileName}`
+        // Uložení pod adresou podle obsahu (lib/storage.ts) - stejná fotka se znovu nenahrává
+        const stored = await storeFile(imageFile, `image${imageFile.extension}`, 'services')
+        imagePath = stored.url
+        storedImages.push(storedImageSource(stored))
       } catch (error) {
         console.error('Chyba při ukládání obrázku:', error)
         return NextResponse.json(
@@ -209,54 +237,14 @@ export async function POST(request: NextRequest) {
 
     // Zpracování dodatečných fotek
     const additionalImages: string[] = []
-    const additionalImageFiles = formData.getAll('additionalImages') as File[]
+    const additionalImageFiles = formData.files('additionalImages')
 
-    if (additionalImageFiles && additionalImageFiles.length > 0) {
+    if (additionalImageFiles.length > 0) {
       try {
-        // Validace počtu obrázků (max 10)
-        if (additionalImageFiles.length > 10) {
-          return NextResponse.json(
-            { message: 'Můžete nahrát maximálně 10 dodatečných obrázků' },
-            { status: 400 }
-          )
-        }
-
-        const uploadDir = join(process.cwd(), 'public', 'uploads', 'services')
-        await mkdir(uploadDir, { recursive: true })
-
         for (const imageFile of additionalImageFiles) {
-          if (imageFile.size > 0) {
-            // Validace velikosti (max 5MB)
-            if (imageFile.size > 5 * 1024 * 1024) {
-              return NextResponse.json(
-                { message: 'Obrázek je příliš velký. Maximální velikost je 5MB.' },
-                { status: 400 }
-              )
-            }
-
-            // Validace typu
-            const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/gif']
-            if (!validTypes.includes(imageFile.type)) {
-              return NextResponse.json(
-                { message: 'Neplatný formát obrázku. Povolené formáty: JPEG, PNG, WEBP, GIF' },
-                { status: 400 }
-              )
-            }
-
-            // Generování unikátního názvu souboru
-            const timestamp = Date.now()
-            const randomStr = randomBytes(8).toString('hex')
-            const extension = imageFile.name.split('.').pop() || 'jpg'
-            const fileName = `${timestamp}_${randomStr}.${extension}`
-            const filePath = join(uploadDir, fileName)
-
-            // Konverze File na Buffer a uložení
-            const bytes = await imageFile.arrayBuffer()
-            const buffer = Buffer.from(bytes)
-            await writeFile(filePath, buffer)
-
-            additionalImages.push(`/uploads/services/${fileName}`)
-          }
+          const stored = await storeFile(imageFile, `image_${imageFile.index}${imageFile.extension}`, 'services')
+          additionalImages.push(stored.url)
+          storedImages.push(storedImageSource(stored))
         }
       } catch (error) {
         console.error('Chyba při ukládání dodatečných obrázků:', error)
@@ -267,33 +255,43 @@ export async function POST(request: NextRequest) {
       }
     }
 
-    // Vložení servisu do databáze
-    await insert(
-      `INSERT INTO services (
-        id, name, description, location, contactEmail, contactPhone, 
-        image, additionalImages, userId, isActive, createdAt, updatedAt
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-      [
-        id,
-        name,
-        description,
-        location,
-        contactEmail,
-        contactPhone || null,
-        imagePath,
-        JSON.stringify(additionalImages),
-        userId,
-        false, // Servis čeká na schválení adminem
-        now,
-        now
-      ]
-    )
+    // Vložení servisu do databáze spolu s odkazy na uložené obrázky (lib/stored-objects.ts)
+    await withTransaction(async (connection) => {
+      await connection.execute(
+        `INSERT INTO services (
+          id, name, description, location, contactEmail, contactPhone, 
+          image, additionalImages, userId, isActive, createdAt, updatedAt
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+        [
+          id,
+          name,
+          description,
+          location,
+          contactEmail,
+          contactPhone || null,
+          imagePath,
+          JSON.stringify(additionalImages),
+          userId,
+          false, // Servis čeká na schválení adminem
+          now,
+          now
+        ]
+      )
+      await setObjectRefs(connection, 'service', id, [imagePath, ...additionalImages])
+    })
+
+    // Varianty obrázků se generují na pozadí - servis čeká na schválení, cache ještě nemá
+    recordImageVariants('services', id, storedImages)
+      .catch((error) => console.error('Chyba při generování variant obrázků:', error))
 
     return NextResponse.json({
       message: 'Servis byl úspěšně vytvořen a čeká na schválení administrátorem. Po schválení se zobrazí v sekci servisy.',
       serviceId: id
     })
   } catch (error: any) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ message: error.message }, { status: error.status })
+    }
     console.error('Chyba při vytváření servisu:', error)
     
     // Kontrola duplicity
@@ -308,6 +306,8 @@ export async function POST(request: NextRequest) {
       { message: 'Chyba při vytváření servisu' },
       { status: 500 }
     )
+  } finally {
+    await upload?.cleanup()
   }
 }
 
@@ -1,79 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { query } from '@/lib/mysql'
-import { getCache, setCache } from '@/lib/redis'
+import { getOrRevalidate } from '@/lib/redis'
+import { readMarketplaceStats, startStatsReconciler } from '@/lib/stats'
 
 export const dynamic = 'force-dynamic'
 
 export async function GET(request: NextRequest) {
   try {
-    const cacheKey = 'stats:summary'
-    const cacheTtl = Number(process.env.STATS_CACHE_TTL_SECONDS || 120)
-
-    if (cacheTtl > 0) {
-      const cached = await getCache<any>(cacheKey)
-      if (cached) {
-        return NextResponse.json(cached)
-      }
-    }
-
-    // Celkový počet aktivních inzerátů (nabízím)
-    const [totalActive] = await query(
-      `SELECT COUNT(*) as count FROM products WHERE listingType = 'NABIZIM' AND isSold = 0`
-    ) as any[]
-
-    // Počet nových inzerátů za posledních 24h (nabízím)
-    const [newLast24h] = await query(
-      `SELECT COUNT(*) as count FROM products 
-       WHERE listingType = 'NABIZIM' 
-       AND createdAt >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
-       AND isSold = 0`
-    ) as any[]
-
-    // Počet nových inzerátů za posledních 7 dní (nabízím)
-    const [newLast7d] = await query(
-      `SELECT COUNT(*) as count FROM products 
-       WHERE listingType = 'NABIZIM' 
-       AND createdAt >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-       AND isSold = 0`
-    ) as any[]
-
-    // Počet nových inzerátů za posledních 30 dní (nabízím)
-    const [newLast30d] = await query(
-      `SELECT COUNT(*) as count FROM products 
-       WHERE listingType = 'NABIZIM' 
-       AND createdAt >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-       AND isSold = 0`
-    ) as any[]
-
-    // Celkový počet zobrazení všech produktů
-    const [totalViews] = await query(
-      `SELECT SUM(viewCount) as total FROM products WHERE listingType = 'NABIZIM'`
-    ) as any[]
-
-    // Průměrný počet zobrazení na produkt
-    const avgViews = totalActive.count > 0 
-      ? Math.round((totalViews.total || 0) / totalActive.count)
-      : 0
-
-    // Počet aktivních prodejců (uživatelé s alespoň jedním aktivním inzerátem)
-    const [activeSellers] = await query(
-      `SELECT COUNT(DISTINCT userId) as count FROM products 
-       WHERE listingType = 'NABIZIM' AND isSold = 0`
-    ) as any[]
-
-    const payload = {
-      totalActive: parseInt(totalActive.count) || 0,
-      newLast24h: parseInt(newLast24h.count) || 0,
-      newLast7d: parseInt(newLast7d.count) || 0,
-      newLast30d: parseInt(newLast30d.count) || 0,
-      totalViews: parseInt(totalViews.total) || 0,
-      avgViews,
-      activeSellers: parseInt(activeSellers.count) || 0,
-    }
-
-    if (cacheTtl > 0) {
-      await setCache(cacheKey, payload, cacheTtl)
-    }
+    // Po měkkém TTL se vrací starý souhrn a obnoví ho jediný požadavek
+    const { value: payload } = await getOrRevalidate('stats:summary', loadStatsSummary, {
+      ttlSeconds: Number(process.env.STATS_CACHE_TTL_SECONDS || 120),
+      staleSeconds: Number(process.env.STATS_CACHE_STALE_SECONDS || 600),
+    })
 
     return NextResponse.json(payload)
   } catch (error) {
@@ -92,3 +29,20 @@ export async function GET(request: NextRequest) {
     )
   }
 }
+
+// Všechny hodnoty jsou průběžně udržované čítače (lib/stats.ts) - žádné agregace přes products
+async function loadStatsSummary() {
+  startStatsReconciler()
+  const stats = await readMarketplaceStats()
+
+  return {
+    totalActive: stats.offersOpen,
+    newLast24h: stats.newLast24h,
+    newLast7d: stats.newLast7d,
+    newLast30d: stats.newLast30d,
+    totalViews: stats.offerViews,
+    // Průměrný počet zobrazení na produkt
+    avgViews: stats.offersOpen > 0 ? Math.round(stats.offerViews / stats.offersOpen) : 0,
+    activeSellers: stats.offerSellers,
+  }
+}
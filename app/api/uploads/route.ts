@@ -0,0 +1,50 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getServerSession } from 'next-auth'
+import { authOptions } from '@/lib/auth'
+import { UploadError } from '@/lib/multipart'
+import { createUploadSession, isDirectUploadAvailable } from '@/lib/upload-sessions'
+
+export const dynamic = 'force-dynamic'
+
+// POST - relace pro přímé nahrání obrázků do úložiště (lib/upload-sessions.ts)
+// Tělo: { purpose: 'products', files: [{ size, contentType, sha256 }] }
+export async function POST(request: NextRequest) {
+  try {
+    const session = await getServerSession(authOptions)
+
+    if (!(session?.user as any)?.id) {
+      return NextResponse.json(
+        { message: 'Neautorizovaný přístup' },
+        { status: 401 }
+      )
+    }
+
+    // Lokální úložiště přímé nahrávání nemá - klient pošle obrázky ve formuláři
+    if (!isDirectUploadAvailable()) {
+      return NextResponse.json(
+        { message: 'Přímé nahrávání není k dispozici' },
+        { status: 501 }
+      )
+    }
+
+    const body = await request.json().catch(() => null)
+    if (!body || typeof body !== 'object') {
+      return NextResponse.json(
+        { message: 'Neplatný požadavek' },
+        { status: 400 }
+      )
+    }
+
+    const uploadSession = await createUploadSession((session!.user as any).id, body.purpose, body.files)
+    return NextResponse.json(uploadSession, { status: 201 })
+  } catch (error) {
+    if (error instanceof UploadError) {
+      return NextResponse.json({ message: error.message }, { status: error.status })
+    }
+    console.error('Upload session error:', error)
+    return NextResponse.json(
+      { message: 'Nastala chyba při přípravě nahrávání' },
+      { status: 500 }
+    )
+  }
+}
@@ -3,6 +3,7 @@ import { getServerSession } from 'next-auth'
 import { authOptions } from '@/lib/auth'
 import { query, update } from '@/lib/mysql'
 import { sanitizeInput } from '@/lib/utils'
+import { invalidateSellerCaches } from '@/lib/products'
 
 // Force dynamic rendering - requires session data
 export const dynamic = 'force-dynamic'
@@ -116,6 +117,8 @@ export async function PUT(request: NextRequest) {
         )
       }
 
+      await invalidateSellerCaches(userId)
+
       // Získání aktualizovaných dat
       const updatedUser = await query(
         'SELECT id, name, email, image, phone, nickname, city, bio, isVerified, createdAt FROM users WHERE id = ?',
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useSession } from 'next-auth/react'
 import { useSearchParams } from 'next/navigation'
 import { Footer } from '@/components/layout/Footer'
@@ -11,6 +11,9 @@ import Image from 'next/image'
 import { CloseChatDialog } from '@/components/ui/CloseChatDialog'
 import { ConfirmationDialog } from '@/components/ui/ConfirmationDialog'
 
+const CONVERSATIONS_PAGE_SIZE = 30
+const MESSAGES_PAGE_SIZE = 50
+
 interface UploadedFile {
   file: File
   preview: string
@@ -19,10 +22,19 @@ interface UploadedFile {
 
 export default function MessagesPage() {
   const { data: session, status } = useSession()
+  const sessionUserId: string | undefined = (session?.user as any)?.id
   const searchParams = useSearchParams()
   const [conversations, setConversations] = useState<any[]>([])
+  const [conversationsCursor, setConversationsCursor] = useState<string | null>(null)
+  // Stream zpráv se otevírá až po první stránce inboxu - potřebuje id nejnovější známé zprávy
+  const [inboxLoaded, setInboxLoaded] = useState(false)
   const [messages, setMessages] = useState<any[]>([])
+  const [messagesCursor, setMessagesCursor] = useState<string | null>(null)
+  const messagesRef = useRef<any[]>([])
   const [selectedConversation, setSelectedConversation] = useState<string | null>(null)
+  // Aktuální výběr pro handler streamu (registruje se jednou, state by v něm zastaral)
+  const selectedConversationRef = useRef<string | null>(null)
+  const conversationsRef = useRef<any[]>([])
   const [newMessage, setNewMessage] = useState('')
   const [isLoading, setIsLoading] = useState(true)
   const [uploadedFiles, setUploadedFiles] = useState<UploadedFile[]>([])
@@ -37,24 +49,53 @@ export default function MessagesPage() {
     }
   }, [status])
 
-  // Načíst konverzace při načtení stránky
   useEffect(() => {
-    const fetchConversations = async () => {
-      if (status === 'loading') return
-      if (!session) return
-      
-      try {
-        const response = await fetch('/api/conversations')
-        if (response.ok) {
-          const data = await response.json()
-          setConversations(data.conversations || [])
+    conversationsRef.current = conversations
+  }, [conversations])
+
+  useEffect(() => {
+    messagesRef.current = messages
+  }, [messages])
+
+  // Inbox je stránkovaný - bez cursoru načte první stránku a nahradí seznam, s cursorem přidá další
+  const loadConversations = async (cursor?: string | null) => {
+    try {
+      const params = new URLSearchParams({ limit: String(CONVERSATIONS_PAGE_SIZE) })
+      if (cursor) params.set('cursor', cursor)
+      const response = await fetch(`/api/conversations?${params.toString()}`)
+      if (response.ok) {
+        const data = await response.json()
+        const page = data.conversations || []
+        setConversations(prev => cursor ? [...prev, ...page.filter((c: any) => !prev.some(p => p.id === c.id))] : page)
+        setConversationsCursor(data.pagination?.nextCursor || null)
+      }
+    } catch (error) {
+      console.error('Chyba při načítání konverzací:', error)
+    }
+  }
+
+  // Otevřená konverzace nemusí být na první stránce inboxu - načte se samostatně
+  const ensureConversationLoaded = async (conversationId: string) => {
+    try {
+      const response = await fetch(`/api/conversations?conversationId=${encodeURIComponent(conversationId)}`)
+      if (response.ok) {
+        const data = await response.json()
+        const conversation = (data.conversations || [])[0]
+        if (conversation) {
+          setConversations(prev => prev.some(c => c.id === conversation.id) ? prev : [conversation, ...prev])
         }
-      } catch (error) {
-        console.error('Chyba při načítání konverzací:', error)
       }
+    } catch (error) {
+      console.error('Chyba při načítání konverzace:', error)
     }
-    
-    fetchConversations()
+  }
+
+  // Načíst konverzace při načtení stránky
+  useEffect(() => {
+    if (status === 'loading') return
+    if (!session) return
+
+    loadConversations().then(() => setInboxLoaded(true))
   }, [session, status])
 
   // Zkontrolovat, jestli jsou v URL query parametry pro vytvoření konverzace
@@ -83,11 +124,8 @@ export default function MessagesPage() {
             const data = await response.json()
             setSelectedConversation(data.conversationId)
             // Načíst aktualizovaný seznam konverzací
-            const conversationsResponse = await fetch('/api/conversations')
-            if (conversationsResponse.ok) {
-              const conversationsData = await conversationsResponse.json()
-              setConversations(conversationsData.conversations || [])
-            }
+            await loadConversations()
+            await ensureConversationLoaded(data.conversationId)
             // Vyčistit URL parametry
             window.history.replaceState({}, '', '/messages')
           } else {
@@ -102,28 +140,147 @@ export default function MessagesPage() {
     createOrGetConversation()
   }, [searchParams, session, status])
 
-  // Načíst zprávy při výběru konverzace
-  useEffect(() => {
-    const fetchMessages = async () => {
-      if (!selectedConversation) {
-        setMessages([])
-        return
+  // Historie je stránkovaná od nejnovějších zpráv - bez cursoru poslední stránka, s cursorem starší
+  const loadMessages = async (conversationId: string, cursor?: string | null) => {
+    try {
+      const params = new URLSearchParams({ conversationId, limit: String(MESSAGES_PAGE_SIZE) })
+      if (cursor) params.set('cursor', cursor)
+      const response = await fetch(`/api/messages?${params.toString()}`)
+      if (response.ok) {
+        const data = await response.json()
+        // Mezitím mohl uživatel přepnout konverzaci
+        if (selectedConversationRef.current !== conversationId) return
+        const page = data.messages || []
+        setMessages(prev => cursor ? [...page.filter((m: any) => !prev.some(p => p.id === m.id)), ...prev] : page)
+        setMessagesCursor(data.pagination?.nextCursor || null)
       }
+    } catch (error) {
+      console.error('Chyba při načítání zpráv:', error)
+    }
+  }
 
-      try {
-        const response = await fetch(`/api/messages?conversationId=${selectedConversation}`)
-        if (response.ok) {
-          const data = await response.json()
-          setMessages(data.messages || [])
+  // Po výpadku streamu stačí dočíst zprávy novější než poslední zobrazená
+  const loadNewerMessages = async (conversationId: string) => {
+    const current = messagesRef.current
+    const last = current[current.length - 1]
+    if (!last) return loadMessages(conversationId)
+
+    try {
+      let since = last.id
+      let hasNext = true
+      while (hasNext) {
+        const params = new URLSearchParams({ conversationId, since, limit: String(MESSAGES_PAGE_SIZE) })
+        const response = await fetch(`/api/messages?${params.toString()}`)
+        if (!response.ok) {
+          // Poslední zpráva už neexistuje - načíst historii znovu
+          return loadMessages(conversationId)
         }
-      } catch (error) {
-        console.error('Chyba při načítání zpráv:', error)
+        const data = await response.json()
+        if (selectedConversationRef.current !== conversationId) return
+        const page = data.messages || []
+        setMessages(prev => [...prev, ...page.filter((m: any) => !prev.some(p => p.id === m.id))])
+        hasNext = !!data.pagination?.hasNext && page.length > 0
+        if (page.length > 0) since = page[page.length - 1].id
       }
+    } catch (error) {
+      console.error('Chyba při načítání zpráv:', error)
+    }
+  }
+
+  // Načíst zprávy při výběru konverzace
+  useEffect(() => {
+    selectedConversationRef.current = selectedConversation
+    setMessagesCursor(null)
+    if (!selectedConversation) {
+      setMessages([])
+      return
     }
 
-    fetchMessages()
+    loadMessages(selectedConversation)
   }, [selectedConversation])
 
+  // Nejnovější zpráva, kterou stránka už zná (inbox i otevřená konverzace), podle pořadí streamu
+  const newestKnownMessageId = () => {
+    const candidates = [
+      ...conversationsRef.current.map(c => ({ id: c.lastMessageId as string | null, createdAt: c.lastMessageAt })),
+      ...messagesRef.current.map(m => ({ id: m.id as string | null, createdAt: m.createdAt })),
+    ]
+    let newest: { id: string; at: number } | null = null
+    for (const candidate of candidates) {
+      if (!candidate.id || !candidate.createdAt) continue
+      const at = new Date(candidate.createdAt).getTime()
+      if (!newest || at > newest.at || (at === newest.at && candidate.id > newest.id)) {
+        newest = { id: candidate.id, at }
+      }
+    }
+    return newest ? newest.id : null
+  }
+
+  // Nové zprávy chodí přes Server-Sent Events - bez opakovaného dotazování API.
+  // Stream se otevře až po načtení první stránky inboxu a pošle ?lastEventId= s nejnovější známou
+  // zprávou, takže server doručí i zprávy, které přišly mezi načtením inboxu a připojením. Bez známé
+  // zprávy (prázdný inbox) se po připojení inbox načte znovu. Po výpadku se EventSource připojí sám
+  // a pošle Last-Event-ID. resync = navázat nešlo, data se načtou znovu.
+  // Stream je vázaný na uživatele - nový objekt session (obnova při fokusu okna) ho neotevírá znovu.
+  useEffect(() => {
+    if (!sessionUserId || !inboxLoaded) return
+    if (typeof window === 'undefined' || !('EventSource' in window)) return
+
+    const lastEventId = newestKnownMessageId()
+    const source = new EventSource(
+      lastEventId
+        ? `/api/messages/stream?lastEventId=${encodeURIComponent(lastEventId)}`
+        : '/api/messages/stream'
+    )
+
+    if (!lastEventId) {
+      let resynced = false
+      source.addEventListener('open', () => {
+        if (resynced) return
+        resynced = true
+        loadConversations()
+        if (selectedConversationRef.current) loadNewerMessages(selectedConversationRef.current)
+      })
+    }
+
+    source.addEventListener('message', (event) => {
+      let message: any
+      try {
+        message = JSON.parse((event as MessageEvent).data)
+      } catch {
+        return
+      }
+
+      if (message.conversationId === selectedConversationRef.current) {
+        setMessages(prev => prev.some(m => m.id === message.id) ? prev : [...prev, message])
+      }
+
+      // Konverzace s novou zprávou na začátek inboxu; neznámá (nová nebo na další stránce) se dočte
+      if (!conversationsRef.current.some(c => c.id === message.conversationId)) {
+        ensureConversationLoaded(message.conversationId)
+        return
+      }
+      setConversations(prev => {
+        const conversation = prev.find(c => c.id === message.conversationId)
+        if (!conversation) return prev
+        const updated = {
+          ...conversation,
+          lastMessageId: message.id,
+          lastMessage: String(message.content || '').slice(0, 255),
+          lastMessageAt: message.createdAt,
+        }
+        return [updated, ...prev.filter(c => c.id !== message.conversationId)]
+      })
+    })
+
+    source.addEventListener('resync', () => {
+      loadConversations()
+      if (selectedConversationRef.current) loadNewerMessages(selectedConversationRef.current)
+    })
+
+    return () => source.close()
+  }, [sessionUserId, inboxLoaded])
+
   // Zkontrolovat uzavřené konverzace při výběru konverzace
   useEffect(() => {
     const checkClosedConversation = () => {
@@ -270,7 +427,8 @@ export default function MessagesPage() {
           receiverId: receiverId,
           isOwn: true
         }
-        setMessages(prev => [...prev, newMsg])
+        // Stejná zpráva může dorazit i přes stream dřív než odpověď
+        setMessages(prev => prev.some(m => m.id === newMsg.id) ? prev : [...prev, newMsg])
         
         // Resetovat form
         setNewMessage('')
@@ -427,6 +585,13 @@ export default function MessagesPage() {
                         </div>
                       </div>
                     ))}
+                    {conversationsCursor && (
+                      <div className="p-4 text-center">
+                        <Button variant="outline" size="sm" onClick={() => loadConversations(conversationsCursor)}>
+                          Načíst další konverzace
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 </CardContent>
               </Card>
@@ -496,6 +661,13 @@ export default function MessagesPage() {
                       </p>
                     </div>
                   )}
+                  {messagesCursor && selectedConversation && (
+                    <div className="text-center">
+                      <Button variant="outline" size="sm" onClick={() => loadMessages(selectedConversation, messagesCursor)}>
+                        Načíst starší zprávy
+                      </Button>
+                    </div>
+                  )}
                   {messages.map((message) => {
                     const currentUserId = session?.user ? (session.user as any).id : null
                     const isOwn = message.senderId === currentUserId
@@ -711,11 +883,7 @@ export default function MessagesPage() {
 
               if (response.ok) {
                 // Odstranit konverzaci z lokálního seznamu a načíst aktualizovaný seznam
-                const conversationsResponse = await fetch('/api/conversations')
-                if (conversationsResponse.ok) {
-                  const conversationsData = await conversationsResponse.json()
-                  setConversations(conversationsData.conversations || [])
-                }
+                await loadConversations()
               }
             } catch (error) {
               console.error('Chyba při skrývání konverzace:', error)
@@ -742,11 +910,7 @@ export default function MessagesPage() {
 
               if (response.ok) {
                 // Odstranit konverzaci z lokálního seznamu a načíst aktualizovaný seznam
-                const conversationsResponse = await fetch('/api/conversations')
-                if (conversationsResponse.ok) {
-                  const conversationsData = await conversationsResponse.json()
-                  setConversations(conversationsData.conversations || [])
-                }
+                await loadConversations()
               }
             } catch (error) {
               console.error('Chyba při skrývání konverzace:', error)
@@ -8,6 +8,7 @@ import { Footer } from '@/components/layout/Footer'
 import { Card, CardContent, CardHeader } from '@/components/ui/Card'
 import { Button } from '@/components/ui/Button'
 import { Badge } from '@/components/ui/Badge'
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage'
 import { 
   MapPin, 
   Clock, 
@@ -23,6 +24,7 @@ import {
   Phone
 } from 'lucide-react'
 import { formatPrice } from '@/lib/utils'
+import type { ImageVariantMap } from '@/lib/images'
 
 interface Product {
   id: string
@@ -31,6 +33,8 @@ interface Product {
   price: number
   mainImage?: string | null
   images: string[]
+  // Varianty obrázků podle URL originálu (lib/images.ts)
+  imageVariants?: ImageVariantMap
   location: string
   condition: string
   category: string
@@ -291,13 +295,12 @@ export default function ProductDetailPage() {
                             : null)
                       
                       return mainImageSrc ? (
-                        <Image
+                        <ResponsiveImage
                           src={mainImageSrc}
+                          variants={product.imageVariants?.[mainImageSrc]}
                           alt={product.title}
-                          width={600}
-                          height={600}
+                          sizes="(min-width: 1024px) 50vw, 100vw"
                           className="w-full h-full object-cover"
-                          unoptimized
                         />
                       ) : (
                         <div className="w-full h-full flex items-center justify-center">
@@ -341,13 +344,12 @@ export default function ProductDetailPage() {
                                 : 'border-transparent hover:border-gray-300'
                             }`}
                           >
-                            <Image
+                            <ResponsiveImage
                               src={image}
+                              variants={product.imageVariants?.[image]}
                               alt={`${product.title} - obrázek ${index + 1}`}
-                              width={150}
-                              height={150}
+                              sizes="150px"
                               className="w-full h-full object-cover"
-                              unoptimized
                             />
                           </button>
                         )
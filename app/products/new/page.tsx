@@ -5,6 +5,7 @@ import { Footer } from '@/components/layout/Footer'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/Card'
 import { Button } from '@/components/ui/Button'
 import { useNotificationActions } from '@/lib/useNotificationActions'
+import { uploadImagesDirect } from '@/lib/direct-upload'
 import { Upload, X, Plus } from 'lucide-react'
 
 export default function NewProductPage() {
@@ -89,9 +90,15 @@ export default function NewProductPage() {
 				}
 			}
 			
-			// Odeslat obrázky v původním pořadí - hlavní obrázek se označí samostatně
-			for (const file of files) {
-				formData.append('images', file)
+			// Obrázky jdou přímo do úložiště (S3), formulář nese jen id relace; bez S3 se pošlou
+			// ve formuláři v původním pořadí - hlavní obrázek se označí samostatně
+			const uploadSessionId = files.length > 0 ? await uploadImagesDirect('products', files) : null
+			if (uploadSessionId) {
+				formData.append('uploadSessionId', uploadSessionId)
+			} else {
+				for (const file of files) {
+					formData.append('images', file)
+				}
 			}
 			
 			// Odeslat index hlavního obrázku (pokud je vybrán)
@@ -118,7 +125,7 @@ export default function NewProductPage() {
       }
     } catch (error) {
       console.error('Product creation error:', error)
-      notifyProductError('Chyba při vytváření inzerátu')
+      notifyProductError(error instanceof Error && error.message ? error.message : 'Chyba při vytváření inzerátu')
     } finally {
       setIsSubmitting(false)
     }
@@ -11,6 +11,8 @@ import { LoadingSpinner } from '@/components/ui/LoadingSpinner'
 import { ServiceSearch } from '@/components/services/ServiceSearch'
 import { MapPin, Mail, Phone, Star, Wrench, Edit } from 'lucide-react'
 import Image from 'next/image'
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage'
+import type { ImageVariantSet } from '@/lib/images'
 import { useNotifications } from '@/lib/NotificationContext'
 import { EditServiceFormModal } from './EditServiceFormModal'
 
@@ -24,6 +26,7 @@ interface Service {
   contactPhone?: string
   image?: string
   additionalImages?: string[] | null
+  mainImageVariants?: ImageVariantSet | null
   rating?: number
   reviewCount?: number
   createdAt: string
@@ -154,11 +157,12 @@ export default function ServicesPage() {
                   {/* Obrázek servisu */}
                   <div className="relative w-full h-48 bg-gray-200 dark:bg-gray-700">
                     {service.image ? (
-                      <Image
+                      <ResponsiveImage
                         src={service.image}
+                        variants={service.mainImageVariants}
                         alt={service.name}
-                        fill
-                        className="object-cover"
+                        sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                        className="absolute inset-0 w-full h-full object-cover"
                       />
                     ) : (
                       <div className="w-full h-full flex items-center justify-center">
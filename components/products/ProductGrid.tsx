@@ -13,12 +13,14 @@ import {
   List,
   Package
 } from 'lucide-react'
-import Image from 'next/image'
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage'
 import Link from 'next/link'
 import { formatPrice } from '@/lib/utils'
+import type { ImageVariantSet } from '@/lib/images'
 
 interface Product {
   mainImage?: string | null
+  mainImageVariants?: ImageVariantSet | null
   id: string
   title: string
   description: string
@@ -214,13 +216,12 @@ export function ProductGrid({ searchParams }: ProductGridProps) {
                       : null)
                 return cover ? (
                 <Link href={`/products/${product.id}`}>
-                <Image
+                <ResponsiveImage
                     src={cover}
+                    variants={product.mainImageVariants}
                   alt={product.title}
-                  width={400}
-                    height={256}
+                    sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
                     className="w-full h-64 object-cover cursor-pointer"
-                    unoptimized
                 />
                 </Link>
               ) : (
@@ -38,6 +38,7 @@ const locations = [
 ]
 
 const sortOptions = [
+  { value: 'relevance', label: 'Nejrelevantnější' },
   { value: 'newest', label: 'Nejnovější' },
   { value: 'oldest', label: 'Nejstarší' },
   { value: 'price-low', label: 'Cena: od nejnižší' },
@@ -3,7 +3,7 @@
 import { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import Link from 'next/link'
-import Image from 'next/image'
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage'
 import { Card, CardContent, CardFooter } from '@/components/ui/Card'
 import { Button } from '@/components/ui/Button'
 import { Badge } from '@/components/ui/Badge'
@@ -135,13 +135,12 @@ export function FeaturedProducts() {
                         : null)
                   return cover ? (
                     <Link href={`/products/${product.id}`}>
-                      <Image
+                      <ResponsiveImage
                         src={cover}
+                        variants={product.mainImageVariants}
                         alt={product.title}
-                        width={400}
-                        height={256}
+                        sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
                         className="w-full h-64 object-cover cursor-pointer"
-                        unoptimized
                       />
                     </Link>
                   ) : (
@@ -0,0 +1,47 @@
+import type { ImageVariantSet } from '@/lib/images'
+
+interface ResponsiveImageProps {
+  src: string
+  variants?: ImageVariantSet | null
+  alt: string
+  // Šířka obrázku na stránce - podle ní prohlížeč vybere velikost ze srcset
+  sizes: string
+  className?: string
+}
+
+// Obrázek s variantami z lib/images.ts: AVIF, WebP a originál jako záloha.
+// Bez variant (ještě se generují nebo obrázek nešel zpracovat) se zobrazí originál.
+export function ResponsiveImage({ src, variants, alt, sizes, className }: ResponsiveImageProps) {
+  if (!variants) {
+    return <img src={src} alt={alt} className={className} loading="lazy" decoding="async" />
+  }
+
+  // Malý originál má pro víc velikostí stejný soubor - v srcset stačí jednou
+  const srcSet = (format: 'webp' | 'avif') => {
+    const seen: { [width: number]: boolean } = {}
+    return [variants.thumb, variants.card, variants.full]
+      .filter((variant) => {
+        if (seen[variant.width]) return false
+        seen[variant.width] = true
+        return true
+      })
+      .map((variant) => `${variant[format]} ${variant.width}w`)
+      .join(', ')
+  }
+
+  return (
+    <picture>
+      <source type="image/avif" srcSet={srcSet('avif')} sizes={sizes} />
+      <source type="image/webp" srcSet={srcSet('webp')} sizes={sizes} />
+      <img
+        src={src}
+        alt={alt}
+        width={variants.card.width}
+        height={variants.card.height}
+        className={className}
+        loading="lazy"
+        decoding="async"
+      />
+    </picture>
+  )
+}
@@ -70,6 +70,8 @@ CREATE TABLE IF NOT EXISTS products (
   `condition` VARCHAR(191) NOT NULL,
   mainImage VARCHAR(512),
   images JSON,
+  -- Zmenšené varianty obrázků { "<URL originálu>": { thumb, card, full } } (lib/images.ts)
+  imageVariants JSON,
   location VARCHAR(191),
   isActive BOOLEAN NOT NULL DEFAULT true,
   isSold BOOLEAN NOT NULL DEFAULT false,
@@ -77,11 +79,26 @@ CREATE TABLE IF NOT EXISTS products (
   createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
   updatedAt DATETIME(3) NOT NULL,
   userId VARCHAR(191) NOT NULL,
+  -- Text pro fulltextové hledání (bez diakritiky a velikosti písmen díky ai_ci), udržuje ho MySQL
+  searchText TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci
+    GENERATED ALWAYS AS (CONCAT_WS(' ', title, subcategory, description)) STORED INVISIBLE,
   FOREIGN KEY (userId) REFERENCES users(id) ON DELETE CASCADE,
+  FULLTEXT INDEX ft_products_search (searchText),
   INDEX idx_products_listingType_isSold (listingType, isSold),
   INDEX idx_products_createdAt (createdAt),
-  INDEX idx_products_category_listingType (category, listingType),
-  INDEX idx_products_price (price),
+  -- Výpis inzerátů: rovnostní filtry (isActive, isSold, listingType, category) + sloupec řazení, viz lib/products.ts
+  INDEX idx_products_active_createdAt (isActive, isSold, createdAt, id),
+  INDEX idx_products_active_price (isActive, isSold, price, id),
+  INDEX idx_products_active_title (isActive, isSold, title, id),
+  INDEX idx_products_active_lt_createdAt (isActive, isSold, listingType, createdAt, id),
+  INDEX idx_products_active_lt_price (isActive, isSold, listingType, price, id),
+  INDEX idx_products_active_lt_title (isActive, isSold, listingType, title, id),
+  INDEX idx_products_active_cat_createdAt (isActive, isSold, category, createdAt, id),
+  INDEX idx_products_active_cat_price (isActive, isSold, category, price, id),
+  INDEX idx_products_active_cat_title (isActive, isSold, category, title, id),
+  INDEX idx_products_active_lt_cat_createdAt (isActive, isSold, listingType, category, createdAt, id),
+  INDEX idx_products_active_lt_cat_price (isActive, isSold, listingType, category, price, id),
+  INDEX idx_products_active_lt_cat_title (isActive, isSold, listingType, category, title, id),
   INDEX idx_products_location (location),
   INDEX idx_products_condition (`condition`),
   INDEX idx_products_userId (userId)
@@ -95,12 +112,22 @@ CREATE TABLE IF NOT EXISTS conversations (
   participant2Id VARCHAR(191) NOT NULL,
   createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
   updatedAt DATETIME(3) NOT NULL,
+  closedById VARCHAR(191) NULL,
+  closeReason TEXT NULL,
+  closedAt DATETIME(3) NULL,
+  hiddenForUserId VARCHAR(191) NULL,
+  -- Poslední zpráva pro inbox (udržuje POST /api/messages); bez zpráv je lastMessageAt čas založení
+  lastMessageId VARCHAR(191) NULL,
+  lastMessageAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  lastMessagePreview VARCHAR(255) NULL,
   FOREIGN KEY (productId) REFERENCES products(id) ON DELETE CASCADE,
   FOREIGN KEY (participant1Id) REFERENCES users(id) ON DELETE CASCADE,
   FOREIGN KEY (participant2Id) REFERENCES users(id) ON DELETE CASCADE,
   UNIQUE KEY conversations_productId_participant1Id_participant2Id_key (productId, participant1Id, participant2Id),
   INDEX idx_conversations_updatedAt (updatedAt),
-  INDEX idx_conversations_participants (participant1Id, participant2Id)
+  INDEX idx_conversations_participants (participant1Id, participant2Id),
+  INDEX idx_conversations_inbox_participant1 (participant1Id, lastMessageAt, id),
+  INDEX idx_conversations_inbox_participant2 (participant2Id, lastMessageAt, id)
 );
 
 -- Tabulka zpráv
@@ -128,6 +155,7 @@ CREATE TABLE IF NOT EXISTS services (
   contactPhone VARCHAR(191),
   image VARCHAR(512),
   additionalImages JSON,
+  imageVariants JSON,
   rating DECIMAL(3,2) DEFAULT NULL,
   reviewCount INT NOT NULL DEFAULT 0,
   isActive BOOLEAN NOT NULL DEFAULT true,
@@ -173,3 +201,76 @@ CREATE TABLE IF NOT EXISTS reports (
   updatedAt DATETIME(3) NOT NULL,
   FOREIGN KEY (userId) REFERENCES users(id) ON DELETE SET NULL
 );
+
+-- Průběžně udržované statistiky tržiště (lib/stats.ts), naplnění: npm run stats:reconcile
+CREATE TABLE IF NOT EXISTS stats_counters (
+  name VARCHAR(64) PRIMARY KEY,
+  value BIGINT NOT NULL DEFAULT 0,
+  updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+);
+
+INSERT IGNORE INTO stats_counters (name, value) VALUES
+  ('productsTotal', 0), ('productsActive', 0), ('productsInactive', 0),
+  ('offersOpen', 0), ('offerViews', 0), ('offerSellers', 0), ('usersTotal', 0);
+
+-- Otevřené nabídky podle hodiny vytvoření (okna 24h / 7d / 30d)
+CREATE TABLE IF NOT EXISTS stats_listing_buckets (
+  bucketStart DATETIME PRIMARY KEY,
+  listings INT NOT NULL DEFAULT 0
+);
+
+-- Počet otevřených nabídek na prodejce (počet aktivních prodejců)
+CREATE TABLE IF NOT EXISTS stats_sellers (
+  userId VARCHAR(191) PRIMARY KEY,
+  listings INT NOT NULL DEFAULT 0
+);
+
+-- Soubory adresované hashem obsahu (lib/storage.ts); stejný obsah je v úložišti jen jednou
+CREATE TABLE IF NOT EXISTS stored_objects (
+  hash CHAR(64) PRIMARY KEY,
+  storageKey VARCHAR(512) NOT NULL,
+  url VARCHAR(512) NOT NULL,
+  size BIGINT NOT NULL,
+  contentType VARCHAR(100) NOT NULL,
+  createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  INDEX idx_stored_objects_url (url),
+  INDEX idx_stored_objects_updatedAt (updatedAt)
+);
+
+-- Odkazy inzerátů, servisů a recenzí na uložené soubory; objekty bez odkazů uklízí npm run storage:gc
+CREATE TABLE IF NOT EXISTS stored_object_refs (
+  ownerType ENUM('product', 'service', 'review') NOT NULL,
+  ownerId VARCHAR(191) NOT NULL,
+  hash CHAR(64) NOT NULL,
+  createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  PRIMARY KEY (ownerType, ownerId, hash),
+  INDEX idx_stored_object_refs_hash (hash),
+  FOREIGN KEY (hash) REFERENCES stored_objects(hash)
+);
+
+-- Relace přímého nahrávání obrázků do S3 přes podepsané URL (lib/upload-sessions.ts)
+CREATE TABLE IF NOT EXISTS upload_sessions (
+  id CHAR(32) PRIMARY KEY,
+  userId VARCHAR(191) NOT NULL,
+  purpose VARCHAR(32) NOT NULL,
+  status ENUM('pending', 'committed', 'rejected') NOT NULL DEFAULT 'pending',
+  expiresAt DATETIME(3) NOT NULL,
+  createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  committedAt DATETIME(3) NULL,
+  INDEX idx_upload_sessions_user_createdAt (userId, createdAt),
+  INDEX idx_upload_sessions_expiresAt (expiresAt),
+  FOREIGN KEY (userId) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS upload_session_files (
+  sessionId CHAR(32) NOT NULL,
+  fileIndex INT NOT NULL,
+  hash CHAR(64) NOT NULL,
+  storageKey VARCHAR(512) NOT NULL,
+  size BIGINT NOT NULL,
+  contentType VARCHAR(100) NOT NULL,
+  PRIMARY KEY (sessionId, fileIndex),
+  INDEX idx_upload_session_files_storageKey (storageKey),
+  FOREIGN KEY (sessionId) REFERENCES upload_sessions(id) ON DELETE CASCADE
+);
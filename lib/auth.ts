@@ -1,6 +1,45 @@
 import { NextAuthOptions } from 'next-auth'
 import GoogleProvider from 'next-auth/providers/google'
-import { queryOne, insert, query } from '@/lib/mysql'
+import CredentialsProvider from 'next-auth/providers/credentials'
+import { timingSafeEqual } from 'crypto'
+import { queryOne, insert, query, update } from '@/lib/mysql'
+import { invalidateSellerCaches } from '@/lib/products'
+
+// Přihlášení pro E2E testy (testsprite_tests/auth_state.py) - aktivní jen pokud je nastaven E2E_LOGIN_SECRET.
+// V produkci tuto proměnnou nikdy nenastavujte.
+const e2eLoginSecret = process.env.E2E_LOGIN_SECRET
+
+function isValidE2eSecret(value: string | undefined) {
+  if (!e2eLoginSecret || !value) return false
+  const expected = Buffer.from(e2eLoginSecret)
+  const received = Buffer.from(value)
+  return expected.length === received.length && timingSafeEqual(expected, received)
+}
+
+const e2eProviders = e2eLoginSecret
+  ? [
+      CredentialsProvider({
+        id: 'e2e',
+        name: 'E2E',
+        credentials: {
+          email: { label: 'Email', type: 'email' },
+          secret: { label: 'Secret', type: 'password' },
+        },
+        async authorize(credentials) {
+          if (!credentials?.email || !isValidE2eSecret(credentials.secret)) {
+            return null
+          }
+
+          // Pouze existující, nezablokovaní uživatelé (viz scripts/seed-dummy-data.js)
+          const user = await queryOne(
+            'SELECT id, name, email, image FROM users WHERE email = ? AND isBanned = 0',
+            [credentials.email]
+          )
+          return user || null
+        },
+      }),
+    ]
+  : []
 
 export const authOptions: NextAuthOptions = {
   providers: [
@@ -8,6 +47,7 @@ export const authOptions: NextAuthOptions = {
       clientId: process.env.GOOGLE_CLIENT_ID!,
       clientSecret: process.env.GOOGLE_CLIENT_SECRET!,
     }),
+    ...e2eProviders,
   ],
   session: {
     strategy: 'jwt',
@@ -42,6 +82,10 @@ export const authOptions: NextAuthOptions = {
                 account?.provider === 'google' ? true : false
               ]
             )
+            // Čítač uživatelů pro statistiky (lib/stats.ts)
+            await update("UPDATE stats_counters SET value = value + 1 WHERE name = 'usersTotal'").catch((error) => {
+              console.error('Chyba při aktualizaci čítače uživatelů:', error)
+            })
             // Nastavit user.id pro JWT callback
             ;(user as any).id = userId
             console.log('✅ Nový uživatel vytvořen v databázi:', user.email)
@@ -91,6 +135,7 @@ export const authOptions: NextAuthOptions = {
                   `UPDATE users SET ${updateFields.join(', ')} WHERE id = ?`,
                   updateValues
                 )
+                await invalidateSellerCaches(existingUser.id)
                 console.log('✅ Profilová fotka a jméno aktualizovány z Google účtu:', user.email)
               }
             } catch (updateError) {
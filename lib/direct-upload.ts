@@ -0,0 +1,64 @@
+// Přímé nahrání obrázků z prohlížeče do úložiště (POST /api/uploads, lib/upload-sessions.ts).
+// Vrátí id relace pro formulář (uploadSessionId), null = přímé nahrávání není k dispozici
+// (lokální úložiště) a obrázky se pošlou ve formuláři jako dřív.
+
+const extensionTypes: Record<string, string> = {
+  '.jpg': 'image/jpeg',
+  '.jpeg': 'image/jpeg',
+  '.png': 'image/png',
+  '.webp': 'image/webp',
+  '.gif': 'image/gif',
+  '.heic': 'image/heic',
+  '.heif': 'image/heif',
+}
+
+// Typ podle prohlížeče, bez něj podle přípony (HEIC z iPhonu často typ nemá)
+function imageContentType(file: File) {
+  const type = (file.type || '').toLowerCase()
+  if (type === 'image/jpg' || type === 'image/pjpeg') return 'image/jpeg'
+  if (type === 'image/x-png') return 'image/png'
+  if (type.startsWith('image/')) return type
+  const name = (file.name || '').toLowerCase()
+  return extensionTypes[name.slice(name.lastIndexOf('.'))] || 'image/jpeg'
+}
+
+async function sha256Hex(file: File) {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer())
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => ('0' + byte.toString(16)).slice(-2))
+    .join('')
+}
+
+export async function uploadImagesDirect(purpose: 'products', files: File[]): Promise<string | null> {
+  const described = await Promise.all(
+    files.map(async (file) => ({ size: file.size, contentType: imageContentType(file), sha256: await sha256Hex(file) }))
+  )
+
+  const response = await fetch('/api/uploads', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ purpose, files: described }),
+  })
+  if (response.status === 501) return null
+  const data = await response.json()
+  if (!response.ok) {
+    throw new Error(data.message || 'Nahrávání obrázků se nepodařilo připravit')
+  }
+
+  await Promise.all(
+    data.uploads.map(async (entry: { index: number; upload: { method: string; url: string; headers: Record<string, string> } | null }) => {
+      // Obrázek, který už v úložišti je, se nenahrává
+      if (!entry.upload) return
+      const uploaded = await fetch(entry.upload.url, {
+        method: entry.upload.method,
+        headers: entry.upload.headers,
+        body: files[entry.index],
+      })
+      if (!uploaded.ok) {
+        throw new Error(`Obrázek ${files[entry.index].name} se nepodařilo nahrát`)
+      }
+    })
+  )
+
+  return data.sessionId
+}
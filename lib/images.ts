@@ -0,0 +1,162 @@
+import sharp from 'sharp'
+import { update } from '@/lib/mysql'
+import { StoredFile, mapWithConcurrency, objectUrl, readObject, storeObject } from '@/lib/storage'
+
+// Odvozené velikosti nahraných obrázků (WebP + AVIF) pro výpisy a detail.
+//
+// Originál z telefonu má jednotky MB, karta ve výpisu potřebuje obrázek ~640 px široký. Po uložení
+// inzerátu / servisu se z každého obrázku vygenerují velikosti IMAGE_VARIANT_WIDTHS v obou formátech
+// a zapíšou se do sloupce imageVariants vedle mainImage/images: { "<URL originálu>": ImageVariantSet }.
+//
+// Klíč v úložišti je odvozený z hashe obsahu (variants/<sha256>/<šířka>.<formát>, stejný hash jako
+// originál v stored_objects) - stejná fotka se zpracuje jen jednou a malý obrázek sdílí soubor pro
+// víc velikostí. Jako poslední se zapíše manifest.json s hotovou sadou - dokud existuje, originál se
+// znovu nenačítá ani nedekóduje. Varianty maže spolu s originálem garbage collector (lib/stored-objects.ts).
+// Obrázek, který sharp nedekóduje (např. HEIC bez podpory v libvips), varianty nemá a zobrazuje
+// se originál.
+
+export const IMAGE_VARIANT_WIDTHS = { thumb: 320, card: 640, full: 1600 }
+
+export type ImageVariantSize = keyof typeof IMAGE_VARIANT_WIDTHS
+export type ImageVariant = { width: number; height: number; webp: string; avif: string }
+export type ImageVariantSet = Record<ImageVariantSize, ImageVariant>
+export type ImageVariantMap = Record<string, ImageVariantSet>
+
+type VariantTable = 'products' | 'services'
+type VariantFormat = 'webp' | 'avif'
+
+const SIZES: ImageVariantSize[] = ['thumb', 'card', 'full']
+const WEBP_QUALITY = Number(process.env.IMAGE_WEBP_QUALITY || 78)
+const AVIF_QUALITY = Number(process.env.IMAGE_AVIF_QUALITY || 50)
+// Kolik obrázků jednoho inzerátu se zpracovává současně (sharp sám běží ve více vláknech)
+const IMAGE_VARIANT_CONCURRENCY = Math.max(1, Number(process.env.IMAGE_VARIANT_CONCURRENCY || 2))
+
+const contentTypes: Record<VariantFormat, string> = {
+  webp: 'image/webp',
+  avif: 'image/avif',
+}
+
+function render(source: Buffer, width: number, format: VariantFormat) {
+  // rotate() bez argumentu otočí podle EXIF - fotky z telefonu jinak leží na boku
+  const pipeline = sharp(source, { failOn: 'none' }).rotate().resize({ width, withoutEnlargement: true })
+  return format === 'webp'
+    ? pipeline.webp({ quality: WEBP_QUALITY }).toBuffer()
+    : pipeline.avif({ quality: AVIF_QUALITY, effort: 4 }).toBuffer()
+}
+
+export function imageVariantsPrefix(hash: string) {
+  return `variants/${hash}`
+}
+
+// Obrázek ke zpracování: URL originálu v záznamu, hash jeho obsahu a načtení originálu (volá se jen
+// tehdy, když varianty ještě neexistují)
+export type VariantSource = { url: string; hash: string; load: () => Promise<Buffer | null> }
+
+// Originál se čte z úložiště - dočasný soubor z nahrávání už v době generování nemusí existovat
+export function storedImageSource(stored: StoredFile): VariantSource {
+  return { url: stored.url, hash: stored.hash, load: () => readObject(stored.key) }
+}
+
+async function readManifest(key: string): Promise<ImageVariantSet | null> {
+  const raw = await readObject(key)
+  if (!raw) return null
+  try {
+    return JSON.parse(raw.toString('utf8'))
+  } catch {
+    return null
+  }
+}
+
+// Vygeneruje (nebo najde již vygenerované) velikosti obrázku. null = obrázek nelze načíst nebo dekódovat.
+export async function generateImageVariants(
+  hash: string,
+  load: () => Promise<Buffer | null>
+): Promise<ImageVariantSet | null> {
+  const manifestKey = `${imageVariantsPrefix(hash)}/manifest.json`
+  const existing = await readManifest(manifestKey)
+  if (existing) return existing
+
+  const source = await load()
+  if (!source) return null
+
+  let metadata: sharp.Metadata
+  try {
+    metadata = await sharp(source).metadata()
+  } catch (error) {
+    console.warn('[Images] Obrázek nelze dekódovat, varianty se negenerují:', error)
+    return null
+  }
+  if (!metadata.width || !metadata.height) return null
+
+  // Orientace 5-8 = obrázek se při rotate() otočí o 90°
+  const rotated = (metadata.orientation || 1) >= 5
+  const sourceWidth = rotated ? metadata.height : metadata.width
+  const sourceHeight = rotated ? metadata.width : metadata.height
+
+  const key = (width: number, format: VariantFormat) => `${imageVariantsPrefix(hash)}/${width}.${format}`
+
+  const variants = {} as ImageVariantSet
+  SIZES.forEach((size) => {
+    const width = Math.min(IMAGE_VARIANT_WIDTHS[size], sourceWidth)
+    variants[size] = {
+      width,
+      height: Math.max(1, Math.round((sourceHeight * width) / sourceWidth)),
+      webp: objectUrl(key(width, 'webp')),
+      avif: objectUrl(key(width, 'avif')),
+    }
+  })
+
+  try {
+    // Postupně - v paměti je vždy jen jeden výstup
+    for (const width of Array.from(new Set(SIZES.map((size) => variants[size].width)))) {
+      for (const format of ['webp', 'avif'] as VariantFormat[]) {
+        const body = await render(source, width, format)
+        await storeObject(key(width, format), body, contentTypes[format])
+      }
+    }
+    await storeObject(manifestKey, Buffer.from(JSON.stringify(variants)), 'application/json')
+  } catch (error) {
+    console.warn('[Images] Generování variant obrázku selhalo:', error)
+    return null
+  }
+
+  return variants
+}
+
+// Vygeneruje varianty obrázků záznamu a přidá je do jeho sloupce imageVariants. Volá se po uložení
+// záznamu (na pozadí) - vrací true, pokud se něco zapsalo (volající pak invaliduje cache).
+export async function recordImageVariants(table: VariantTable, id: string, images: VariantSource[]) {
+  const variants: ImageVariantMap = {}
+
+  await mapWithConcurrency(images, IMAGE_VARIANT_CONCURRENCY, async ({ url, hash, load }) => {
+    try {
+      const generated = await generateImageVariants(hash, load)
+      if (generated) variants[url] = generated
+    } catch (error) {
+      console.error(`[Images] Chyba při zpracování obrázku ${url}:`, error)
+    }
+  })
+
+  if (Object.keys(variants).length === 0) return false
+
+  // Sloučení s existujícími variantami - záznam mohl mezitím dostat další obrázky
+  await update(
+    `UPDATE ${table}
+     SET imageVariants = JSON_MERGE_PATCH(COALESCE(imageVariants, JSON_OBJECT()), CAST(? AS JSON))
+     WHERE id = ?`,
+    [JSON.stringify(variants), id]
+  )
+  return true
+}
+
+// Sloupec imageVariants z DB (podle driveru objekt nebo JSON řetězec)
+export function parseImageVariants(raw: unknown): ImageVariantMap {
+  if (!raw) return {}
+  if (typeof raw === 'object') return raw as ImageVariantMap
+  try {
+    const parsed = JSON.parse(String(raw))
+    return parsed && typeof parsed === 'object' && !Array.isArray(parsed) ? parsed : {}
+  } catch {
+    return {}
+  }
+}
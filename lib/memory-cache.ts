@@ -0,0 +1,102 @@
+// In-process LRU cache (L1) před Redis (L2), viz lib/redis.ts.
+//
+// Velikost je omezená v bajtech (velikost serializované hodnoty), ne počtem položek - jeden výpis
+// inzerátů má desítky kB, počet v cache má malou vypovídací hodnotu. Položky mají krátké TTL,
+// protože invalidace mezi instancemi (pub/sub) není zaručená při výpadku spojení.
+
+type Entry = {
+  value: unknown
+  bytes: number
+  expiresAt: number
+}
+
+export type MemoryCacheStats = {
+  hits: number
+  misses: number
+  evictions: number
+  expirations: number
+  invalidations: number
+  entries: number
+  bytes: number
+  maxBytes: number
+}
+
+export class MemoryCache {
+  // Map drží pořadí vložení - první položka je nejdéle nepoužitá
+  private entries = new Map<string, Entry>()
+  private bytes = 0
+  private counters = { hits: 0, misses: 0, evictions: 0, expirations: 0, invalidations: 0 }
+
+  constructor(private maxBytes: number) {}
+
+  get enabled() {
+    return this.maxBytes > 0
+  }
+
+  get<T>(key: string): T | undefined {
+    const entry = this.entries.get(key)
+    if (!entry) {
+      this.counters.misses++
+      return undefined
+    }
+
+    if (entry.expiresAt <= Date.now()) {
+      this.remove(key, entry)
+      this.counters.expirations++
+      this.counters.misses++
+      return undefined
+    }
+
+    // Přesun na konec = naposledy použitá
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    this.counters.hits++
+    return entry.value as T
+  }
+
+  set(key: string, value: unknown, bytes: number, ttlMs: number) {
+    if (!this.enabled || ttlMs <= 0) return
+    // Položka větší než čtvrtina cache by vytlačila všechno ostatní
+    if (bytes > this.maxBytes / 4) return
+
+    const existing = this.entries.get(key)
+    if (existing) this.remove(key, existing)
+
+    this.entries.set(key, { value, bytes, expiresAt: Date.now() + ttlMs })
+    this.bytes += bytes
+
+    while (this.bytes > this.maxBytes) {
+      const oldestKey = this.entries.keys().next().value as string
+      this.remove(oldestKey, this.entries.get(oldestKey)!)
+      this.counters.evictions++
+    }
+  }
+
+  delete(key: string) {
+    const entry = this.entries.get(key)
+    if (entry) {
+      this.remove(key, entry)
+      this.counters.invalidations++
+    }
+  }
+
+  clear() {
+    this.counters.invalidations += this.entries.size
+    this.entries.clear()
+    this.bytes = 0
+  }
+
+  stats(): MemoryCacheStats {
+    return {
+      ...this.counters,
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+    }
+  }
+
+  private remove(key: string, entry: Entry) {
+    this.entries.delete(key)
+    this.bytes -= entry.bytes
+  }
+}
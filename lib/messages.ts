@@ -0,0 +1,76 @@
+import { withTransaction } from '@/lib/mysql'
+import { RealtimeMessage } from '@/lib/realtime'
+
+// Odeslání zprávy (POST /api/messages, benchmark scripts/bench-message-send.ts).
+//
+// Jedna transakce na jednom spojení: zamknout konverzaci (ověření účastníků), vložit zprávu,
+// zapsat poslední zprávu do konverzace. Vrácený řádek se skládá z hodnot, které už známe -
+// žádné opětovné čtení.
+//
+// Zámek konverzace je nutný i kvůli deadlockům: INSERT zprávy drží sdílený zámek na konverzaci
+// (cizí klíč) a následný UPDATE chce výhradní - dvě souběžné zprávy by se jinak zablokovaly navzájem.
+// Souběžné zprávy v jedné konverzaci se tak řadí za sebou a čas zprávy je v konverzaci rostoucí.
+
+// Délka náhledu poslední zprávy v inboxu (conversations.lastMessagePreview VARCHAR(255))
+export const LAST_MESSAGE_PREVIEW_LENGTH = 255
+
+export type SendMessageResult =
+  | { status: 'sent'; message: RealtimeMessage }
+  | { status: 'not_found' | 'forbidden' | 'invalid_receiver' }
+
+export function createMessageId() {
+  return `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+}
+
+// Po znacích (code points) jako VARCHAR v utf8mb4 - nerozdělí emoji
+export function messagePreview(content: string) {
+  return Array.from(content).slice(0, LAST_MESSAGE_PREVIEW_LENGTH).join('')
+}
+
+export async function sendMessage(input: {
+  conversationId: string
+  senderId: string
+  receiverId: string
+  content: string
+}): Promise<SendMessageResult> {
+  const { conversationId, senderId, receiverId, content } = input
+  const messageId = createMessageId()
+
+  return withTransaction<SendMessageResult>(async (connection) => {
+    // Čas zprávy je alespoň o 1 ms novější než poslední zpráva konverzace - pořadí (createdAt, id)
+    // pak odpovídá pořadí odeslání, i když NOW() čekajícího příkazu je starší (since / Last-Event-ID)
+    const [rows] = await connection.execute(
+      `SELECT participant1Id, participant2Id,
+              GREATEST(NOW(3), lastMessageAt + INTERVAL 1000 MICROSECOND) as sentAt
+       FROM conversations WHERE id = ? FOR UPDATE`,
+      [conversationId]
+    )
+    const conversation = (rows as any[])[0]
+
+    if (!conversation) return { status: 'not_found' }
+    if (conversation.participant1Id !== senderId && conversation.participant2Id !== senderId) {
+      return { status: 'forbidden' }
+    }
+    const otherParticipant =
+      conversation.participant1Id === senderId ? conversation.participant2Id : conversation.participant1Id
+    if (receiverId !== otherParticipant) return { status: 'invalid_receiver' }
+
+    const createdAt: Date = conversation.sentAt
+    await connection.execute(
+      `INSERT INTO messages (id, content, conversationId, senderId, receiverId, createdAt)
+       VALUES (?, ?, ?, ?, ?, ?)`,
+      [messageId, content, conversationId, senderId, receiverId, createdAt]
+    )
+    await connection.execute(
+      `UPDATE conversations
+       SET lastMessageId = ?, lastMessageAt = ?, lastMessagePreview = ?, updatedAt = NOW(3)
+       WHERE id = ?`,
+      [messageId, createdAt, messagePreview(content), conversationId]
+    )
+
+    return {
+      status: 'sent',
+      message: { id: messageId, content, conversationId, senderId, receiverId, createdAt },
+    }
+  })
+}
@@ -0,0 +1,266 @@
+import busboy from 'busboy'
+import { createHash } from 'crypto'
+import { createWriteStream } from 'fs'
+import { mkdtemp, rm } from 'fs/promises'
+import { tmpdir } from 'os'
+import { join } from 'path'
+import { Readable, Transform } from 'stream'
+import { pipeline } from 'stream/promises'
+import { FileSource } from '@/lib/storage'
+
+// Streamové čtení multipart formulářů s obrázky (POST inzerátu, servisu, recenze).
+//
+// request.formData() drží celé tělo požadavku v paměti - deset fotek po 5 MB je 50 MB na jeden
+// požadavek a souběžná nahrávání se sčítají. Tady se tělo čte po kusech (busboy), každý soubor jde
+// rovnou do dočasného souboru a v paměti je vždy jen rozpracovaný kus. Cestou se hlídá:
+//   - velikost souboru a celého požadavku - po překročení se čtení ukončí hned, ne až po přijetí všeho,
+//   - typ podle magic bytes v prvním kusu souboru - ne-obrázek se odmítne dřív, než se zapíše na disk,
+//   - počet souborů v poli a počet/délka textových polí.
+// Při zápisu se počítá SHA-256, storeFile (lib/storage.ts) tak soubor kvůli hashi nečte znovu.
+// Chyba vstupu je UploadError se stavovým kódem pro odpověď; dočasné soubory smaže cleanup().
+
+export class UploadError extends Error {
+  constructor(message: string, readonly status = 400) {
+    super(message)
+    this.name = 'UploadError'
+  }
+}
+
+export type ImageType = { extension: string; contentType: string }
+
+export type UploadLimits = {
+  // Povolená pole se soubory a nejvyšší počet souborů v každém z nich
+  files: Record<string, number>
+  maxFileSize: number
+  maxTotalSize: number
+  // Povolené přípony podle rozpoznaného typu (výchozí všechny, které sniffImageType zná)
+  extensions?: string[]
+}
+
+// Dočasný soubor z formuláře; index = pořadí v poli včetně prázdných částí (např. mainImageIndex)
+export type SpooledFile = FileSource & {
+  field: string
+  index: number
+  originalName: string
+  extension: string
+  contentType: string
+  hash: string
+}
+
+export type MultipartUpload = {
+  get(name: string): string | null
+  files(field: string): SpooledFile[]
+  cleanup(): Promise<void>
+}
+
+export const UPLOAD_MAX_FILE_SIZE = Number(process.env.UPLOAD_MAX_FILE_BYTES || 5 * 1024 * 1024)
+export const UPLOAD_MAX_TOTAL_SIZE = Number(process.env.UPLOAD_MAX_TOTAL_BYTES || 30 * 1024 * 1024)
+
+// Signatury jsou v prvních 12 bajtech
+const SNIFF_BYTES = 12
+// Hlavičky částí a textová pole navíc k souborům (pro kontrolu Content-Length)
+const FORM_OVERHEAD_BYTES = 256 * 1024
+const MAX_FIELDS = 50
+const MAX_FIELD_SIZE = 64 * 1024
+
+const HEIF_BRANDS = ['heic', 'heix', 'hevc', 'hevx', 'heim', 'heis', 'heif', 'mif1', 'msf1']
+
+// Typ obrázku podle signatury (PNG, JPEG, WEBP, GIF, HEIC/HEIF), null = není podporovaný obrázek
+export function sniffImageType(header: Buffer): ImageType | null {
+  const ascii = (start: number, end: number) => header.toString('latin1', start, end)
+
+  if (header.length >= 8 && header[0] === 0x89 && ascii(1, 4) === 'PNG' && header[4] === 0x0d && header[5] === 0x0a && header[6] === 0x1a && header[7] === 0x0a) {
+    return { extension: '.png', contentType: 'image/png' }
+  }
+  if (header.length >= 3 && header[0] === 0xff && header[1] === 0xd8 && header[2] === 0xff) {
+    return { extension: '.jpg', contentType: 'image/jpeg' }
+  }
+  if (header.length >= 12 && ascii(0, 4) === 'RIFF' && ascii(8, 12) === 'WEBP') {
+    return { extension: '.webp', contentType: 'image/webp' }
+  }
+  if (header.length >= 6 && (ascii(0, 6) === 'GIF87a' || ascii(0, 6) === 'GIF89a')) {
+    return { extension: '.gif', contentType: 'image/gif' }
+  }
+  if (header.length >= 12 && ascii(4, 8) === 'ftyp' && HEIF_BRANDS.indexOf(ascii(8, 12).toLowerCase()) !== -1) {
+    return { extension: '.heic', contentType: 'image/heic' }
+  }
+  return null
+}
+
+function formatMB(bytes: number) {
+  return `${Math.round((bytes / 1024 / 1024) * 10) / 10}MB`
+}
+
+// Přečte multipart tělo požadavku podle limitů. Textová pole zůstanou v paměti, soubory v dočasném
+// adresáři - volající je po zpracování uklidí přes cleanup() (i při chybě).
+export async function parseMultipartUpload(request: Request, limits: UploadLimits): Promise<MultipartUpload> {
+  const fileFields = Object.keys(limits.files)
+  const maxFiles = fileFields.reduce((sum, field) => sum + limits.files[field], 0)
+
+  // Deklarovaná délka nad limit se odmítne bez čtení těla
+  const declaredLength = Number(request.headers.get('content-length') || 0)
+  if (declaredLength > limits.maxTotalSize + FORM_OVERHEAD_BYTES) {
+    throw new UploadError(`Obrázky jsou dohromady příliš velké (max ${formatMB(limits.maxTotalSize)})`, 413)
+  }
+  if (!request.body) {
+    throw new UploadError('Formulář je prázdný')
+  }
+
+  let parser: busboy.Busboy
+  try {
+    parser = busboy({
+      headers: { 'content-type': request.headers.get('content-type') || '' },
+      defParamCharset: 'utf8',
+      limits: {
+        files: maxFiles,
+        fields: MAX_FIELDS,
+        fieldSize: MAX_FIELD_SIZE,
+        fileSize: limits.maxFileSize + 1,
+      },
+    })
+  } catch {
+    throw new UploadError('Neplatný formulář - očekává se multipart/form-data')
+  }
+
+  const dir = await mkdtemp(join(tmpdir(), 'upload-'))
+  const fields: Record<string, string[]> = {}
+  const files: SpooledFile[] = []
+  const fieldCounts: Record<string, number> = {}
+  const cleanup = () => rm(dir, { recursive: true, force: true }).catch(() => undefined)
+
+  const body = Readable.fromWeb(request.body as any)
+  let totalSize = 0
+
+  try {
+    await new Promise<void>((resolve, reject) => {
+      const writes: Array<Promise<void>> = []
+      let failed = false
+
+      // Zastaví čtení těla i rozpracované zápisy; zbytek požadavku se už nepřijímá
+      const fail = (error: unknown) => {
+        if (failed) return
+        failed = true
+        body.unpipe(parser)
+        body.destroy()
+        parser.destroy()
+        if (!(error instanceof UploadError)) {
+          console.warn('[Upload] Čtení formuláře selhalo:', error)
+        }
+        reject(error instanceof UploadError ? error : new UploadError('Nahrávání se nepodařilo dokončit'))
+      }
+
+      parser.on('field', (name, value, info) => {
+        if (info.valueTruncated) return fail(new UploadError(`Pole ${name} je příliš dlouhé`, 413))
+        if (!fields[name]) fields[name] = []
+        fields[name].push(value)
+      })
+
+      parser.on('file', (field, stream, info) => {
+        if (failed) return stream.resume()
+        if (fileFields.indexOf(field) === -1) {
+          stream.resume()
+          return fail(new UploadError(`Neočekávaný soubor v poli ${field}`))
+        }
+
+        const index = fieldCounts[field] || 0
+        fieldCounts[field] = index + 1
+        if (index >= limits.files[field]) {
+          stream.resume()
+          return fail(new UploadError(`Maximálně ${limits.files[field]} obrázků`))
+        }
+
+        const originalName = info.filename || `soubor ${index + 1}`
+        const path = join(dir, `${field}-${index}`)
+        const hash = createHash('sha256')
+        let size = 0
+        let head = Buffer.alloc(0)
+        let type: ImageType | null = null
+
+        const detect = (header: Buffer) => {
+          type = sniffImageType(header)
+          if (!type || (limits.extensions && limits.extensions.indexOf(type.extension) === -1)) {
+            const allowed = (limits.extensions || ['.png', '.jpg', '.webp', '.gif', '.heic'])
+              .map((extension) => extension.slice(1).toUpperCase())
+              .join(', ')
+            return new UploadError(`Soubor ${originalName} není podporovaný obrázek (povolené: ${allowed})`, 415)
+          }
+          return null
+        }
+
+        const guard = new Transform({
+          transform(chunk: Buffer, _encoding, callback) {
+            size += chunk.length
+            totalSize += chunk.length
+            if (size > limits.maxFileSize) {
+              return callback(new UploadError(`Obrázek ${originalName} je příliš velký (max ${formatMB(limits.maxFileSize)})`, 413))
+            }
+            if (totalSize > limits.maxTotalSize) {
+              return callback(new UploadError(`Obrázky jsou dohromady příliš velké (max ${formatMB(limits.maxTotalSize)})`, 413))
+            }
+            hash.update(chunk)
+
+            if (type) return callback(null, chunk)
+            // Začátek souboru se drží, dokud nejsou k dispozici bajty se signaturou
+            head = head.length > 0 ? Buffer.concat([head, chunk]) : chunk
+            if (head.length < SNIFF_BYTES) return callback()
+            const error = detect(head)
+            const pending = head
+            head = Buffer.alloc(0)
+            callback(error, error ? undefined : pending)
+          },
+          flush(callback) {
+            if (type || head.length === 0) return callback()
+            // Soubor kratší než SNIFF_BYTES
+            const error = detect(head)
+            callback(error, error ? undefined : head)
+          },
+        })
+
+        writes.push(
+          pipeline(stream, guard, createWriteStream(path)).then(
+            () => {
+              // Prázdná část (nevybraný soubor) se přeskočí, index zůstává obsazený
+              if (size === 0 || !type) return
+              files.push({
+                field,
+                index,
+                originalName,
+                extension: type.extension,
+                contentType: type.contentType,
+                size,
+                hash: hash.digest('hex'),
+                path,
+              })
+            },
+            (error) => fail(error)
+          )
+        )
+      })
+
+      parser.on('filesLimit', () => fail(new UploadError(`Maximálně ${maxFiles} obrázků`)))
+      parser.on('fieldsLimit', () => fail(new UploadError('Formulář obsahuje příliš mnoho polí', 413)))
+      parser.on('partsLimit', () => fail(new UploadError('Formulář obsahuje příliš mnoho částí', 413)))
+      parser.on('error', fail)
+      body.on('error', fail)
+
+      parser.on('close', () => {
+        Promise.all(writes).then(() => {
+          if (!failed) resolve()
+        }, fail)
+      })
+
+      body.pipe(parser)
+    })
+  } catch (error) {
+    await cleanup()
+    throw error
+  }
+
+  files.sort((a, b) => (a.field === b.field ? a.index - b.index : a.field < b.field ? -1 : 1))
+
+  return {
+    get: (name) => (fields[name] && fields[name].length > 0 ? fields[name][0] : null),
+    files: (field) => files.filter((file) => file.field === field),
+    cleanup,
+  }
+}
@@ -1,4 +1,4 @@
-import mysql, { PoolOptions } from 'mysql2/promise'
+import mysql, { PoolConnection, PoolOptions } from 'mysql2/promise'
 
 const parseNumber = (value: string | undefined, fallback: number) => {
   const parsed = Number(value)
@@ -85,6 +85,25 @@ export async function update(sql: string, params?: any[]) {
   return result.affectedRows
 }
 
+// Spustí fn v transakci na jednom spojení. Při deadlocku / lock timeoutu se celá transakce zopakuje,
+// fn proto nesmí mít vedlejší efekty mimo databázi.
+export async function withTransaction<T>(fn: (connection: PoolConnection) => Promise<T>) {
+  return executeWithRetry(async () => {
+    const connection = await pool.getConnection()
+    try {
+      await connection.beginTransaction()
+      const result = await fn(connection)
+      await connection.commit()
+      return result
+    } catch (error) {
+      await connection.rollback().catch(() => {})
+      throw error
+    } finally {
+      connection.release()
+    }
+  })
+}
+
 export async function healthCheck(timeoutMs = 2_000) {
   const pingPromise = (async () => {
     const connection = await pool.getConnection()
@@ -0,0 +1,106 @@
+import { getOrRevalidate } from '@/lib/redis'
+
+// Keyset (cursor) stránkování.
+//
+// Místo LIMIT/OFFSET se další stránka čte od posledního řádku předchozí stránky podle aktivního
+// řazení: WHERE (createdAt, id) < (?, ?) ORDER BY createdAt DESC, id DESC LIMIT n+1. Poslední klíč
+// musí být unikátní (id), aby se řádky se stejnou hodnotou řazení neztrácely ani neopakovaly.
+
+export type KeysetKey = {
+  // SQL výraz použitý v ORDER BY / WHERE
+  column: string
+  // Název pole v načteném řádku
+  field: string
+  direction: 'ASC' | 'DESC'
+  // Hodnota pro NULL (výraz v column musí NULL převádět stejně, např. COALESCE)
+  fallback?: unknown
+}
+
+export type KeysetPage<T> = {
+  items: T[]
+  nextCursor: string | null
+  hasNext: boolean
+}
+
+export function keysetOrderBy(keys: KeysetKey[]) {
+  return keys.map((key) => `${key.column} ${key.direction}`).join(', ')
+}
+
+// Datumy se kódují zvlášť, aby se do dotazu vrátily jako Date (stejná časová zóna jako při čtení)
+export function encodeCursor(row: Record<string, any>, keys: KeysetKey[]) {
+  const values = keys.map((key) => {
+    const value = row[key.field] ?? key.fallback ?? null
+    return value instanceof Date ? { d: value.getTime() } : value
+  })
+  return Buffer.from(JSON.stringify(values)).toString('base64url')
+}
+
+export function decodeCursor(cursor: string | null | undefined, keys: KeysetKey[]): unknown[] | null {
+  if (!cursor) return null
+  try {
+    const values = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+    if (!Array.isArray(values) || values.length !== keys.length) return null
+    return values.map((value) =>
+      value && typeof value === 'object' && typeof value.d === 'number' ? new Date(value.d) : value
+    )
+  } catch {
+    return null
+  }
+}
+
+// (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... - funguje i pro smíšené směry řazení
+export function keysetWhere(keys: KeysetKey[], values: unknown[]) {
+  const clauses: string[] = []
+  const params: unknown[] = []
+
+  keys.forEach((key, index) => {
+    const parts: string[] = []
+    for (let i = 0; i < index; i++) {
+      parts.push(`${keys[i].column} = ?`)
+      params.push(values[i])
+    }
+    parts.push(`${key.column} ${key.direction === 'DESC' ? '<' : '>'} ?`)
+    params.push(values[index])
+    clauses.push(parts.length > 1 ? `(${parts.join(' AND ')})` : parts[0])
+  })
+
+  return { sql: `(${clauses.join(' OR ')})`, params }
+}
+
+// Dotaz se spouští s LIMIT n+1 - přebytečný řádek jen říká, že existuje další stránka
+export function toKeysetPage<T extends Record<string, any>>(rows: T[], limit: number, keys: KeysetKey[]): KeysetPage<T> {
+  const hasNext = rows.length > limit
+  const items = hasNext ? rows.slice(0, limit) : rows
+  return {
+    items,
+    nextCursor: hasNext && items.length > 0 ? encodeCursor(items[items.length - 1], keys) : null,
+    hasNext,
+  }
+}
+
+export function parseLimit(raw: string | null, fallback: number, max = 100) {
+  const parsed = parseInt(raw || '', 10)
+  if (!Number.isFinite(parsed) || parsed <= 0) return fallback
+  return Math.min(parsed, max)
+}
+
+// Celkový počet je drahý (COUNT přes celý filtr) a na přesném čísle nezáleží - cachuje se déle než stránky
+// a po vypršení se vrací starý počet, zatímco ho jediný požadavek přepočítá
+export async function cachedCount(cacheKey: string, loader: () => Promise<number>) {
+  const ttl = Number(process.env.LIST_COUNT_CACHE_TTL_SECONDS || 300)
+  const { value } = await getOrRevalidate(cacheKey, loader, { ttlSeconds: ttl, staleSeconds: ttl })
+  return value
+}
+
+// Volitelné stránkování seznamů, které dříve vracely celou tabulku - aktivní jen s parametrem limit nebo cursor
+export function readKeysetParams(searchParams: URLSearchParams, keys: KeysetKey[], defaultLimit = 50) {
+  const cursor = searchParams.get('cursor')
+  const enabled = cursor !== null || searchParams.has('limit')
+  const values = enabled ? decodeCursor(cursor, keys) : null
+  return {
+    enabled,
+    limit: parseLimit(searchParams.get('limit'), defaultLimit),
+    values,
+    invalid: !!cursor && !values,
+  }
+}
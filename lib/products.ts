@@ -0,0 +1,281 @@
+import { buildProductSearch } from '@/lib/search'
+import { KeysetKey, keysetOrderBy, keysetWhere, decodeCursor, parseLimit } from '@/lib/pagination'
+import { query, queryOne } from '@/lib/mysql'
+import { bumpCacheGenerations, deleteCache, readThrough } from '@/lib/redis'
+import { serviceDetailCacheKey } from '@/lib/services'
+import { userStatsCacheKey } from '@/lib/user-stats'
+
+// Sestavení dotazu pro výpis inzerátů (GET /api/products).
+// Používá ho route i kontrola plánů dotazů (scripts/check-products-query-plans.ts), takže
+// kontrola vždy EXPLAINuje přesně ty dotazy, které API posílá do MySQL.
+
+const categoryMap: { [key: string]: string } = {
+  'airsoft-weapons': 'AIRSOFT_WEAPONS',
+  'military-equipment': 'MILITARY_EQUIPMENT',
+  'other': 'OTHER'
+}
+
+const conditionMap: { [key: string]: string } = {
+  'new': 'NEW',
+  'light-damage': 'LIGHT_DAMAGE',
+  'major-damage': 'MAJOR_DAMAGE',
+  'non-functional': 'NON_FUNCTIONAL'
+}
+
+const locationMap: { [key: string]: string } = {
+  'praha': 'Praha',
+  'brno': 'Brno',
+  'ostrava': 'Ostrava',
+  'plzen': 'Plzeň',
+  'hradec-kralove': 'Hradec Králové',
+  'ceske-budejovice': 'České Budějovice',
+  'olomouc': 'Olomouc',
+  'liberec': 'Liberec'
+}
+
+// Klíče řazení pro ORDER BY i keyset stránkování (poslední klíč je vždy unikátní id).
+// Každé kombinaci filtru (listingType, category) a řazení odpovídá kompozitní index
+// idx_products_active_* (scripts/migrate-database.js), takže MySQL nemusí řadit (filesort).
+export const productSortKeys: Record<string, KeysetKey[]> = {
+  newest: [
+    { column: 'p.createdAt', field: 'createdAt', direction: 'DESC' },
+    { column: 'p.id', field: 'id', direction: 'DESC' },
+  ],
+  oldest: [
+    { column: 'p.createdAt', field: 'createdAt', direction: 'ASC' },
+    { column: 'p.id', field: 'id', direction: 'ASC' },
+  ],
+  'price-low': [
+    { column: 'p.price', field: 'price', direction: 'ASC' },
+    { column: 'p.id', field: 'id', direction: 'ASC' },
+  ],
+  'price-high': [
+    { column: 'p.price', field: 'price', direction: 'DESC' },
+    { column: 'p.id', field: 'id', direction: 'DESC' },
+  ],
+  'name-asc': [
+    { column: 'p.title', field: 'title', direction: 'ASC' },
+    { column: 'p.id', field: 'id', direction: 'ASC' },
+  ],
+  'name-desc': [
+    { column: 'p.title', field: 'title', direction: 'DESC' },
+    { column: 'p.id', field: 'id', direction: 'DESC' },
+  ],
+}
+
+export type ProductListQuery = {
+  page: number
+  limit: number
+  offset: number
+  withTotal: boolean
+  useKeyset: boolean
+  useRelevance: boolean
+  cursorInvalid: boolean
+  sortKeys: KeysetKey[]
+  // Filtr bez cursoru - sdílí ho dotaz na stránku i COUNT
+  filterClause: string
+  filterParams: any[]
+  // Filtr včetně keyset podmínky
+  whereClause: string
+  params: any[]
+  orderBy: string
+  relevanceSelect: string
+  relevanceParams: any[]
+  // Tag generace cache (viz productListCacheTag)
+  cacheTag: string
+}
+
+export function buildProductListQuery(searchParams: URLSearchParams): ProductListQuery {
+  // Získání parametrů pro filtrování a stránkování
+  const page = Math.max(1, parseInt(searchParams.get('page') || '1') || 1)
+  const limit = parseLimit(searchParams.get('limit'), 12)
+  // Přítomnost parametru cursor (i prázdného pro první stránku) zapíná keyset stránkování
+  const cursorParam = searchParams.get('cursor')
+  const withTotal = searchParams.get('withTotal') === '1'
+  const category = searchParams.get('category')
+  const listingType = searchParams.get('listingType') // 'nabizim' | 'shanim'
+  const search = searchParams.get('search')
+  const minPrice = searchParams.get('minPrice')
+  const maxPrice = searchParams.get('maxPrice')
+  const condition = searchParams.get('condition')
+  const location = searchParams.get('location')
+  // Při hledání je výchozí řazení podle relevance
+  const sort = searchParams.get('sort') || (search ? 'relevance' : 'newest')
+
+  // Vytvoření WHERE podmínek
+  const whereConditions = ['p.isActive = 1', 'p.isSold = 0']
+  const params: any[] = []
+  let lt: string | null = null
+  let mappedCategory: string | null = null
+
+  if (listingType) {
+    lt = listingType === 'shanim' ? 'SHANIM' : 'NABIZIM'
+    whereConditions.push('p.listingType = ?')
+    params.push(lt)
+  }
+
+  if (category) {
+    // Zajistit, že category je v mapě před přidáním podmínky
+    mappedCategory = categoryMap[category.toLowerCase().trim()] || null
+    if (mappedCategory) {
+      whereConditions.push('p.category = ?')
+      params.push(mappedCategory)
+    }
+  }
+
+  // Fulltextové hledání přes index ft_products_search (viz lib/search.ts)
+  const searchClause = search ? buildProductSearch(search) : null
+  if (searchClause) {
+    whereConditions.push(searchClause.where)
+    params.push(...searchClause.params)
+  }
+
+  if (minPrice) {
+    whereConditions.push('p.price >= ?')
+    params.push(parseFloat(minPrice))
+  }
+
+  if (maxPrice) {
+    whereConditions.push('p.price <= ?')
+    params.push(parseFloat(maxPrice))
+  }
+
+  if (condition) {
+    const mappedCondition = conditionMap[condition]
+    if (mappedCondition) {
+      whereConditions.push('p.`condition` = ?')
+      params.push(mappedCondition)
+    }
+  }
+
+  if (location) {
+    const mappedLocation = locationMap[location]
+    if (mappedLocation) {
+      whereConditions.push('p.location = ?')
+      params.push(mappedLocation)
+    }
+  }
+
+  // Vytvoření ORDER BY podmínek - id jako poslední klíč dělá řazení deterministické (nutné pro cursor)
+  const sortKeys = productSortKeys[sort] || productSortKeys.newest
+  const useRelevance = sort === 'relevance' && !!searchClause?.relevance
+  const orderBy = useRelevance ? 'relevance DESC, p.createdAt DESC, p.id DESC' : keysetOrderBy(sortKeys)
+  const useKeyset = cursorParam !== null && !useRelevance
+
+  const filterClause = `WHERE ${whereConditions.join(' AND ')}`
+  const filterParams = [...params]
+
+  const cursorValues = useKeyset ? decodeCursor(cursorParam, sortKeys) : null
+  if (cursorValues) {
+    const keyset = keysetWhere(sortKeys, cursorValues)
+    whereConditions.push(keyset.sql)
+    params.push(...keyset.params)
+  }
+
+  return {
+    page,
+    limit,
+    offset: useKeyset ? 0 : (page - 1) * limit,
+    withTotal,
+    useKeyset,
+    useRelevance,
+    cursorInvalid: useKeyset && !!cursorParam && !cursorValues,
+    sortKeys,
+    filterClause,
+    filterParams,
+    whereClause: `WHERE ${whereConditions.join(' AND ')}`,
+    params,
+    orderBy,
+    relevanceSelect: useRelevance ? `, ${searchClause!.relevance} as relevance` : '',
+    relevanceParams: useRelevance ? searchClause!.relevanceParams : [],
+    cacheTag: productListCacheTag(lt, mappedCategory),
+  }
+}
+
+// Načte o řádek víc, aby bylo jasné, zda existuje další stránka
+export function productListSql(listQuery: ProductListQuery) {
+  return {
+    sql: `SELECT p.*, u.id as userId, u.name as userName, u.email as userEmail, u.image as userImage, u.isVerified as userIsVerified, COALESCE(p.viewCount, 0) as viewCount${listQuery.relevanceSelect}
+       FROM products p
+       JOIN users u ON p.userId = u.id
+       ${listQuery.whereClause}
+       ORDER BY ${listQuery.orderBy}
+       LIMIT ? OFFSET ?`,
+    params: [...listQuery.relevanceParams, ...listQuery.params, listQuery.limit + 1, listQuery.offset],
+  }
+}
+
+export function productCountSql(listQuery: ProductListQuery) {
+  return {
+    sql: `SELECT COUNT(*) as total FROM products p ${listQuery.filterClause}`,
+    params: listQuery.filterParams,
+  }
+}
+
+// Cache výpisů je rozdělená podle filtrů listingType a category ('*' = bez filtru). Ostatní filtry
+// (hledání, cena, stav, lokalita) jen zužují výsledek, proto spadají pod stejný tag.
+export function productListCacheTag(listingType: string | null, category: string | null) {
+  return `products:list:${listingType || '*'}:${category || '*'}`
+}
+
+type ProductCacheScope = {
+  id?: string
+  userId?: string
+  listingType?: string | null
+  category?: string | null
+}
+
+// Po vytvoření, úpravě nebo smazání inzerátu zastarají jen výpisy, ve kterých se inzerát může objevit
+// (bez filtru, se stejným listingType, se stejnou category, s oběma), jeho detail, souhrnné statistiky
+// a statistiky majitele.
+// Při změně listingType/category se předává stav před i po změně.
+export async function invalidateProductCaches(...products: ProductCacheScope[]) {
+  const tags: string[] = []
+  const keys = ['stats:summary']
+  for (const product of products) {
+    if (product.id) keys.push(productDetailCacheKey(product.id))
+    if (product.userId) keys.push(userStatsCacheKey(product.userId))
+    const listingType = product.listingType || null
+    const category = product.category || null
+    tags.push(
+      productListCacheTag(null, null),
+      productListCacheTag(listingType, null),
+      productListCacheTag(null, category),
+      productListCacheTag(listingType, category)
+    )
+  }
+
+  await Promise.all([bumpCacheGenerations(tags), deleteCache(...Array.from(new Set(keys)))])
+}
+
+export function productDetailCacheKey(productId: string) {
+  return `products:detail:${productId}`
+}
+
+// Detail inzerátu přes read-through cache (GET /api/products/[id]). Invalidace viz invalidateProductCaches
+// a při změně profilu prodejce invalidateSellerCaches.
+export function getProductDetail(productId: string) {
+  return readThrough<any>(productDetailCacheKey(productId), () =>
+    queryOne(
+      `SELECT p.*, u.id as userId, u.name as userName, u.email as userEmail, u.phone as userPhone, u.image as userImage, u.nickname as userNickname, u.isVerified as userIsVerified, u.reputation as userReputation, COALESCE(p.viewCount, 0) as viewCount
+       FROM products p 
+       JOIN users u ON p.userId = u.id 
+       WHERE p.id = ?`,
+      [productId]
+    )
+  )
+}
+
+// Detail inzerátu i servisu nese údaje prodejce (jméno, telefon, fotka, přezdívka...). Po změně profilu
+// se proto smažou detaily všech jeho inzerátů a servisů spolu s jeho statistikami.
+export async function invalidateSellerCaches(userId: string) {
+  const [products, services] = await Promise.all([
+    query<Array<{ id: string }>>('SELECT id FROM products WHERE userId = ?', [userId]),
+    query<Array<{ id: string }>>('SELECT id FROM services WHERE userId = ?', [userId]),
+  ])
+  await deleteCache(
+    userStatsCacheKey(userId),
+    ...products.map((product) => productDetailCacheKey(product.id)),
+    ...services.map((service) => serviceDetailCacheKey(service.id))
+  )
+}
@@ -0,0 +1,105 @@
+import Redis from 'ioredis'
+import { getRedis } from '@/lib/redis'
+
+// Doručování zpráv v reálném čase (SSE, GET /api/messages/stream).
+//
+// POST /api/messages publikuje novou zprávu do Redis kanálu spolu s ID obou účastníků. Každá
+// instance drží jedno odběrové spojení a zprávu rozešle otevřeným streamům těchto uživatelů ve
+// svém procesu - nezáleží tedy na tom, ke které instanci je odesílatel a příjemce připojen.
+// Bez Redis se zprávy doručují jen v rámci jednoho procesu.
+
+export type RealtimeMessage = {
+  id: string
+  content: string
+  conversationId: string
+  senderId: string
+  receiverId: string
+  createdAt: Date | string
+}
+
+// resync = odběr mohl o zprávy přijít (výpadek spojení s Redis) - stream si je dočte z DB
+export type RealtimeEvent = { type: 'message'; message: RealtimeMessage } | { type: 'resync' }
+
+type Listener = (event: RealtimeEvent) => void
+
+const MESSAGES_CHANNEL = 'realtime:messages'
+const listeners = new Map<string, Set<Listener>>()
+let subscriber: Redis | null = null
+let subscriberReady = false
+
+function deliver(userIds: string[], event: RealtimeEvent) {
+  userIds.forEach((userId) => {
+    const userListeners = listeners.get(userId)
+    if (!userListeners) return
+    userListeners.forEach((listener) => {
+      try {
+        listener(event)
+      } catch (error) {
+        console.error('[Realtime] Chyba při doručení události:', error)
+      }
+    })
+  })
+}
+
+function ensureSubscriber(client: Redis) {
+  if (subscriber) return
+
+  subscriber = client.duplicate()
+  subscriber.on('error', (err) => {
+    console.error('[Realtime] Chyba odběru zpráv:', err)
+  })
+  subscriber.on('ready', () => {
+    // Po obnovení spojení mohly chybět zprávy - všechny otevřené streamy se dočtou z DB
+    if (subscriberReady) deliver(Array.from(listeners.keys()), { type: 'resync' })
+    subscriberReady = true
+  })
+  subscriber.on('message', (_channel: string, payload: string) => {
+    try {
+      const { userIds, message } = JSON.parse(payload) as { userIds: string[]; message: RealtimeMessage }
+      deliver(userIds, { type: 'message', message })
+    } catch (error) {
+      console.error('[Realtime] Neplatná zpráva v kanálu:', error)
+    }
+  })
+  subscriber.subscribe(MESSAGES_CHANNEL).catch((error) => {
+    console.error('[Realtime] Nepodařilo se přihlásit k odběru zpráv:', error)
+  })
+}
+
+// Vrací funkci pro odhlášení (volá se při zavření streamu)
+export function subscribeToUserEvents(userId: string, listener: Listener) {
+  const client = getRedis()
+  if (client) ensureSubscriber(client)
+
+  let userListeners = listeners.get(userId)
+  if (!userListeners) {
+    userListeners = new Set()
+    listeners.set(userId, userListeners)
+  }
+  userListeners.add(listener)
+
+  return () => {
+    const current = listeners.get(userId)
+    if (!current) return
+    current.delete(listener)
+    if (current.size === 0) listeners.delete(userId)
+  }
+}
+
+// Zprávu dostane příjemce i odesílatel (jeho další otevřené karty)
+export async function publishMessage(message: RealtimeMessage) {
+  const userIds = Array.from(new Set([message.senderId, message.receiverId]))
+  const client = getRedis()
+
+  if (client) {
+    try {
+      // Vlastní instance zprávu dostane zpět přes odběr - lokálně se nedoručuje, jinak by byla dvakrát
+      await client.publish(MESSAGES_CHANNEL, JSON.stringify({ userIds, message }))
+      return
+    } catch (error) {
+      console.error('[Realtime] Publikace zprávy selhala, doručuji jen lokálně:', error)
+    }
+  }
+
+  deliver(userIds, { type: 'message', message })
+}
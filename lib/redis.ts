@@ -1,4 +1,6 @@
 import Redis from 'ioredis'
+import { randomUUID } from 'crypto'
+import { MemoryCache } from '@/lib/memory-cache'
 
 let redisClient: Redis | null = null
 
@@ -46,15 +48,76 @@ export function getRedis() {
   return createRedisClient()
 }
 
-export async function getCache<T>(key: string): Promise<T | null> {
+// Dvouúrovňová cache: L1 je LRU v paměti procesu (omezená v bajtech, krátké TTL), L2 je Redis.
+// Horké klíče (výpis na úvodní stránce, stats:summary) se tak obslouží bez síťového požadavku
+// a bez JSON.parse. Smazání klíče se rozešle ostatním instancím přes Redis pub/sub.
+// L1 se používá jen s Redis - bez něj by nebylo jak invalidovat generace výpisů.
+
+const L1_TTL_MS = Number(process.env.L1_CACHE_TTL_SECONDS || 5) * 1000
+const l1 = new MemoryCache(Number(process.env.L1_CACHE_MAX_BYTES || 32 * 1024 * 1024))
+const l2Counters = { hits: 0, misses: 0, errors: 0 }
+
+const INVALIDATION_CHANNEL = 'cache:l1:invalidate'
+const instanceId = randomUUID()
+let subscriber: Redis | null = null
+
+function ensureL1Subscriber(client: Redis) {
+  if (subscriber || !l1.enabled || L1_TTL_MS <= 0) return
+
+  subscriber = client.duplicate()
+  subscriber.on('error', (err) => {
+    console.error('[Redis] Chyba odběru invalidací L1 cache:', err)
+  })
+  // Během výpadku spojení mohly zprávy chybět - L1 zahodit celou
+  subscriber.on('ready', () => l1.clear())
+  subscriber.on('message', (_channel: string, message: string) => {
+    try {
+      const { origin, keys } = JSON.parse(message) as { origin: string; keys: string[] }
+      if (origin !== instanceId) keys.forEach((key) => l1.delete(key))
+    } catch (error) {
+      console.error('[Redis] Neplatná zpráva invalidace L1 cache:', error)
+    }
+  })
+  subscriber.subscribe(INVALIDATION_CHANNEL).catch((error) => {
+    console.error('[Redis] Nepodařilo se přihlásit k odběru invalidací L1 cache:', error)
+  })
+}
+
+async function invalidateL1(client: Redis, keys: string[]) {
+  keys.forEach((key) => l1.delete(key))
+  if (!l1.enabled) return
+  await client.publish(INVALIDATION_CHANNEL, JSON.stringify({ origin: instanceId, keys }))
+}
+
+export function getCacheStats() {
+  return {
+    l1: { ...l1.stats(), ttlMs: L1_TTL_MS },
+    l2: { ...l2Counters },
+  }
+}
+
+export async function getCache<T>(key: string, options: { skipL1?: boolean } = {}): Promise<T | null> {
   const client = getRedis()
   if (!client) return null
+  ensureL1Subscriber(client)
+
+  if (!options.skipL1) {
+    const local = l1.get<T>(key)
+    if (local !== undefined) return local
+  }
 
   try {
     const value = await client.get(key)
-    if (!value) return null
-    return JSON.parse(value) as T
+    if (!value) {
+      l2Counters.misses++
+      return null
+    }
+    l2Counters.hits++
+    const parsed = JSON.parse(value) as T
+    l1.set(key, parsed, Buffer.byteLength(value), L1_TTL_MS)
+    return parsed
   } catch (error) {
+    l2Counters.errors++
     console.error(`[Redis] Nepodařilo se načíst klíč ${key}:`, error)
     return null
   }
@@ -65,42 +128,322 @@ export async function setCache(key: string, value: unknown, ttlSeconds = 60): Pr
   if (!client) return
 
   try {
-    await client.set(key, JSON.stringify(value), 'EX', ttlSeconds)
+    const serialized = JSON.stringify(value)
+    await client.set(key, serialized, 'EX', ttlSeconds)
+    l1.set(key, value, Buffer.byteLength(serialized), Math.min(L1_TTL_MS, ttlSeconds * 1000))
   } catch (error) {
     console.error(`[Redis] Nepodařilo se uložit klíč ${key}:`, error)
   }
 }
 
-export async function invalidateCacheByPrefix(prefix: string): Promise<void> {
+// Read-through cache pro jednotlivé entity (detail inzerátu, servisu).
+//
+// Souběžné minutí stejného klíče v jednom procesu čekají na jediný dotaz do DB (coalescing).
+// Neexistující entity se cachují krátce jako záporný záznam, takže zkoušení náhodných id
+// nedojde až do databáze.
+//
+// Načtení, které začalo před invalidací (PATCH/DELETE -> deleteCache), nesmí starou hodnotu
+// uložit zpět. deleteCache proto v procesu označí probíhající načtení klíče (pendingLoads) a v Redis
+// zvýší čítač invalidací cache:inv:<klíč> (kvůli ostatním instancím). Loader si čítač přečte před dotazem
+// do DB a hodnotu uloží jen tehdy, když se mezitím nezměnil (porovnání a SET atomicky v jednom skriptu).
+
+const MISSING = { __missing: true }
+const inflightLoads = new Map<string, Promise<unknown>>()
+const pendingLoads = new Map<string, PendingLoad[]>()
+
+// Čítač v Redis musí přežít nejdelší načtení; pak vyprší sám
+const INVALIDATION_TTL_SECONDS = 3600
+const invalidationKey = (key: string) => `cache:inv:${key}`
+
+const SET_IF_NOT_INVALIDATED_SCRIPT = `if (redis.call('get', KEYS[2]) or '0') ~= ARGV[1] then return 0 end
+redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1`
+
+type PendingLoad = { invalidated: boolean; remote: string | null }
+
+// Stav čítače invalidací v Redis (null = nepodařilo se přečíst)
+async function readInvalidationCounter(key: string): Promise<string | null> {
   const client = getRedis()
-  if (!client) return
+  if (!client) return null
+  try {
+    return (await client.get(invalidationKey(key))) || '0'
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se načíst čítač invalidací klíče ${key}:`, error)
+    return null
+  }
+}
+
+// setCache, který hodnotu neuloží, pokud byl klíč od začátku načtení invalidován
+async function setCacheIfNotInvalidated(key: string, value: unknown, ttlSeconds: number, pending: PendingLoad) {
+  if (pending.invalidated) return
+  const client = getRedis()
+  // Bez čítače z Redis nelze souběžnou invalidaci vyloučit - raději neukládat
+  if (!client || pending.remote === null) return
 
   try {
-    const stream = client.scanStream({
-      match: `${prefix}*`,
-      count: Number(process.env.REDIS_INVALIDATE_SCAN_COUNT || 100),
-    })
+    const serialized = JSON.stringify(value)
+    const stored = await client.eval(
+      SET_IF_NOT_INVALIDATED_SCRIPT, 2, key, invalidationKey(key), pending.remote, serialized, ttlSeconds
+    )
+    if (stored && !pending.invalidated) {
+      l1.set(key, value, Buffer.byteLength(serialized), Math.min(L1_TTL_MS, ttlSeconds * 1000))
+    }
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se uložit klíč ${key}:`, error)
+  }
+}
+
+export async function readThrough<T>(
+  key: string,
+  loader: () => Promise<T | null>,
+  ttlSeconds = Number(process.env.DETAIL_CACHE_TTL_SECONDS || 300),
+  negativeTtlSeconds = Number(process.env.DETAIL_NEGATIVE_CACHE_TTL_SECONDS || 30)
+): Promise<T | null> {
+  const cached = await getCache<T | typeof MISSING>(key)
+  if (cached !== null) {
+    return (cached as any).__missing ? null : (cached as T)
+  }
+
+  const inflight = inflightLoads.get(key)
+  if (inflight) return inflight as Promise<T | null>
+
+  const pending: PendingLoad = { invalidated: false, remote: null }
+  pendingLoads.set(key, (pendingLoads.get(key) || []).concat(pending))
+
+  const load = readInvalidationCounter(key).then(async (remote) => {
+    pending.remote = remote
+    const value = await loader()
+    if (value !== null && value !== undefined) {
+      if (ttlSeconds > 0) await setCacheIfNotInvalidated(key, value, ttlSeconds, pending)
+      return value
+    }
+    if (negativeTtlSeconds > 0) await setCacheIfNotInvalidated(key, MISSING, negativeTtlSeconds, pending)
+    return null
+  })
+
+  // Po dokončení uvolnit klíč (pokud ho mezitím invalidace nenahradila novým načtením)
+  const release = () => {
+    if (inflightLoads.get(key) === load) inflightLoads.delete(key)
+    const remaining = (pendingLoads.get(key) || []).filter((entry) => entry !== pending)
+    if (remaining.length > 0) pendingLoads.set(key, remaining)
+    else pendingLoads.delete(key)
+  }
+  load.then(release, release)
+
+  inflightLoads.set(key, load)
+  return load
+}
+
+// Stale-while-revalidate s ochranou proti stampede.
+//
+// Hodnota se ukládá s měkkým TTL (ttlSeconds, pak je "stale") a tvrdým TTL (ttlSeconds + staleSeconds,
+// pak ji Redis smaže). Mezi nimi se vrací stará hodnota a na pozadí ji obnoví právě jeden požadavek -
+// ten, který získá Redis zámek lock:<klíč>. Studený klíč (žádná hodnota) načte také jen držitel zámku,
+// ostatní instance chvíli čekají, až se hodnota objeví. V rámci procesu se načítání sdílí přes inflightLoads.
+
+export type CacheState = 'HIT' | 'STALE' | 'MISS' | 'BYPASS'
+
+type RevalidateOptions = {
+  ttlSeconds: number
+  staleSeconds: number
+}
+
+type Envelope<T> = {
+  value: T
+  staleAt: number
+}
+
+const LOCK_TTL_MS = Number(process.env.CACHE_REFRESH_LOCK_MS || 10_000)
+const COLD_WAIT_MS = Number(process.env.CACHE_COLD_WAIT_MS || 2_000)
+const COLD_POLL_MS = 50
+
+const RELEASE_LOCK_SCRIPT = `if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end`
+
+async function acquireLock(client: Redis, key: string): Promise<string | null> {
+  const token = randomUUID()
+  try {
+    const acquired = await client.set(`lock:${key}`, token, 'PX', LOCK_TTL_MS, 'NX')
+    return acquired ? token : null
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se získat zámek pro ${key}:`, error)
+    return null
+  }
+}
 
-    const pipeline = client.pipeline()
+async function releaseLock(client: Redis, key: string, token: string) {
+  try {
+    await client.eval(RELEASE_LOCK_SCRIPT, 1, `lock:${key}`, token)
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se uvolnit zámek pro ${key}:`, error)
+  }
+}
 
-    stream.on('data', (keys: string[]) => {
-      if (keys.length) {
-        keys.forEach((key) => pipeline.del(key))
-      }
+function isFresh<T>(envelope: Envelope<T> | null): envelope is Envelope<T> {
+  return !!envelope && envelope.staleAt > Date.now()
+}
+
+// Načte hodnotu a uloží ji jako obálku; v procesu sdíleno přes inflightLoads
+function loadInto<T>(key: string, loader: () => Promise<T>, options: RevalidateOptions): Promise<T> {
+  const inflight = inflightLoads.get(key)
+  if (inflight) return inflight as Promise<T>
+
+  const load = Promise.resolve()
+    .then(loader)
+    .then(async (value) => {
+      const envelope: Envelope<T> = { value, staleAt: Date.now() + options.ttlSeconds * 1000 }
+      await setCache(key, envelope, options.ttlSeconds + options.staleSeconds)
+      return value
     })
 
-    await new Promise<void>((resolve, reject) => {
-      stream.on('end', resolve)
-      stream.on('error', reject)
+  const release = () => {
+    if (inflightLoads.get(key) === load) inflightLoads.delete(key)
+  }
+  load.then(release, release)
+
+  inflightLoads.set(key, load)
+  return load
+}
+
+async function refreshWithLock<T>(client: Redis, key: string, loader: () => Promise<T>, options: RevalidateOptions) {
+  const token = await acquireLock(client, key)
+  if (!token) return
+
+  try {
+    // Jiná instance mohla hodnotu obnovit těsně předtím (L1 ji ještě drží jako stale)
+    const current = await getCache<Envelope<T>>(key, { skipL1: true })
+    if (isFresh(current)) return
+    await loadInto(key, loader, options)
+  } finally {
+    await releaseLock(client, key, token)
+  }
+}
+
+export async function getOrRevalidate<T>(
+  key: string,
+  loader: () => Promise<T>,
+  options: RevalidateOptions
+): Promise<{ value: T; state: CacheState }> {
+  const client = getRedis()
+  if (!client || options.ttlSeconds <= 0) {
+    return { value: await loader(), state: 'BYPASS' }
+  }
+
+  const envelope = await getCache<Envelope<T>>(key)
+  if (isFresh(envelope)) {
+    return { value: envelope.value, state: 'HIT' }
+  }
+
+  if (envelope) {
+    // Vrátit starou hodnotu hned, obnovu spustit na pozadí (nejvýše jedna napříč instancemi)
+    if (!inflightLoads.has(key)) {
+      refreshWithLock(client, key, loader, options).catch((error) => {
+        console.error(`[Redis] Obnova klíče ${key} na pozadí selhala:`, error)
+      })
+    }
+    return { value: envelope.value, state: 'STALE' }
+  }
+
+  // Studený klíč - v procesu se připojit k probíhajícímu načtení
+  const inflight = inflightLoads.get(key)
+  if (inflight) {
+    return { value: (await inflight) as T, state: 'MISS' }
+  }
+
+  const token = await acquireLock(client, key)
+  if (token) {
+    try {
+      return { value: await loadInto(key, loader, options), state: 'MISS' }
+    } finally {
+      await releaseLock(client, key, token)
+    }
+  }
+
+  // Načítá jiná instance - počkat na její výsledek, po vypršení čekání načíst sám
+  const waitUntil = Date.now() + COLD_WAIT_MS
+  while (Date.now() < waitUntil) {
+    await new Promise((resolve) => setTimeout(resolve, COLD_POLL_MS))
+    const loaded = await getCache<Envelope<T>>(key, { skipL1: true })
+    if (loaded) {
+      return { value: loaded.value, state: 'MISS' }
+    }
+  }
+
+  return { value: await loadInto(key, loader, options), state: 'MISS' }
+}
+
+// Generační (verzované) klíče cache.
+//
+// Klíč cachované hodnoty obsahuje aktuální generaci svého tagu (např. products:list:g12:...). Invalidace
+// jen atomicky zvýší čítač tagu (INCR, O(1)) - staré klíče už nikdo nečte a vyprší samy podle TTL.
+// Odpadá tak SCAN přes celý keyspace při každém zápisu.
+
+const generationKey = (tag: string) => `cache:gen:${tag}`
+
+export async function getCacheGeneration(tag: string): Promise<number> {
+  const client = getRedis()
+  if (!client) return 0
+  ensureL1Subscriber(client)
+
+  const key = generationKey(tag)
+  const local = l1.get<number>(key)
+  if (local !== undefined) return local
+
+  try {
+    const generation = Number(await client.get(key)) || 0
+    l1.set(key, generation, key.length + 8, L1_TTL_MS)
+    return generation
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se načíst generaci tagu ${tag}:`, error)
+    return 0
+  }
+}
+
+export async function bumpCacheGenerations(tags: string[]): Promise<void> {
+  const client = getRedis()
+  if (!client || tags.length === 0) return
+
+  try {
+    const keys = Array.from(new Set(tags)).map(generationKey)
+    const transaction = client.multi()
+    keys.forEach((key) => transaction.incr(key))
+    await transaction.exec()
+    await invalidateL1(client, keys)
+  } catch (error) {
+    console.error(`[Redis] Nepodařilo se zvýšit generaci tagů ${tags.join(', ')}:`, error)
+  }
+}
+
+export async function deleteCache(...keys: string[]): Promise<void> {
+  // Probíhající načtení už smazanou hodnotu nesmí vracet dalším požadavkům ani ji uložit (viz readThrough)
+  keys.forEach((key) => {
+    inflightLoads.delete(key)
+    ;(pendingLoads.get(key) || []).forEach((pending) => {
+      pending.invalidated = true
     })
+  })
+
+  const client = getRedis()
+  if (!client || keys.length === 0) return
 
-    await pipeline.exec()
+  try {
+    const transaction = client.multi()
+    transaction.del(...keys)
+    keys.forEach((key) => {
+      transaction.incr(invalidationKey(key))
+      transaction.expire(invalidationKey(key), INVALIDATION_TTL_SECONDS)
+    })
+    await transaction.exec()
+    await invalidateL1(client, keys)
   } catch (error) {
-    console.error(`[Redis] Nepodařilo se invalidovat prefix ${prefix}:`, error)
+    console.error(`[Redis] Nepodařilo se smazat klíče ${keys.join(', ')}:`, error)
   }
 }
 
 export async function disconnectRedis() {
+  if (subscriber) {
+    await subscriber.quit()
+    subscriber = null
+  }
   if (redisClient) {
     await redisClient.quit()
     redisClient = null
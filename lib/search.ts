@@ -0,0 +1,63 @@
+// Fulltextové vyhledávání v inzerátech.
+//
+// products.searchText je neviditelný STORED generovaný sloupec (title + subcategory + description)
+// s collation utf8mb4_0900_ai_ci a FULLTEXT indexem ft_products_search. MySQL ho udržuje sám při
+// INSERT/UPDATE/DELETE, porovnání je bez ohledu na velikost písmen i diakritiku ("maskac" = "maskáč").
+
+// Musí odpovídat innodb_ft_min_token_size serveru (výchozí 3) - kratší výrazy index nezná
+const MIN_TOKEN_SIZE = Number(process.env.PRODUCTS_FT_MIN_TOKEN_SIZE || 3)
+const MAX_TERMS = 8
+
+export type ProductSearchClause = {
+  where: string
+  params: any[]
+  // Výraz pro skóre relevance (null pokud hledání obsahuje jen krátké výrazy)
+  relevance: string | null
+  relevanceParams: any[]
+}
+
+export function tokenizeSearch(raw: string): string[] {
+  return raw
+    .toLowerCase()
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .split(/[^a-z0-9]+/)
+    .filter(Boolean)
+    .slice(0, MAX_TERMS)
+}
+
+export function buildProductSearch(raw: string, alias = 'p'): ProductSearchClause | null {
+  const tokens = tokenizeSearch(raw)
+  if (tokens.length === 0) return null
+
+  const indexed = tokens.filter((token) => token.length >= MIN_TOKEN_SIZE)
+  const short = tokens.filter((token) => token.length < MIN_TOKEN_SIZE)
+
+  const conditions: string[] = []
+  const params: any[] = []
+  let relevance: string | null = null
+  const relevanceParams: any[] = []
+
+  if (indexed.length > 0) {
+    // Všechny výrazy povinné, prefixové hledání ("glo" najde "glock")
+    const booleanQuery = indexed.map((token) => `+${token}*`).join(' ')
+    const match = `MATCH(${alias}.searchText) AGAINST (? IN BOOLEAN MODE)`
+    conditions.push(match)
+    params.push(booleanQuery)
+    relevance = match
+    relevanceParams.push(booleanQuery)
+  }
+
+  // Krátké výrazy ("m4", "ak") jen v názvu a podkategorii; s dalšími výrazy už jen filtrují výsledek indexu
+  for (const token of short) {
+    conditions.push(`(${alias}.title LIKE ? OR ${alias}.subcategory LIKE ?)`)
+    params.push(`%${token}%`, `%${token}%`)
+  }
+
+  return {
+    where: conditions.length > 1 ? `(${conditions.join(' AND ')})` : conditions[0],
+    params,
+    relevance,
+    relevanceParams,
+  }
+}
@@ -0,0 +1,44 @@
+import { queryOne } from '@/lib/mysql'
+import { deleteCache, readThrough } from '@/lib/redis'
+
+export function serviceDetailCacheKey(serviceId: string) {
+  return `services:detail:${serviceId}`
+}
+
+// Detail aktivního servisu přes read-through cache (GET /api/services/[id]). Údaje majitele v něm
+// maže při změně profilu invalidateSellerCaches (lib/products.ts).
+export function getServiceDetail(serviceId: string) {
+  return readThrough<any>(serviceDetailCacheKey(serviceId), () =>
+    queryOne(
+      `SELECT 
+        s.id,
+        s.name,
+        s.description,
+        s.location,
+        s.contactEmail,
+        s.contactPhone,
+        s.image,
+        s.additionalImages,
+        s.imageVariants,
+        s.rating,
+        s.reviewCount,
+        s.createdAt,
+        s.updatedAt,
+        s.userId,
+        u.name as userName,
+        u.email as userEmail,
+        u.image as userImage,
+        u.isVerified as userIsVerified,
+        u.reputation as userReputation
+      FROM services s
+      LEFT JOIN users u ON s.userId = u.id
+      WHERE s.id = ? AND s.isActive = true`,
+      [serviceId]
+    )
+  )
+}
+
+// Volá se po každé změně servisu (úprava, schválení, smazání, nová/smazaná recenze)
+export async function invalidateServiceCache(serviceId: string) {
+  await deleteCache(serviceDetailCacheKey(serviceId))
+}
@@ -0,0 +1,241 @@
+import { PoolConnection } from 'mysql2/promise'
+import { query, queryOne, withTransaction } from '@/lib/mysql'
+import { getRedis } from '@/lib/redis'
+
+// Průběžně udržované statistiky tržiště.
+//
+// Místo agregací přes celou tabulku products při každém požadavku se při každé změně inzerátu
+// (vytvoření, prodej, deaktivace, smazání, zápis zobrazení) ve stejné transakci upraví:
+//   - stats_counters: pojmenované čítače (viz CounterName),
+//   - stats_listing_buckets: počet otevřených nabídek podle hodiny vytvoření (okna 24h / 7d / 30d),
+//   - stats_sellers: počet otevřených nabídek na prodejce (pro počet aktivních prodejců).
+// Čtení jsou pak O(1). Případný drift (změny mimo aplikaci, kaskádové mazání) opravuje
+// reconcileMarketplaceStats - spouští se periodicky a ručně přes npm run stats:reconcile.
+
+// "Otevřená nabídka" = listingType NABIZIM a neprodaná (stejná definice jako dřívější /api/stats)
+type CounterName =
+  | 'productsTotal'
+  | 'productsActive'
+  | 'productsInactive'
+  | 'offersOpen'
+  | 'offerViews'
+  | 'offerSellers'
+  | 'usersTotal'
+
+export type ProductStatsRow = {
+  id: string
+  userId: string
+  listingType: string
+  isActive: number | boolean
+  isSold: number | boolean
+  viewCount: number
+  createdAt: Date
+}
+
+const RECONCILE_INTERVAL_MS = Number(process.env.STATS_RECONCILE_INTERVAL_MS || 60 * 60 * 1000)
+const BUCKET_RETENTION_DAYS = 31
+
+let reconcileTimer: NodeJS.Timeout | null = null
+
+// Zamkne řádek inzerátu a vrátí sloupce, na kterých statistiky závisí (volat uvnitř withTransaction)
+export async function lockProductStatsRow(connection: PoolConnection, productId: string) {
+  const [rows] = await connection.execute(
+    `SELECT id, userId, listingType, isActive, isSold, COALESCE(viewCount, 0) as viewCount, createdAt
+     FROM products WHERE id = ? FOR UPDATE`,
+    [productId]
+  )
+  return ((rows as any[])[0] as ProductStatsRow) || null
+}
+
+function isOpenOffer(row: ProductStatsRow) {
+  return row.listingType === 'NABIZIM' && !Number(row.isSold)
+}
+
+function contribution(row: ProductStatsRow | null): Record<CounterName, number> {
+  const open = !!row && isOpenOffer(row)
+  return {
+    productsTotal: row ? 1 : 0,
+    productsActive: row && Number(row.isActive) && !Number(row.isSold) ? 1 : 0,
+    productsInactive: row && !Number(row.isActive) ? 1 : 0,
+    offersOpen: open ? 1 : 0,
+    offerViews: row && row.listingType === 'NABIZIM' ? Number(row.viewCount) || 0 : 0,
+    offerSellers: 0,
+    usersTotal: 0,
+  }
+}
+
+// Promítne změnu inzerátu (before -> after, null = neexistuje) do čítačů, bucketů a prodejců.
+// Čítače se zamykají jako první - reconcileMarketplaceStats je drží po dobu přepočtu.
+export async function applyProductStatsChange(
+  connection: PoolConnection,
+  before: ProductStatsRow | null,
+  after: ProductStatsRow | null
+) {
+  const beforeCounts = contribution(before)
+  const afterCounts = contribution(after)
+  const deltas: Partial<Record<CounterName, number>> = {}
+  ;(Object.keys(afterCounts) as CounterName[]).forEach((name) => {
+    const delta = afterCounts[name] - beforeCounts[name]
+    if (delta !== 0) deltas[name] = delta
+  })
+
+  if (Object.keys(deltas).length === 0) return
+  await addCounters(connection, deltas)
+
+  const wasOpen = !!before && isOpenOffer(before)
+  const isOpen = !!after && isOpenOffer(after)
+  if (wasOpen === isOpen) return
+
+  const row = (isOpen ? after : before)!
+  const delta = isOpen ? 1 : -1
+
+  await connection.execute(
+    `INSERT INTO stats_listing_buckets (bucketStart, listings)
+     VALUES (DATE_FORMAT(?, '%Y-%m-%d %H:00:00'), ?)
+     ON DUPLICATE KEY UPDATE listings = listings + VALUES(listings)`,
+    [row.createdAt, delta]
+  )
+
+  // Prodejce se započítá při první otevřené nabídce a odečte při poslední
+  await connection.execute(
+    `INSERT INTO stats_sellers (userId, listings) VALUES (?, ?)
+     ON DUPLICATE KEY UPDATE listings = listings + VALUES(listings)`,
+    [row.userId, delta]
+  )
+  const [sellerRows] = await connection.execute('SELECT listings FROM stats_sellers WHERE userId = ?', [row.userId])
+  const listings = Number((sellerRows as any[])[0]?.listings) || 0
+  if (isOpen && listings === 1) {
+    await addCounters(connection, { offerSellers: 1 })
+  } else if (!isOpen && listings === 0) {
+    await addCounters(connection, { offerSellers: -1 })
+    await connection.execute('DELETE FROM stats_sellers WHERE userId = ? AND listings <= 0', [row.userId])
+  }
+}
+
+export async function addCounters(connection: PoolConnection, deltas: Partial<Record<CounterName, number>>) {
+  // Pevné pořadí řádků - souběžné transakce se na čítačích nezablokují navzájem
+  const names = (Object.keys(deltas) as CounterName[]).sort()
+  if (names.length === 0) return
+
+  const params: any[] = []
+  names.forEach((name) => params.push(name, deltas[name]))
+  await connection.execute(
+    `UPDATE stats_counters
+     SET value = value + CASE name ${names.map(() => 'WHEN ? THEN ?').join(' ')} ELSE 0 END
+     WHERE name IN (${names.map(() => '?').join(', ')})`,
+    [...params, ...names]
+  )
+}
+
+export async function readMarketplaceStats() {
+  const [counterRows, windows] = await Promise.all([
+    query<any[]>('SELECT name, value FROM stats_counters'),
+    queryOne(
+      `SELECT
+         COALESCE(SUM(CASE WHEN bucketStart >= DATE_FORMAT(NOW() - INTERVAL 23 HOUR, '%Y-%m-%d %H:00:00') THEN listings END), 0) as last24h,
+         COALESCE(SUM(CASE WHEN bucketStart >= DATE_FORMAT(NOW() - INTERVAL 167 HOUR, '%Y-%m-%d %H:00:00') THEN listings END), 0) as last7d,
+         COALESCE(SUM(listings), 0) as last30d
+       FROM stats_listing_buckets
+       WHERE bucketStart >= DATE_FORMAT(NOW() - INTERVAL 719 HOUR, '%Y-%m-%d %H:00:00')`
+    ),
+  ])
+
+  const counters: Record<CounterName, number> = {
+    productsTotal: 0,
+    productsActive: 0,
+    productsInactive: 0,
+    offersOpen: 0,
+    offerViews: 0,
+    offerSellers: 0,
+    usersTotal: 0,
+  }
+  ;(Array.isArray(counterRows) ? counterRows : []).forEach((row: any) => {
+    if (row.name in counters) counters[row.name as CounterName] = Math.max(0, Number(row.value) || 0)
+  })
+
+  return {
+    ...counters,
+    newLast24h: Number(windows?.last24h) || 0,
+    newLast7d: Number(windows?.last7d) || 0,
+    newLast30d: Number(windows?.last30d) || 0,
+  }
+}
+
+// Přepočítá všechny statistiky z tabulek products a users. Zámek na čítačích drží zápisy inzerátů
+// čekat, takže přepočet i následné přírůstky navazují bez ztráty.
+export async function reconcileMarketplaceStats() {
+  await withTransaction(async (connection) => {
+    await connection.execute('SELECT name FROM stats_counters FOR UPDATE')
+
+    const [[totals]] = (await connection.execute(
+      `SELECT
+         COUNT(*) as productsTotal,
+         COALESCE(SUM(isActive = 1 AND isSold = 0), 0) as productsActive,
+         COALESCE(SUM(isActive = 0), 0) as productsInactive,
+         COALESCE(SUM(listingType = 'NABIZIM' AND isSold = 0), 0) as offersOpen,
+         COALESCE(SUM(CASE WHEN listingType = 'NABIZIM' THEN COALESCE(viewCount, 0) END), 0) as offerViews,
+         COUNT(DISTINCT CASE WHEN listingType = 'NABIZIM' AND isSold = 0 THEN userId END) as offerSellers
+       FROM products`
+    )) as any
+    const [[users]] = (await connection.execute('SELECT COUNT(*) as usersTotal FROM users')) as any
+
+    const values: Record<CounterName, number> = {
+      productsTotal: Number(totals.productsTotal) || 0,
+      productsActive: Number(totals.productsActive) || 0,
+      productsInactive: Number(totals.productsInactive) || 0,
+      offersOpen: Number(totals.offersOpen) || 0,
+      offerViews: Number(totals.offerViews) || 0,
+      offerSellers: Number(totals.offerSellers) || 0,
+      usersTotal: Number(users.usersTotal) || 0,
+    }
+    const names = Object.keys(values) as CounterName[]
+    const params: any[] = []
+    names.forEach((name) => params.push(name, values[name]))
+    await connection.execute(
+      `INSERT INTO stats_counters (name, value) VALUES ${names.map(() => '(?, ?)').join(', ')}
+       ON DUPLICATE KEY UPDATE value = VALUES(value)`,
+      params
+    )
+
+    await connection.execute('DELETE FROM stats_listing_buckets')
+    await connection.execute(
+      `INSERT INTO stats_listing_buckets (bucketStart, listings)
+       SELECT DATE_FORMAT(createdAt, '%Y-%m-%d %H:00:00') as bucketStart, COUNT(*)
+       FROM products
+       WHERE listingType = 'NABIZIM' AND isSold = 0 AND createdAt >= NOW() - INTERVAL ${BUCKET_RETENTION_DAYS} DAY
+       GROUP BY bucketStart`
+    )
+
+    await connection.execute('DELETE FROM stats_sellers')
+    await connection.execute(
+      `INSERT INTO stats_sellers (userId, listings)
+       SELECT userId, COUNT(*) FROM products
+       WHERE listingType = 'NABIZIM' AND isSold = 0
+       GROUP BY userId`
+    )
+  })
+}
+
+// Periodický přepočet (časovač zakládá první požadavek na stats endpointy) - napříč instancemi ho
+// v jednom intervalu provede jen jedna (značka v Redis), bez Redis běží v každém procesu (jedna instance).
+// První přepočet proběhne až po uplynutí intervalu, ne v požadavku, který časovač založil - po startu
+// nebo nasazení by jinak každý proces hned zamkl čítače a procházel celou tabulku products.
+// Okamžitý přepočet (např. po migraci) je npm run stats:reconcile.
+export function startStatsReconciler() {
+  if (reconcileTimer || RECONCILE_INTERVAL_MS <= 0) return
+
+  const tick = async () => {
+    const client = getRedis()
+    if (client) {
+      const acquired = await client.set('stats:reconcile:lock', '1', 'PX', RECONCILE_INTERVAL_MS, 'NX')
+      if (!acquired) return
+    }
+    await reconcileMarketplaceStats()
+  }
+  const run = () => {
+    tick().catch((error) => console.error('[Stats] Přepočet statistik selhal:', error))
+  }
+
+  reconcileTimer = setInterval(run, RECONCILE_INTERVAL_MS)
+  reconcileTimer.unref?.()
+}
@@ -1,12 +1,52 @@
-import { mkdir, writeFile } from 'fs/promises'
-import { join } from 'path'
+import { mkdir, open, readFile, rename, rm, unlink, writeFile } from 'fs/promises'
+import { createReadStream, createWriteStream } from 'fs'
+import { dirname, join } from 'path'
+import { Readable } from 'stream'
+import { pipeline } from 'stream/promises'
 import crypto from 'crypto'
-import { S3Client, PutObjectCommand } from '@aws-sdk/client-s3'
+import {
+  S3Client,
+  PutObjectCommand,
+  GetObjectCommand,
+  HeadObjectCommand,
+  DeleteObjectCommand,
+  DeleteObjectsCommand,
+  ListObjectsV2Command,
+  CreateMultipartUploadCommand,
+  UploadPartCommand,
+  CompleteMultipartUploadCommand,
+  AbortMultipartUploadCommand,
+} from '@aws-sdk/client-s3'
+import { getSignedUrl } from '@aws-sdk/s3-request-presigner'
+import { insert, queryOne, update } from '@/lib/mysql'
 
 type StorageProvider = 'local' | 's3'
 
 const provider = (process.env.STORAGE_PROVIDER || 'local').toLowerCase() as StorageProvider
 
+// Kolik souborů jednoho požadavku se nahrává současně (10 fotek na S3 = ~3 latence PUT místo 10)
+const UPLOAD_CONCURRENCY = Math.max(1, Number(process.env.UPLOAD_CONCURRENCY || 4))
+// Větší soubory jdou na S3 po částech (minimální velikost části je 5 MB)
+const S3_MULTIPART_THRESHOLD = Number(process.env.S3_MULTIPART_THRESHOLD_BYTES || 8 * 1024 * 1024)
+const S3_MULTIPART_PART_SIZE = Math.max(5 * 1024 * 1024, Number(process.env.S3_MULTIPART_PART_SIZE_BYTES || 8 * 1024 * 1024))
+
+// Soubor na disku - dočasný soubor z lib/multipart.ts, hash (SHA-256) se spočítal už při zápisu
+export type FileSource = { path: string; size: number; hash?: string }
+
+// Soubor z formuláře (File je Blob, dočasný soubor) se čte jako stream přímo do cíle - bez kopie
+// celého obsahu v paměti. Buffer zůstává pro data, která už v paměti jsou.
+export type UploadSource = Buffer | Blob | FileSource
+
+function sourceSize(source: UploadSource) {
+  return Buffer.isBuffer(source) ? source.length : source.size
+}
+
+function sourceStream(source: UploadSource): Readable {
+  if (Buffer.isBuffer(source)) return Readable.from([source])
+  if ('path' in source) return createReadStream(source.path)
+  return Readable.fromWeb(source.stream() as any)
+}
+
 let s3Client: S3Client | null = null
 
 function getS3Client(): S3Client {
@@ -27,68 +67,167 @@ function getS3Client(): S3Client {
   return s3Client
 }
 
-function randomFileName(extension: string) {
-  const random = crypto.randomBytes(16).toString('hex')
-  const timestamp = Date.now()
-  return `${timestamp}-${random}${extension}`
+let s3PresignClient: S3Client | null = null
+
+// Podepsané URL otevírá prohlížeč - S3_PUBLIC_ENDPOINT, pokud je S3_ENDPOINT dostupný jen zevnitř
+// (např. MinIO v dockeru jako http://minio:9000)
+function getS3PresignClient(): S3Client {
+  if (!process.env.S3_PUBLIC_ENDPOINT) return getS3Client()
+  if (s3PresignClient) return s3PresignClient
+
+  s3PresignClient = new S3Client({
+    region: process.env.S3_REGION || 'eu-central-1',
+    endpoint: process.env.S3_PUBLIC_ENDPOINT,
+    forcePathStyle: process.env.S3_FORCE_PATH_STYLE === '1',
+    credentials: process.env.S3_ACCESS_KEY_ID
+      ? {
+          accessKeyId: process.env.S3_ACCESS_KEY_ID!,
+          secretAccessKey: process.env.S3_SECRET_ACCESS_KEY!,
+        }
+      : undefined,
+  })
+
+  return s3PresignClient
 }
 
 export type StoredFile = {
   url: string
+  // Klíč v úložišti (lokálně relativně k public/uploads)
   key: string
+  // SHA-256 obsahu - adresa objektu v tabulce stored_objects
+  hash: string
 }
 
-async function saveLocalFile(buffer: Buffer, originalName: string, folder: string): Promise<StoredFile> {
-  const uploadsDir = join(process.cwd(), 'public', 'uploads', folder)
-  await mkdir(uploadsDir, { recursive: true })
-
-  const extension = originalName.match(/\.[a-z0-9]+$/i)?.[0] || '.jpg'
-  const fileName = randomFileName(extension.toLowerCase())
-  const filePath = join(uploadsDir, fileName)
+// Obsah se zapíše do dočasného souboru a přejmenuje - souběžné nahrání stejné fotky nikdy
+// nepřepisuje hotový soubor napůl
+async function saveLocalFile(source: UploadSource, key: string) {
+  const filePath = join(process.cwd(), 'public', 'uploads', key)
+  const tempPath = `${filePath}.${crypto.randomBytes(8).toString('hex')}.tmp`
+  await mkdir(dirname(filePath), { recursive: true })
 
-  await writeFile(filePath, buffer)
-
-  const relativePath = `/uploads/${folder}/${fileName}`
-  return {
-    url: relativePath,
-    key: relativePath,
+  try {
+    await pipeline(sourceStream(source), createWriteStream(tempPath))
+    await rename(tempPath, filePath)
+  } catch (error) {
+    // Nedopsaný soubor nenechávat na disku
+    await unlink(tempPath).catch(() => {})
+    throw error
   }
 }
 
-async function saveS3File(buffer: Buffer, originalName: string, folder: string): Promise<StoredFile> {
+function s3Bucket() {
   const bucket = process.env.S3_BUCKET
   if (!bucket) {
     throw new Error('S3_BUCKET není definováno')
   }
+  return bucket
+}
 
-  const extension = originalName.match(/\.[a-z0-9]+$/i)?.[0] || '.jpg'
-  const key = `${folder}/${randomFileName(extension.toLowerCase())}`
-
+async function saveS3File(source: UploadSource, key: string, contentType: string) {
+  const bucket = s3Bucket()
   const client = getS3Client()
+  const size = sourceSize(source)
 
-  await client.send(
-    new PutObjectCommand({
-      Bucket: bucket,
-      Key: key,
-      Body: buffer,
-      ContentType: mimeFromExtension(extension),
-      ACL: process.env.S3_OBJECT_ACL || 'public-read',
-    })
-  )
+  if (size > S3_MULTIPART_THRESHOLD) {
+    await uploadS3Multipart(
+      client,
+      { Bucket: bucket, Key: key, ContentType: contentType, ACL: process.env.S3_OBJECT_ACL || 'public-read' },
+      source
+    )
+  } else {
+    await client.send(
+      new PutObjectCommand({
+        Bucket: bucket,
+        Key: key,
+        // Stream se známou délkou - SDK ho nemusí načíst celý do paměti
+        Body: Buffer.isBuffer(source) ? source : sourceStream(source),
+        ContentLength: size,
+        ContentType: contentType,
+        ACL: process.env.S3_OBJECT_ACL || 'public-read',
+      })
+    )
+  }
+}
 
+function s3ObjectUrl(bucket: string, key: string) {
   const cdnUrl = process.env.CDN_BASE_URL?.replace(/\/$/, '')
   const region = process.env.S3_REGION || 'eu-central-1'
 
-  const url = cdnUrl
+  return cdnUrl
     ? `${cdnUrl}/${key}`
     : `https://${bucket}.s3.${region}.amazonaws.com/${key}`
+}
 
-  return {
-    url,
-    key,
+// Multipart upload: stream se čte po částech S3_MULTIPART_PART_SIZE, v paměti je vždy jen jedna část.
+// Při chybě se upload zruší, aby nezůstaly účtované nedokončené části.
+async function uploadS3Multipart(
+  client: S3Client,
+  target: { Bucket: string; Key: string; ContentType: string; ACL: string },
+  source: UploadSource
+) {
+  const { UploadId } = await client.send(new CreateMultipartUploadCommand(target))
+  const parts: { ETag?: string; PartNumber: number }[] = []
+
+  try {
+    await readInParts(sourceStream(source), S3_MULTIPART_PART_SIZE, async (body) => {
+      const PartNumber = parts.length + 1
+      const { ETag } = await client.send(
+        new UploadPartCommand({ Bucket: target.Bucket, Key: target.Key, UploadId, PartNumber, Body: body })
+      )
+      parts.push({ ETag, PartNumber })
+    })
+
+    await client.send(
+      new CompleteMultipartUploadCommand({
+        Bucket: target.Bucket,
+        Key: target.Key,
+        UploadId,
+        MultipartUpload: { Parts: parts },
+      })
+    )
+  } catch (error) {
+    await client
+      .send(new AbortMultipartUploadCommand({ Bucket: target.Bucket, Key: target.Key, UploadId }))
+      .catch(() => {})
+    throw error
   }
 }
 
+// Předá stream po částech alespoň partSize bajtů (poslední může být menší); během zpracování části
+// je stream pozastavený
+function readInParts(stream: Readable, partSize: number, onPart: (part: Buffer) => Promise<void>) {
+  return new Promise<void>((resolve, reject) => {
+    let chunks: Buffer[] = []
+    let size = 0
+    let failed = false
+
+    const fail = (error: unknown) => {
+      if (failed) return
+      failed = true
+      stream.destroy()
+      reject(error)
+    }
+
+    stream.on('data', (chunk: Buffer) => {
+      chunks.push(chunk)
+      size += chunk.length
+      if (size < partSize) return
+
+      const part = Buffer.concat(chunks, size)
+      chunks = []
+      size = 0
+      stream.pause()
+      onPart(part).then(() => stream.resume(), fail)
+    })
+    stream.on('end', () => {
+      if (failed) return
+      const last = chunks.length > 0 ? onPart(Buffer.concat(chunks, size)) : Promise.resolve()
+      last.then(() => resolve(), fail)
+    })
+    stream.on('error', fail)
+  })
+}
+
 function mimeFromExtension(extension: string) {
   const map: Record<string, string> = {
     '.jpg': 'image/jpeg',
@@ -102,25 +241,265 @@ function mimeFromExtension(extension: string) {
   return map[extension.toLowerCase()] || 'application/octet-stream'
 }
 
-export async function storeFile(buffer: Buffer, originalName: string, folder: string): Promise<StoredFile> {
+// SHA-256 obsahu; soubor se čte jako stream, v paměti se nedrží další kopie
+function hashSource(source: UploadSource): Promise<string> {
+  const hash = crypto.createHash('sha256')
+  if (Buffer.isBuffer(source)) return Promise.resolve(hash.update(source).digest('hex'))
+  if ('path' in source && source.hash) return Promise.resolve(source.hash)
+
+  return new Promise((resolve, reject) => {
+    const stream = sourceStream(source)
+    stream.on('data', (chunk: Buffer) => hash.update(chunk))
+    stream.on('end', () => resolve(hash.digest('hex')))
+    stream.on('error', reject)
+  })
+}
+
+// Existující objekt se stejným obsahem. updatedAt se posune, aby ho garbage collector
+// (lib/stored-objects.ts) nesmazal dřív, než na něj nový záznam stihne odkázat.
+export async function findStoredObject(hash: string): Promise<StoredFile | null> {
+  const touched = await update('UPDATE stored_objects SET updatedAt = NOW(3) WHERE hash = ?', [hash])
+  if (!touched) return null
+
+  const row = await queryOne<{ url: string; storageKey: string }>(
+    'SELECT url, storageKey FROM stored_objects WHERE hash = ?',
+    [hash]
+  )
+  return row ? { url: row.url, key: row.storageKey, hash } : null
+}
+
+// Uloží soubor pod adresou podle obsahu (<folder>/<sha256><přípona>). Stejný obsah se nahrává jen
+// jednou - opakované nahrání téže fotky (úprava, nový inzerát) vrátí existující objekt bez zápisu.
+// Na objekt musí odkázat záznam přes setObjectRefs, jinak ho garbage collector po čase smaže.
+export async function storeFile(source: UploadSource, originalName: string, folder: string): Promise<StoredFile> {
+  const hash = await hashSource(source)
+  const existing = await findStoredObject(hash)
+  if (existing) return existing
+
+  const extension = (originalName.match(/\.[a-z0-9]+$/i)?.[0] || '.jpg').toLowerCase()
+  const key = `${folder}/${hash}${extension}`
+  const contentType = mimeFromExtension(extension)
+
   if (provider === 's3') {
-    return saveS3File(buffer, originalName, folder)
+    await saveS3File(source, key, contentType)
+  } else {
+    await saveLocalFile(source, key)
   }
 
-  return saveLocalFile(buffer, originalName, folder)
+  return registerStoredObject(hash, key, sourceSize(source), contentType)
 }
 
-export async function storeFiles(buffers: Array<{ buffer: Buffer; originalName: string }>, folder: string) {
-  const results: StoredFile[] = []
+// Zaeviduje zapsaný objekt v stored_objects. Souběžně mohl stejný obsah uložit jiný požadavek -
+// platí řádek, který vznikl první.
+export async function registerStoredObject(hash: string, key: string, size: number, contentType: string): Promise<StoredFile> {
+  await insert(
+    `INSERT INTO stored_objects (hash, storageKey, url, size, contentType, createdAt, updatedAt)
+     VALUES (?, ?, ?, ?, ?, NOW(3), NOW(3))
+     ON DUPLICATE KEY UPDATE updatedAt = NOW(3)`,
+    [hash, key, objectUrl(key), size, contentType]
+  )
+  return (await findStoredObject(hash)) || { url: objectUrl(key), key, hash }
+}
 
-  for (const file of buffers) {
-    const stored = await storeFile(file.buffer, file.originalName, folder)
-    results.push(stored)
+// Nahraje soubory s omezenou souběžností. Výsledky jsou ve stejném pořadí jako vstup; soubor, který
+// se nepodařilo uložit, má null (chyba se zaloguje) - ostatní se uloží i tak.
+export async function storeFiles(
+  files: Array<{ source: UploadSource; originalName: string }>,
+  folder: string,
+  concurrency = UPLOAD_CONCURRENCY
+): Promise<Array<StoredFile | null>> {
+  return mapWithConcurrency(files, concurrency, async (file) => {
+    try {
+      return await storeFile(file.source, file.originalName, folder)
+    } catch (error) {
+      console.error(`Chyba při ukládání souboru ${file.originalName}:`, error)
+      return null
+    }
+  })
+}
+
+// Jako Promise.all(items.map(fn)), ale nejvýš limit běžících najednou; pořadí výsledků odpovídá vstupu
+export async function mapWithConcurrency<T, R>(items: T[], limit: number, fn: (item: T, index: number) => Promise<R>) {
+  const results = new Array<R>(items.length)
+  let next = 0
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++
+      results[index] = await fn(items[index], index)
+    }
   }
 
+  await Promise.all(Array.from({ length: Math.min(Math.max(1, limit), items.length) }, worker))
   return results
 }
 
+// Objekty s pevným klíčem (např. odvozené velikosti obrázků, lib/images.ts). Klíč je relativní
+// k úložišti: lokálně public/uploads/<key>, na S3 přímo <key>.
+export async function storeObject(key: string, body: Buffer, contentType: string): Promise<Omit<StoredFile, 'hash'>> {
+  if (provider === 's3') {
+    await getS3Client().send(
+      new PutObjectCommand({
+        Bucket: s3Bucket(),
+        Key: key,
+        Body: body,
+        ContentLength: body.length,
+        ContentType: contentType,
+        // Klíče storeObject jsou odvozené z obsahu - objekt se pod klíčem nemění
+        CacheControl: 'public, max-age=31536000, immutable',
+        ACL: process.env.S3_OBJECT_ACL || 'public-read',
+      })
+    )
+    return { url: objectUrl(key), key }
+  }
+
+  const filePath = join(process.cwd(), 'public', 'uploads', key)
+  await mkdir(dirname(filePath), { recursive: true })
+  await writeFile(filePath, body)
+  return { url: objectUrl(key), key }
+}
+
+// Obsah objektu, null pokud v úložišti není
+export async function readObject(key: string): Promise<Buffer | null> {
+  if (provider === 's3') {
+    try {
+      const { Body } = await getS3Client().send(new GetObjectCommand({ Bucket: s3Bucket(), Key: key }))
+      return Body ? Buffer.from(await Body.transformToByteArray()) : null
+    } catch (error: any) {
+      if (error?.name === 'NoSuchKey' || error?.$metadata?.httpStatusCode === 404) return null
+      throw error
+    }
+  }
+
+  try {
+    return await readFile(join(process.cwd(), 'public', 'uploads', key))
+  } catch (error: any) {
+    if (error?.code === 'ENOENT') return null
+    throw error
+  }
+}
+
+// Podepsaná URL pro PUT objektu přímo z prohlížeče (jen S3). Podpis váže typ, délku a SHA-256 obsahu
+// (x-amz-checksum-sha256) - úložiště odmítne jiná data, než jaká byla ohlášena. headers musí klient
+// poslat s požadavkem beze změny.
+export async function presignObjectUpload(
+  key: string,
+  file: { size: number; contentType: string; hash: string },
+  expiresInSeconds: number
+) {
+  if (provider !== 's3') {
+    throw new Error('Přímé nahrávání vyžaduje STORAGE_PROVIDER=s3')
+  }
+
+  const checksum = Buffer.from(file.hash, 'hex').toString('base64')
+  const cacheControl = 'public, max-age=31536000, immutable'
+  const url = await getSignedUrl(
+    getS3PresignClient(),
+    new PutObjectCommand({
+      Bucket: s3Bucket(),
+      Key: key,
+      ContentType: file.contentType,
+      ContentLength: file.size,
+      ChecksumSHA256: checksum,
+      // Klíč je odvozený z obsahu - objekt se pod klíčem nemění
+      CacheControl: cacheControl,
+      ACL: process.env.S3_OBJECT_ACL || 'public-read',
+    }),
+    {
+      expiresIn: expiresInSeconds,
+      signableHeaders: new Set(['content-type', 'content-length', 'cache-control']),
+      // Kontrolní součet musí přijít jako hlavička, v query by ho úložiště neověřovalo
+      unhoistableHeaders: new Set(['x-amz-checksum-sha256']),
+    }
+  )
+
+  return {
+    url,
+    headers: {
+      'Content-Type': file.contentType,
+      'Cache-Control': cacheControl,
+      'x-amz-checksum-sha256': checksum,
+    },
+  }
+}
+
+// Velikost, uložený SHA-256 (pokud ho úložiště vede, base64) a prvních headBytes bajtů objektu
+// (ranged GET - objekt se kvůli kontrole nestahuje celý). null = objekt neexistuje.
+export async function inspectObject(key: string, headBytes: number) {
+  if (provider === 's3') {
+    const client = getS3Client()
+    const bucket = s3Bucket()
+    try {
+      const head = await client.send(new HeadObjectCommand({ Bucket: bucket, Key: key, ChecksumMode: 'ENABLED' }))
+      const size = Number(head.ContentLength || 0)
+      const { Body } = await client.send(
+        new GetObjectCommand({ Bucket: bucket, Key: key, Range: `bytes=0-${Math.max(0, headBytes - 1)}` })
+      )
+      return {
+        size,
+        checksumSHA256: head.ChecksumSHA256 || null,
+        head: Body ? Buffer.from(await Body.transformToByteArray()) : Buffer.alloc(0),
+      }
+    } catch (error: any) {
+      if (error?.name === 'NotFound' || error?.name === 'NoSuchKey' || error?.$metadata?.httpStatusCode === 404) return null
+      throw error
+    }
+  }
+
+  let handle
+  try {
+    handle = await open(join(process.cwd(), 'public', 'uploads', key), 'r')
+  } catch (error: any) {
+    if (error?.code === 'ENOENT') return null
+    throw error
+  }
+  try {
+    const { size } = await handle.stat()
+    const head = Buffer.alloc(Math.min(headBytes, size))
+    await handle.read(head, 0, head.length, 0)
+    return { size, checksumSHA256: null, head }
+  } finally {
+    await handle.close()
+  }
+}
+
+// Chybějící objekt není chyba
+export async function deleteObject(key: string) {
+  if (provider === 's3') {
+    await getS3Client().send(new DeleteObjectCommand({ Bucket: s3Bucket(), Key: key }))
+    return
+  }
+
+  await rm(join(process.cwd(), 'public', 'uploads', key), { force: true })
+}
+
+// Smaže všechny objekty pod prefixem <prefix>/ (např. varianty obrázku, lib/images.ts)
+export async function deleteObjectPrefix(prefix: string) {
+  if (provider === 's3') {
+    const client = getS3Client()
+    const bucket = s3Bucket()
+    let ContinuationToken: string | undefined
+    do {
+      const listed = await client.send(
+        new ListObjectsV2Command({ Bucket: bucket, Prefix: `${prefix}/`, ContinuationToken })
+      )
+      const objects = (listed.Contents || []).map((object) => ({ Key: object.Key! }))
+      if (objects.length > 0) {
+        await client.send(new DeleteObjectsCommand({ Bucket: bucket, Delete: { Objects: objects, Quiet: true } }))
+      }
+      ContinuationToken = listed.IsTruncated ? listed.NextContinuationToken : undefined
+    } while (ContinuationToken)
+    return
+  }
+
+  await rm(join(process.cwd(), 'public', 'uploads', prefix), { recursive: true, force: true })
+}
+
+// Veřejná URL objektu podle klíče (viz storeObject)
+export function objectUrl(key: string) {
+  return provider === 's3' ? s3ObjectUrl(s3Bucket(), key) : `/uploads/${key}`
+}
+
 export function getStorageProvider() {
   return provider
 }
@@ -0,0 +1,124 @@
+import { PoolConnection } from 'mysql2/promise'
+import { query, update } from '@/lib/mysql'
+import { deleteObject, deleteObjectPrefix } from '@/lib/storage'
+import { imageVariantsPrefix } from '@/lib/images'
+
+// Odkazy na uložené soubory a úklid souborů, které nikdo nepoužívá.
+//
+// storeFile (lib/storage.ts) adresuje soubory hashem obsahu a eviduje je v stored_objects - stejná
+// fotka nahraná znovu (úprava, znovuvystavení, další inzerát) je v úložišti jen jednou.
+// stored_object_refs váže hash na inzerát, servis nebo recenzi: jeden řádek na dvojici vlastník-hash,
+// počet odkazů objektu je počet jeho řádků. Záznam nastavuje své odkazy ve stejné transakci, ve které
+// ukládá URL obrázků (setObjectRefs).
+//
+// Objekt bez odkazů starší než STORED_OBJECTS_GC_GRACE_HOURS smaže collectOrphanedObjects i s variantami
+// (npm run storage:gc). Lhůta chrání soubory, které se právě nahrály a jejichž záznam se teprve ukládá.
+// Odkazy smazaných záznamů (včetně kaskádového mazání uživatele nebo servisu) uklízí collector také.
+// Soubory nahrané před zavedením stored_objects se neevidují a collector na ně nesahá.
+
+export type ObjectOwnerType = 'product' | 'service' | 'review'
+
+const GC_GRACE_HOURS = Number(process.env.STORED_OBJECTS_GC_GRACE_HOURS || 24)
+
+const ownerTables: Record<ObjectOwnerType, string> = {
+  product: 'products',
+  service: 'services',
+  review: 'service_reviews',
+}
+
+// Nastaví odkazy záznamu na přesně tyto URL (volat uvnitř withTransaction). URL, které nejsou
+// v stored_objects (starší soubory, cizí adresy), se přeskočí.
+export async function setObjectRefs(
+  connection: PoolConnection,
+  ownerType: ObjectOwnerType,
+  ownerId: string,
+  urls: Array<string | null | undefined>
+) {
+  const unique = Array.from(new Set(urls.filter((url): url is string => typeof url === 'string' && url.length > 0)))
+
+  let hashes: string[] = []
+  if (unique.length > 0) {
+    const [rows] = await connection.query('SELECT hash FROM stored_objects WHERE url IN (?)', [unique])
+    hashes = (rows as any[]).map((row) => row.hash)
+  }
+
+  if (hashes.length === 0) {
+    await connection.execute('DELETE FROM stored_object_refs WHERE ownerType = ? AND ownerId = ?', [ownerType, ownerId])
+    return
+  }
+
+  await connection.query(
+    'DELETE FROM stored_object_refs WHERE ownerType = ? AND ownerId = ? AND hash NOT IN (?)',
+    [ownerType, ownerId, hashes]
+  )
+  await connection.query(
+    'INSERT IGNORE INTO stored_object_refs (ownerType, ownerId, hash, createdAt) VALUES ?',
+    [hashes.map((hash) => [ownerType, ownerId, hash, new Date()])]
+  )
+}
+
+// Odkazy záznamů, které už neexistují (nejvýš limit na typ vlastníka)
+async function pruneDanglingRefs(limit: number) {
+  let pruned = 0
+  for (const ownerType of Object.keys(ownerTables) as ObjectOwnerType[]) {
+    pruned += await update(
+      `DELETE FROM stored_object_refs
+       WHERE ownerType = ?
+         AND NOT EXISTS (SELECT 1 FROM ${ownerTables[ownerType]} o WHERE o.id = stored_object_refs.ownerId)
+       LIMIT ?`,
+      [ownerType, limit]
+    )
+  }
+  return pruned
+}
+
+// Jedna dávka úklidu: odkazy smazaných záznamů a nejvýš batchSize objektů bez odkazů.
+// hasMore = má smysl pustit další dávku. S dryRun se nic nemaže, jen se vrátí kandidáti.
+export async function collectOrphanedObjects(batchSize = 100, dryRun = false) {
+  const prunedRefs = dryRun ? 0 : await pruneDanglingRefs(batchSize)
+
+  const candidates = await query<Array<{ hash: string; storageKey: string; size: number }>>(
+    `SELECT o.hash, o.storageKey, o.size
+     FROM stored_objects o
+     WHERE o.updatedAt < NOW(3) - INTERVAL ? HOUR
+       AND NOT EXISTS (SELECT 1 FROM stored_object_refs r WHERE r.hash = o.hash)
+     ORDER BY o.updatedAt
+     LIMIT ?`,
+    [GC_GRACE_HOURS, batchSize]
+  )
+
+  let deleted = 0
+  let freedBytes = 0
+  if (!dryRun) {
+    for (const candidate of candidates) {
+      // Podmínky znovu - mezitím na objekt mohl vzniknout odkaz nebo ho někdo nahrál znovu.
+      // Řádek se maže před souborem: při chybě zůstane nanejvýš neevidovaný soubor, nikdy ne
+      // evidovaný objekt bez souboru.
+      const removed = await update(
+        `DELETE FROM stored_objects
+         WHERE hash = ?
+           AND updatedAt < NOW(3) - INTERVAL ? HOUR
+           AND NOT EXISTS (SELECT 1 FROM stored_object_refs r WHERE r.hash = ?)`,
+        [candidate.hash, GC_GRACE_HOURS, candidate.hash]
+      )
+      if (!removed) continue
+
+      try {
+        await deleteObject(candidate.storageKey)
+        await deleteObjectPrefix(imageVariantsPrefix(candidate.hash))
+      } catch (error) {
+        console.error(`[Storage] Soubor ${candidate.storageKey} se nepodařilo smazat:`, error)
+      }
+      deleted++
+      freedBytes += Number(candidate.size) || 0
+    }
+  }
+
+  return {
+    prunedRefs,
+    candidates: candidates.length,
+    deleted,
+    freedBytes,
+    hasMore: !dryRun && (candidates.length === batchSize || prunedRefs > 0),
+  }
+}
@@ -0,0 +1,256 @@
+import { randomBytes } from 'crypto'
+import { query, queryOne, update, withTransaction } from '@/lib/mysql'
+import { UPLOAD_MAX_FILE_SIZE, UPLOAD_MAX_TOTAL_SIZE, UploadError, sniffImageType } from '@/lib/multipart'
+import {
+  StoredFile,
+  deleteObject,
+  findStoredObject,
+  getStorageProvider,
+  inspectObject,
+  presignObjectUpload,
+  registerStoredObject,
+} from '@/lib/storage'
+
+// Přímé nahrávání obrázků z prohlížeče do S3 (bez průchodu přes Next.js).
+//
+// 1. POST /api/uploads ohlásí soubory (velikost, typ, SHA-256) a dostane relaci s podepsanými PUT URL
+//    (createUploadSession). Klíč je rovnou adresa podle obsahu (<folder>/<sha256><přípona>) jako
+//    u storeFile; soubory, které už v stored_objects jsou, se nenahrávají vůbec.
+// 2. Prohlížeč nahraje soubory přímo do úložiště. Podpis váže délku a SHA-256 - jiná data úložiště
+//    nepřijme.
+// 3. Formulář inzerátu pošle místo obrázků uploadSessionId. commitUploadSession relaci jednorázově
+//    spotřebuje a každý objekt ověří: velikost z HEAD a typ podle magic bytes z ranged GET (prvních
+//    pár bajtů, objekt se nestahuje). Teprve pak se objekty zaevidují v stored_objects.
+//
+// Objekty nedokončených relací bez záznamu v stored_objects maže collectExpiredUploadSessions
+// (npm run storage:gc). Lokálně se dá celý tok vyzkoušet proti MinIO (npm run uploads:check).
+
+export type UploadPurpose = 'products'
+
+export type UploadSessionFile = { size: number; contentType: string; sha256: string }
+
+const SESSION_TTL_SECONDS = Math.max(60, Number(process.env.UPLOAD_SESSION_TTL_SECONDS || 900))
+// Nejvýš otevřených relací jednoho uživatele za hodinu
+const MAX_SESSIONS_PER_HOUR = Number(process.env.UPLOAD_SESSIONS_PER_HOUR || 30)
+// Signatury jsou v prvních 12 bajtech (lib/multipart.ts)
+const SNIFF_BYTES = 12
+
+const purposes: Record<UploadPurpose, { folder: string; maxFiles: number; extensions: string[] }> = {
+  products: { folder: 'products', maxFiles: 10, extensions: ['.png', '.jpg', '.webp', '.gif', '.heic'] },
+}
+
+const contentTypeExtensions: Record<string, string> = {
+  'image/jpeg': '.jpg',
+  'image/png': '.png',
+  'image/webp': '.webp',
+  'image/gif': '.gif',
+  'image/heic': '.heic',
+  'image/heif': '.heic',
+}
+
+export function isDirectUploadAvailable() {
+  return getStorageProvider() === 's3'
+}
+
+function validateFiles(purpose: UploadPurpose, files: unknown): UploadSessionFile[] {
+  const config = purposes[purpose]
+  if (!Array.isArray(files) || files.length === 0) {
+    throw new UploadError('Přidejte alespoň jeden obrázek')
+  }
+  if (files.length > config.maxFiles) {
+    throw new UploadError(`Maximálně ${config.maxFiles} obrázků`)
+  }
+
+  let total = 0
+  const validated = files.map((file: any, index) => {
+    const size = Number(file?.size)
+    const contentType = String(file?.contentType || '').toLowerCase()
+    const sha256 = String(file?.sha256 || '').toLowerCase()
+
+    if (!/^[0-9a-f]{64}$/.test(sha256)) {
+      throw new UploadError(`Obrázek ${index + 1}: neplatný SHA-256`)
+    }
+    if (!Number.isInteger(size) || size <= 0) {
+      throw new UploadError(`Obrázek ${index + 1}: neplatná velikost`)
+    }
+    if (size > UPLOAD_MAX_FILE_SIZE) {
+      throw new UploadError(`Obrázek ${index + 1} je příliš velký (max ${Math.round(UPLOAD_MAX_FILE_SIZE / 1024 / 1024)}MB)`, 413)
+    }
+    const extension = contentTypeExtensions[contentType]
+    if (!extension || config.extensions.indexOf(extension) === -1) {
+      throw new UploadError(`Obrázek ${index + 1}: nepodporovaný typ ${contentType || '(neuveden)'}`, 415)
+    }
+    total += size
+    return { size, contentType, sha256 }
+  })
+
+  if (total > UPLOAD_MAX_TOTAL_SIZE) {
+    throw new UploadError(`Obrázky jsou dohromady příliš velké (max ${Math.round(UPLOAD_MAX_TOTAL_SIZE / 1024 / 1024)}MB)`, 413)
+  }
+  return validated
+}
+
+// Založí relaci a vrátí podepsané URL. Soubor, jehož obsah už v úložišti je, má upload null.
+export async function createUploadSession(userId: string, purpose: UploadPurpose, rawFiles: unknown) {
+  if (!purposes[purpose]) {
+    throw new UploadError('Neplatný účel nahrávání')
+  }
+  const files = validateFiles(purpose, rawFiles)
+
+  const recent = await queryOne<{ count: number }>(
+    'SELECT COUNT(*) as count FROM upload_sessions WHERE userId = ? AND createdAt > NOW(3) - INTERVAL 1 HOUR',
+    [userId]
+  )
+  if (Number(recent?.count || 0) >= MAX_SESSIONS_PER_HOUR) {
+    throw new UploadError('Příliš mnoho nahrávání, zkuste to později', 429)
+  }
+
+  const id = randomBytes(16).toString('hex')
+  const expiresAt = new Date(Date.now() + SESSION_TTL_SECONDS * 1000)
+  const entries = files.map((file, index) => ({
+    ...file,
+    index,
+    key: `${purposes[purpose].folder}/${file.sha256}${contentTypeExtensions[file.contentType]}`,
+  }))
+
+  await withTransaction(async (connection) => {
+    await connection.execute(
+      `INSERT INTO upload_sessions (id, userId, purpose, status, expiresAt, createdAt)
+       VALUES (?, ?, ?, 'pending', ?, NOW(3))`,
+      [id, userId, purpose, expiresAt]
+    )
+    await connection.query(
+      'INSERT INTO upload_session_files (sessionId, fileIndex, hash, storageKey, size, contentType) VALUES ?',
+      [entries.map((entry) => [id, entry.index, entry.sha256, entry.key, entry.size, entry.contentType])]
+    )
+  })
+
+  const uploads = []
+  for (const entry of entries) {
+    // Existující objekt se nenahrává; findStoredObject mu zároveň posune lhůtu pro garbage collector
+    const existing = await findStoredObject(entry.sha256)
+    uploads.push({
+      index: entry.index,
+      upload: existing
+        ? null
+        : {
+            method: 'PUT' as const,
+            ...(await presignObjectUpload(
+              entry.key,
+              { size: entry.size, contentType: entry.contentType, hash: entry.sha256 },
+              SESSION_TTL_SECONDS
+            )),
+          },
+    })
+  }
+
+  return { sessionId: id, expiresAt: expiresAt.toISOString(), uploads }
+}
+
+// Ověří nahraný objekt; null = v pořádku, jinak důvod odmítnutí
+async function verifyUploadedObject(file: { hash: string; storageKey: string; size: number; contentType: string }) {
+  const object = await inspectObject(file.storageKey, SNIFF_BYTES)
+  if (!object) return 'soubor nebyl nahrán'
+  if (object.size !== Number(file.size)) return 'velikost neodpovídá'
+  // Úložiště kontrolní součet při PUT ověřilo; pokud ho vede, porovná se i tady
+  if (object.checksumSHA256 && object.checksumSHA256 !== Buffer.from(file.hash, 'hex').toString('base64')) {
+    return 'obsah neodpovídá'
+  }
+  const type = sniffImageType(object.head)
+  if (!type || type.extension !== contentTypeExtensions[file.contentType]) return 'soubor není ohlášený obrázek'
+  return null
+}
+
+// Jednorázově spotřebuje relaci uživatele a vrátí ověřené, zaevidované soubory v pořadí relace.
+// Na výsledné soubory musí záznam odkázat přes setObjectRefs (lib/stored-objects.ts).
+export async function commitUploadSession(
+  sessionId: string,
+  userId: string,
+  purpose: UploadPurpose
+): Promise<Array<{ index: number; file: StoredFile }>> {
+  const claimed = await update(
+    `UPDATE upload_sessions SET status = 'committed', committedAt = NOW(3)
+     WHERE id = ? AND userId = ? AND purpose = ? AND status = 'pending' AND expiresAt > NOW(3)`,
+    [sessionId, userId, purpose]
+  )
+  if (!claimed) {
+    throw new UploadError('Relace nahrávání neexistuje, vypršela nebo už byla použita')
+  }
+
+  const files = await query<Array<{ fileIndex: number; hash: string; storageKey: string; size: number; contentType: string }>>(
+    'SELECT fileIndex, hash, storageKey, size, contentType FROM upload_session_files WHERE sessionId = ? ORDER BY fileIndex',
+    [sessionId]
+  )
+
+  const committed: Array<{ index: number; file: StoredFile }> = []
+  for (const file of files) {
+    const existing = await findStoredObject(file.hash)
+    if (existing) {
+      committed.push({ index: file.fileIndex, file: existing })
+      continue
+    }
+
+    const problem = await verifyUploadedObject(file)
+    if (problem) {
+      await update("UPDATE upload_sessions SET status = 'rejected' WHERE id = ?", [sessionId])
+      // Neplatný objekt se smaže, pokud ho mezitím nezaevidoval jiný požadavek
+      if (!(await findStoredObject(file.hash))) {
+        await deleteObject(file.storageKey).catch((error) =>
+          console.error(`[Upload] Objekt ${file.storageKey} se nepodařilo smazat:`, error)
+        )
+      }
+      throw new UploadError(`Obrázek ${file.fileIndex + 1}: ${problem}`, 422)
+    }
+
+    committed.push({
+      index: file.fileIndex,
+      file: await registerStoredObject(file.hash, file.storageKey, Number(file.size), file.contentType),
+    })
+  }
+
+  return committed
+}
+
+// Úklid relací po vypršení: objekty nedokončených relací, které nikdo nezaevidoval, se smažou.
+// Klíč je adresa podle obsahu, takže stejný objekt může čekat na commit i v jiné, ještě platné relaci -
+// takový se nechá být. Jedna dávka, vrací počet smazaných relací a objektů.
+export async function collectExpiredUploadSessions(batchSize = 100) {
+  const sessions = await query<Array<{ id: string; status: string }>>(
+    `SELECT id, status FROM upload_sessions
+     WHERE expiresAt < NOW(3) - INTERVAL 1 HOUR
+     ORDER BY expiresAt
+     LIMIT ?`,
+    [batchSize]
+  )
+
+  let deletedObjects = 0
+  for (const session of sessions) {
+    if (session.status !== 'committed') {
+      const files = await query<Array<{ hash: string; storageKey: string }>>(
+        'SELECT hash, storageKey FROM upload_session_files WHERE sessionId = ?',
+        [session.id]
+      )
+      for (const file of files) {
+        if (await queryOne('SELECT hash FROM stored_objects WHERE hash = ?', [file.hash])) continue
+        const stillPending = await queryOne(
+          `SELECT 1 FROM upload_session_files f
+           JOIN upload_sessions s ON s.id = f.sessionId
+           WHERE f.storageKey = ? AND s.status = 'pending' AND s.expiresAt > NOW(3)
+           LIMIT 1`,
+          [file.storageKey]
+        )
+        if (stillPending) continue
+        try {
+          await deleteObject(file.storageKey)
+          deletedObjects++
+        } catch (error) {
+          console.error(`[Upload] Objekt ${file.storageKey} se nepodařilo smazat:`, error)
+        }
+      }
+    }
+    // Soubory relace se smažou kaskádou
+    await update('DELETE FROM upload_sessions WHERE id = ?', [session.id])
+  }
+
+  return { sessions: sessions.length, deletedObjects, hasMore: sessions.length === batchSize }
+}
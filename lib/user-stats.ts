@@ -0,0 +1,126 @@
+import { query, queryOne } from '@/lib/mysql'
+import { deleteCache, readThrough } from '@/lib/redis'
+
+// Statistiky uživatele pro profil (GET /api/user/stats).
+//
+// Dřív ~9 samostatných dotazů za sebou, teď čtyři souběžné: profil, inzeráty seskupené podle
+// kategorie (aktivní / prodané / hodnota / poslední inzerát se složí v JS), zprávy a konverzace.
+// Výsledek se cachuje per uživatel a maže se při změně jeho inzerátů, konverzací, zpráv a profilu.
+
+const USER_STATS_CACHE_TTL_SECONDS = Number(process.env.USER_STATS_CACHE_TTL_SECONDS || 300)
+
+export function userStatsCacheKey(userId: string) {
+  return `user:stats:${userId}`
+}
+
+export function getUserStats(userId: string) {
+  return readThrough<any>(userStatsCacheKey(userId), () => loadUserStats(userId), USER_STATS_CACHE_TTL_SECONDS)
+}
+
+export async function invalidateUserStats(...userIds: (string | null | undefined)[]) {
+  const keys = userIds.filter((id): id is string => !!id).map(userStatsCacheKey)
+  if (keys.length === 0) return
+  await deleteCache(...Array.from(new Set(keys)))
+}
+
+function toDate(value: any): Date | null {
+  if (!value) return null
+  const date = value instanceof Date ? value : new Date(value)
+  return isNaN(date.getTime()) ? null : date
+}
+
+async function loadUserStats(userId: string) {
+  const [userInfo, productRows, messageTotals, conversationTotals] = await Promise.all([
+    queryOne(
+      `SELECT name, email, image, phone, nickname, city, bio, reputation, createdAt, isVerified
+       FROM users
+       WHERE id = ?`,
+      [userId]
+    ),
+    // Jeden průchod inzeráty uživatele (idx userId) - všechny počty jako podmíněné součty
+    query<any[]>(
+      `SELECT
+         category,
+         COALESCE(SUM(isActive = 1), 0) as listed,
+         COALESCE(SUM(isActive = 1 AND isSold = 0), 0) as active,
+         COALESCE(SUM(isSold = 1), 0) as sold,
+         COALESCE(SUM(CASE WHEN isActive = 1 AND isSold = 0 THEN price END), 0) as totalValue,
+         MAX(createdAt) as lastCreatedAt
+       FROM products
+       WHERE userId = ?
+       GROUP BY category`,
+      [userId]
+    ),
+    queryOne(
+      `SELECT
+         COALESCE(SUM(senderId = ?), 0) as sent,
+         COALESCE(SUM(receiverId = ?), 0) as received,
+         MAX(createdAt) as lastMessageAt
+       FROM messages
+       WHERE senderId = ? OR receiverId = ?`,
+      [userId, userId, userId, userId]
+    ),
+    queryOne(
+      `SELECT COUNT(*) as count
+       FROM conversations
+       WHERE participant1Id = ? OR participant2Id = ?`,
+      [userId, userId]
+    ),
+  ])
+
+  if (!userInfo) return null
+
+  let active = 0
+  let sold = 0
+  let totalValue = 0
+  let lastProductAt: Date | null = null
+  const categoryStats: { category: string; count: number }[] = []
+
+  for (const row of Array.isArray(productRows) ? productRows : []) {
+    active += Number(row.active) || 0
+    sold += Number(row.sold) || 0
+    totalValue += Number(row.totalValue) || 0
+    const createdAt = toDate(row.lastCreatedAt)
+    if (createdAt && (!lastProductAt || createdAt > lastProductAt)) lastProductAt = createdAt
+    // Statistiky podle kategorií - jen aktivní inzeráty (včetně prodaných), jako dřív
+    const listed = Number(row.listed) || 0
+    if (listed > 0) categoryStats.push({ category: row.category, count: listed })
+  }
+
+  const sent = Number(messageTotals?.sent) || 0
+  const received = Number(messageTotals?.received) || 0
+  const lastMessageAt = toDate(messageTotals?.lastMessageAt)
+  const lastActivity =
+    lastProductAt && lastMessageAt
+      ? (lastProductAt > lastMessageAt ? lastProductAt : lastMessageAt)
+      : lastProductAt || lastMessageAt
+
+  return {
+    user: {
+      name: userInfo.name,
+      email: userInfo.email,
+      image: userInfo.image,
+      phone: userInfo.phone,
+      nickname: userInfo.nickname,
+      city: userInfo.city,
+      bio: userInfo.bio,
+      isVerified: userInfo.isVerified,
+      registrationYear: new Date(userInfo.createdAt).getFullYear()
+    },
+    products: {
+      active,
+      sold,
+      total: active + sold,
+      totalValue,
+      categoryStats
+    },
+    messages: {
+      sent,
+      received,
+      total: sent + received,
+      conversations: Number(conversationTotals?.count) || 0
+    },
+    reputation: userInfo.reputation || 'NEUTRAL',
+    lastActivity
+  }
+}
@@ -0,0 +1,196 @@
+import { createHash, randomUUID } from 'crypto'
+import { withTransaction } from '@/lib/mysql'
+import { productDetailCacheKey } from '@/lib/products'
+import { deleteCache, getRedis } from '@/lib/redis'
+
+// Počítání zobrazení inzerátů.
+//
+// Zobrazení se nezapisují do MySQL při každém požadavku (UPDATE jednoho řádku populárního inzerátu
+// se stával zámkovým hot spotem a detail čekal na zápis). Místo toho:
+//   1. návštěvník se deduplikuje na serveru - stejný návštěvník a inzerát se v okně VIEW_DEDUP_WINDOW_SECONDS
+//      počítá jednou (SET NX s TTL v Redis, bez Redis v paměti procesu),
+//   2. přírůstky se sčítají v bufferu (hash views:pending v Redis, bez Redis Map v procesu),
+//   3. časovač jednou za VIEW_FLUSH_INTERVAL_MS zapíše nasčítané přírůstky hromadným UPDATE.
+// Při pádu procesu se může ztratit nejvýše jedna dávka (přejmenovaný buffer views:flushing:* pak vyprší),
+// což je u počtu zobrazení přijatelné. Dvojí započtení zapsané dávky se nepřipouští.
+
+const DEDUP_WINDOW_SECONDS = Number(process.env.VIEW_DEDUP_WINDOW_SECONDS || 3600)
+const FLUSH_INTERVAL_MS = Number(process.env.VIEW_FLUSH_INTERVAL_MS || 10_000)
+const FLUSH_BATCH_SIZE = Number(process.env.VIEW_FLUSH_BATCH_SIZE || 500)
+
+const PENDING_KEY = 'views:pending'
+// Přejmenovaný buffer po pádu procesu uprostřed zápisu nikdo nečte - vyprší sám
+const FLUSHING_KEY_TTL_SECONDS = 3600
+
+// Záložní režim bez Redis (jedna instance)
+const localPending = new Map<string, number>()
+const localSeen = new Map<string, number>()
+
+let flushTimer: NodeJS.Timeout | null = null
+let flushing: Promise<void> | null = null
+
+// Návštěvník = hash IP adresy a user agenta (bez cookies a bez dotazu na session)
+export function visitorFingerprint(headers: Headers) {
+  const forwardedFor = headers.get('x-forwarded-for')
+  const ip = (forwardedFor ? forwardedFor.split(',')[0] : headers.get('x-real-ip') || '').trim()
+  const userAgent = headers.get('user-agent') || ''
+  return createHash('sha1').update(`${ip}|${userAgent}`).digest('hex')
+}
+
+// Zaznamená zobrazení a vrátí počet dosud nezapsaných zobrazení inzerátu (pro zobrazení aktuálního čísla)
+export async function recordProductView(productId: string, visitor: string): Promise<number> {
+  ensureFlushTimer()
+
+  const client = getRedis()
+  if (client) {
+    try {
+      const firstView = await client.set(`views:seen:${productId}:${visitor}`, '1', 'EX', DEDUP_WINDOW_SECONDS, 'NX')
+      if (firstView) {
+        return await client.hincrby(PENDING_KEY, productId, 1)
+      }
+      return Number(await client.hget(PENDING_KEY, productId)) || 0
+    } catch (error) {
+      console.error('[Views] Nepodařilo se zaznamenat zobrazení v Redis:', error)
+      // Pokračovat s bufferem v paměti
+    }
+  }
+
+  const now = Date.now()
+  const seenKey = `${productId}:${visitor}`
+  const seenUntil = localSeen.get(seenKey)
+  if (!seenUntil || seenUntil < now) {
+    localSeen.set(seenKey, now + DEDUP_WINDOW_SECONDS * 1000)
+    localPending.set(productId, (localPending.get(productId) || 0) + 1)
+  }
+  return localPending.get(productId) || 0
+}
+
+function ensureFlushTimer() {
+  if (flushTimer || FLUSH_INTERVAL_MS <= 0) return
+  flushTimer = setInterval(() => {
+    flushProductViews().catch((error) => console.error('[Views] Zápis zobrazení selhal:', error))
+  }, FLUSH_INTERVAL_MS)
+  // Časovač nesmí držet proces naživu
+  flushTimer.unref?.()
+}
+
+// Zapíše nasčítané přírůstky do MySQL. Souběžná volání v jednom procesu sdílí jeden běh.
+export function flushProductViews(): Promise<void> {
+  if (!flushing) {
+    flushing = (async () => {
+      try {
+        await flushRedisViews()
+        await flushLocalViews()
+        pruneLocalSeen()
+      } finally {
+        flushing = null
+      }
+    })()
+  }
+  return flushing
+}
+
+async function flushRedisViews() {
+  const client = getRedis()
+  if (!client) return
+
+  // RENAME je atomický - přírůstky přijaté během zápisu jdou do nového views:pending a
+  // z více instancí vyhraje přejmenování jen jedna
+  const flushingKey = `views:flushing:${randomUUID()}`
+  const [renamed] = (await client
+    .multi()
+    .rename(PENDING_KEY, flushingKey)
+    .expire(flushingKey, FLUSHING_KEY_TTL_SECONDS)
+    .exec()) || []
+  if (renamed && renamed[0]) {
+    if (String(renamed[0].message || '').includes('no such key')) return
+    throw renamed[0]
+  }
+
+  const pending = await client.hgetall(flushingKey)
+  const deltas = new Map<string, number>()
+  Object.keys(pending).forEach((productId) => {
+    const delta = Number(pending[productId])
+    if (delta > 0) deltas.set(productId, delta)
+  })
+
+  try {
+    await writeDeltas(deltas)
+  } catch (error) {
+    // Vrátit nezapsané přírůstky zpět do bufferu (zapsané dávky writeDeltas z deltas odebral),
+    // zapíšou se při dalším běhu
+    const restore = client.multi()
+    deltas.forEach((delta, productId) => restore.hincrby(PENDING_KEY, productId, delta))
+    restore.del(flushingKey)
+    await restore.exec()
+    throw error
+  }
+
+  // Přírůstky jsou v DB - selhání DEL je už nesmí vrátit do bufferu (započítaly by se dvakrát),
+  // klíč pak vyprší podle TTL
+  await client.del(flushingKey).catch((error) => {
+    console.error(`[Views] Nepodařilo se smazat ${flushingKey}:`, error)
+  })
+}
+
+async function flushLocalViews() {
+  if (localPending.size === 0) return
+
+  const deltas = new Map(localPending)
+  localPending.clear()
+
+  try {
+    await writeDeltas(deltas)
+  } catch (error) {
+    deltas.forEach((delta, productId) => {
+      localPending.set(productId, (localPending.get(productId) || 0) + delta)
+    })
+    throw error
+  }
+}
+
+// Jeden UPDATE na dávku: SET viewCount = viewCount + CASE id WHEN ? THEN ? ... END WHERE id IN (...)
+async function writeDeltas(deltas: Map<string, number>) {
+  // Stejné pořadí řádků ve všech instancích - souběžné dávky se nezablokují navzájem
+  const productIds = Array.from(deltas.keys()).sort()
+
+  for (let start = 0; start < productIds.length; start += FLUSH_BATCH_SIZE) {
+    const batch = productIds.slice(start, start + FLUSH_BATCH_SIZE)
+    const cases = batch.map(() => 'WHEN ? THEN ?').join(' ')
+    const caseParams: any[] = []
+    batch.forEach((productId) => caseParams.push(productId, deltas.get(productId)))
+
+    const idList = batch.map(() => '?').join(', ')
+
+    // Zobrazení nabídek se započítají i do čítače offerViews (lib/stats.ts) ve stejné transakci
+    await withTransaction(async (connection) => {
+      await connection.execute(
+        `UPDATE products
+         SET viewCount = COALESCE(viewCount, 0) + CASE id ${cases} ELSE 0 END
+         WHERE id IN (${idList})`,
+        [...caseParams, ...batch]
+      )
+      await connection.execute(
+        `UPDATE stats_counters
+         SET value = value + (
+           SELECT COALESCE(SUM(CASE id ${cases} ELSE 0 END), 0)
+           FROM products
+           WHERE id IN (${idList}) AND listingType = 'NABIZIM'
+         )
+         WHERE name = 'offerViews'`,
+        [...caseParams, ...batch]
+      )
+    })
+    // Zapsané přírůstky se při chybě další dávky nesmí vrátit do bufferu
+    batch.forEach((productId) => deltas.delete(productId))
+    // Cachovaný detail drží viewCount z DB - po zápisu by k němu route přičetla už zapsané přírůstky znovu
+    await deleteCache(...batch.map(productDetailCacheKey))
+  }
+}
+
+function pruneLocalSeen() {
+  const now = Date.now()
+  localSeen.forEach((seenUntil, key) => {
+    if (seenUntil < now) localSeen.delete(key)
+  })
+}
@@ -0,0 +1,227 @@
+"""Load generator for GET /api/products (app/api/products/route.ts).
+
+Replays a weighted mix of realistic listing queries - category and listing
+type browsing, full-text search, price ranges, every sort order and deep
+pagination - from N concurrent virtual users, then reports p50/p95/p99
+latency, throughput, error rate and the Redis cache hit ratio (from the
+route's X-Cache header: HIT, STALE, MISS or BYPASS).
+
+Start the MySQL and Redis stand-ins and the app first:
+
+    docker compose -f load_tests/docker-compose.yml up -d
+    node scripts/migrate-database.js && node scripts/seed-dummy-data.js
+    REDIS_URL=redis://127.0.0.1:6379 npm run build && npm start
+
+then:
+
+    pip install aiohttp
+    python load_tests/products_load.py -c 64 -d 60
+    python load_tests/products_load.py -c 16 -n 5000 --seed 7 --json products-load.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode
+
+import aiohttp
+
+CATEGORIES = ["airsoft-weapons", "military-equipment", "other"]
+LISTING_TYPES = ["nabizim", "shanim"]
+SORTS = ["newest", "oldest", "price-low", "price-high", "name-asc", "name-desc"]
+SEARCH_TERMS = [
+    "m4", "ak", "glock", "g36", "vesta", "helma", "maskáč", "baterie", "optika",
+    "plate carrier", "hi-cap", "kuličky", "tokyo marui", "specna arms", "multicam",
+]
+PRICE_RANGES = [(None, 1000), (500, 3000), (2000, 8000), (5000, None), (10000, 50000)]
+
+
+def browse(rng):
+    # Landing page and category listings - by far the most common request
+    params = {"listingType": rng.choice(LISTING_TYPES), "limit": 12, "sort": "newest"}
+    if rng.random() < 0.7:
+        params["category"] = rng.choice(CATEGORIES)
+    if rng.random() < 0.25:
+        params["page"] = rng.randint(2, 5)
+    return params
+
+
+def search(rng):
+    params = {"search": rng.choice(SEARCH_TERMS), "limit": 12, "sort": rng.choice(SORTS[:4])}
+    if rng.random() < 0.4:
+        params["listingType"] = rng.choice(LISTING_TYPES)
+    if rng.random() < 0.2:
+        params["page"] = 2
+    return params
+
+
+def price_filter(rng):
+    low, high = rng.choice(PRICE_RANGES)
+    params = {"category": rng.choice(CATEGORIES), "listingType": "nabizim", "limit": 12,
+              "sort": rng.choice(["price-low", "price-high"])}
+    if low is not None:
+        params["minPrice"] = low
+    if high is not None:
+        params["maxPrice"] = high
+    return params
+
+
+def sorted_listing(rng):
+    return {"listingType": rng.choice(LISTING_TYPES), "sort": rng.choice(SORTS), "limit": 24,
+            "page": rng.randint(1, 3)}
+
+
+def deep_page(rng):
+    # Crawlers and users paging far back through a category
+    return {"category": rng.choice(CATEGORIES), "listingType": "nabizim", "sort": rng.choice(SORTS),
+            "limit": 12, "page": rng.choice([10, 25, 50, 100, 250])}
+
+
+SCENARIOS = [
+    (browse, 45),
+    (search, 25),
+    (price_filter, 12),
+    (sorted_listing, 10),
+    (deep_page, 8),
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.cache = Counter()
+
+    def record(self, scenario, seconds, status, cache_header):
+        self.latencies[scenario].append(seconds)
+        if status >= 400 or status == 0:
+            self.errors[scenario] += 1
+        if cache_header:
+            self.cache[cache_header.upper()] += 1
+
+    def summary(self, wall_seconds):
+        def describe(values, errors):
+            ms = [v * 1000 for v in values]
+            return {
+                "requests": len(values),
+                "errors": errors,
+                "errorRate": round(errors / len(values), 4) if values else 0.0,
+                "p50Ms": round(percentile(ms, 50), 1),
+                "p95Ms": round(percentile(ms, 95), 1),
+                "p99Ms": round(percentile(ms, 99), 1),
+                "maxMs": round(max(ms), 1) if ms else 0.0,
+            }
+
+        everything = [v for values in self.latencies.values() for v in values]
+        # STALE responses are served from cache while one request refreshes the key
+        hits, misses = self.cache["HIT"] + self.cache["STALE"], self.cache["MISS"]
+        return {
+            "wallSeconds": round(wall_seconds, 2),
+            "throughputRps": round(len(everything) / wall_seconds, 1) if wall_seconds else 0.0,
+            "cacheHitRatio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "cache": dict(self.cache),
+            "overall": describe(everything, sum(self.errors.values())),
+            "scenarios": {
+                name: describe(values, self.errors[name]) for name, values in sorted(self.latencies.items())
+            },
+        }
+
+
+async def virtual_user(session, base_url, rng, stats, stop_at, budget):
+    scenarios, weights = zip(*SCENARIOS)
+    while time.perf_counter() < stop_at and budget.take():
+        scenario = rng.choices(scenarios, weights)[0]
+        url = f"{base_url}/api/products?{urlencode(scenario(rng))}"
+        started = time.perf_counter()
+        status, cache_header = 0, None
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                status, cache_header = response.status, response.headers.get("X-Cache")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        stats.record(scenario.__name__, time.perf_counter() - started, status, cache_header)
+
+
+class RequestBudget:
+    def __init__(self, total):
+        self.remaining = total
+
+    def take(self):
+        if self.remaining is None:
+            return True
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    stats = Stats()
+    budget = RequestBudget(args.requests)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        if args.warmup:
+            await virtual_user(session, args.base_url, random.Random(rng.random()), Stats(),
+                               time.perf_counter() + args.warmup, RequestBudget(None))
+
+        started = time.perf_counter()
+        stop_at = started + args.duration if args.requests is None else float("inf")
+        await asyncio.gather(*[
+            virtual_user(session, args.base_url, random.Random(rng.random()), stats, stop_at, budget)
+            for _ in range(args.concurrency)
+        ])
+        return stats.summary(time.perf_counter() - started)
+
+
+def print_summary(summary):
+    overall = summary["overall"]
+    print(f"{overall['requests']} requests in {summary['wallSeconds']}s "
+          f"-> {summary['throughputRps']} req/s, error rate {overall['errorRate']:.2%}")
+    ratio = summary["cacheHitRatio"]
+    print(f"cache hit ratio: {'n/a' if ratio is None else f'{ratio:.2%}'} {summary['cache']}")
+    print()
+    print(f"{'scenario':<16}{'reqs':>8}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, row in [*summary["scenarios"].items(), ("overall", overall)]:
+        print(f"{name:<16}{row['requests']:>8}{row['errors']:>6}{row['p50Ms']:>10}"
+              f"{row['p95Ms']:>10}{row['p99Ms']:>10}{row['maxMs']:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for GET /api/products")
+    parser.add_argument("--base-url", default="http://localhost:3000")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="virtual users (default: 32)")
+    parser.add_argument("-d", "--duration", type=float, default=30, help="seconds to run (default: 30)")
+    parser.add_argument("-n", "--requests", type=int, help="stop after this many requests instead of --duration")
+    parser.add_argument("--warmup", type=float, default=0, help="seconds of unrecorded warm-up traffic")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for a reproducible query mix")
+    parser.add_argument("--json", dest="json_path", help="write the summary to this file")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run(args))
+    print_summary(summary)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+
+    return 1 if summary["overall"]["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
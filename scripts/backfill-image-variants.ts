@@ -0,0 +1,113 @@
+import { createHash } from 'crypto'
+import { readFile } from 'fs/promises'
+import { join } from 'path'
+import pool, { query } from '@/lib/mysql'
+import { VariantSource, parseImageVariants, recordImageVariants } from '@/lib/images'
+import { invalidateProductCaches } from '@/lib/products'
+import { invalidateServiceCache } from '@/lib/services'
+
+// Doplnění variant obrázků (lib/images.ts) k inzerátům a servisům nahraným před jejich zavedením
+// nebo tam, kde generování na pozadí nedoběhlo. Zpracuje jen obrázky, které ve sloupci imageVariants
+// chybí; varianty stejné fotky se díky hashi obsahu negenerují znovu. Lze spouštět opakovaně:
+//
+//   npm run images:backfill
+
+const BATCH_SIZE = 100
+
+type Target = {
+  table: 'products' | 'services'
+  sql: string
+  invalidate: (row: any) => Promise<void>
+}
+
+const targets: Target[] = [
+  {
+    table: 'products',
+    sql: `SELECT id, userId, listingType, category, mainImage as cover, images as gallery, imageVariants
+          FROM products WHERE id > ? ORDER BY id LIMIT ?`,
+    invalidate: (row) =>
+      invalidateProductCaches({ id: row.id, userId: row.userId, listingType: row.listingType, category: row.category }),
+  },
+  {
+    table: 'services',
+    sql: `SELECT id, image as cover, additionalImages as gallery, imageVariants
+          FROM services WHERE id > ? ORDER BY id LIMIT ?`,
+    invalidate: (row) => invalidateServiceCache(row.id),
+  },
+]
+
+function imageUrls(row: any): string[] {
+  let gallery: unknown = row.gallery
+  if (typeof gallery === 'string') {
+    try {
+      gallery = JSON.parse(gallery)
+    } catch {
+      gallery = []
+    }
+  }
+  const urls = [row.cover].concat(Array.isArray(gallery) ? gallery : [])
+  return Array.from(new Set(urls.filter((url: any) => typeof url === 'string' && url.trim().length > 0)))
+}
+
+// Originál z lokálního úložiště (public/uploads) nebo z URL na S3 / CDN
+async function loadOriginal(url: string): Promise<Buffer | null> {
+  if (url.startsWith('/uploads/')) {
+    return readFile(join(process.cwd(), 'public', url)).catch(() => null)
+  }
+  const response = await fetch(url).catch(() => null)
+  if (!response || !response.ok) return null
+  return Buffer.from(await response.arrayBuffer())
+}
+
+async function backfill(target: Target) {
+  let lastId = ''
+  let updated = 0
+
+  while (true) {
+    const rows = await query<any[]>(target.sql, [lastId, BATCH_SIZE])
+    if (!Array.isArray(rows) || rows.length === 0) break
+    lastId = rows[rows.length - 1].id
+
+    for (const row of rows) {
+      const existing = parseImageVariants(row.imageVariants)
+      const images: VariantSource[] = []
+      for (const url of imageUrls(row)) {
+        if (existing[url]) continue
+        const source = await loadOriginal(url)
+        if (source) {
+          const hash = createHash('sha256').update(source).digest('hex')
+          images.push({ url, hash, load: async () => source })
+        } else {
+          console.warn(`⚠️  ${target.table} ${row.id}: originál ${url} nelze načíst`)
+        }
+      }
+
+      if (images.length > 0 && (await recordImageVariants(target.table, row.id, images))) {
+        await target.invalidate(row)
+        updated++
+      }
+    }
+  }
+
+  return updated
+}
+
+async function main() {
+  for (const target of targets) {
+    console.log(`🖼️  Doplňuji varianty obrázků: ${target.table}...`)
+    const started = Date.now()
+    const updated = await backfill(target)
+    console.log(`✅ ${target.table}: doplněno u ${updated} záznamů za ${Date.now() - started} ms`)
+  }
+}
+
+main()
+  .then(async () => {
+    await pool.end()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('❌ Doplnění variant obrázků selhalo:', error)
+    await pool.end()
+    process.exit(1)
+  })
@@ -0,0 +1,150 @@
+import pool from '@/lib/mysql'
+import { sendMessage } from '@/lib/messages'
+
+// Propustnost odesílání zpráv (lib/messages.ts) při souběžných odesílatelích v jedné konverzaci.
+//
+// Vytvoří dočasné uživatele, inzerát a konverzaci (prefix bench_msg_), spustí BENCH_SENDERS souběžných
+// odesílatelů, z nichž každý pošle BENCH_MESSAGES zpráv za sebou, a vypíše zprávy/s a latence.
+// Jedna konverzace je nejhorší případ - všechna odeslání se řadí na zámku jejího řádku.
+// Nakonec ověří, že se žádná zpráva neztratila a poslední zpráva konverzace je opravdu ta nejnovější.
+//
+//   npm run bench:messages
+//   BENCH_SENDERS=32 BENCH_MESSAGES=100 npm run bench:messages
+//   npm run bench:messages -- --json bench-messages.json
+
+const SENDERS = Number(process.env.BENCH_SENDERS || 16)
+const MESSAGES_PER_SENDER = Number(process.env.BENCH_MESSAGES || 50)
+const PREFIX = `bench_msg_${Date.now()}`
+
+function percentile(sorted: number[], p: number) {
+  if (sorted.length === 0) return 0
+  return sorted[Math.min(sorted.length - 1, Math.floor((sorted.length * p) / 100))]
+}
+
+async function createFixtures() {
+  const seller = `${PREFIX}_seller`
+  const buyer = `${PREFIX}_buyer`
+  const productId = `${PREFIX}_product`
+  const conversationId = `${PREFIX}_conversation`
+
+  for (const id of [seller, buyer]) {
+    await pool.execute(
+      `INSERT INTO users (id, email, name, createdAt, updatedAt) VALUES (?, ?, ?, NOW(3), NOW(3))`,
+      [id, `${id}@bench.local`, id]
+    )
+  }
+  await pool.execute(
+    `INSERT INTO products (id, title, description, price, listingType, category, \`condition\`, location, userId, isActive, isSold, createdAt, updatedAt)
+     VALUES (?, 'Benchmark', 'Benchmark', 1, 'NABIZIM', 'OTHER', 'NEW', 'PRAHA', ?, 0, 0, NOW(3), NOW(3))`,
+    [productId, seller]
+  )
+  const [participant1Id, participant2Id] = [buyer, seller].sort()
+  await pool.execute(
+    `INSERT INTO conversations (id, productId, participant1Id, participant2Id, createdAt, updatedAt, lastMessageAt)
+     VALUES (?, ?, ?, ?, NOW(3), NOW(3), NOW(3))`,
+    [conversationId, productId, participant1Id, participant2Id]
+  )
+
+  return { seller, buyer, productId, conversationId }
+}
+
+async function cleanup(fixtures: { seller: string; buyer: string }) {
+  // Inzerát, konverzace a zprávy se smažou kaskádou
+  await pool.execute('DELETE FROM users WHERE id IN (?, ?)', [fixtures.seller, fixtures.buyer])
+}
+
+async function main() {
+  const fixtures = await createFixtures()
+  const latencies: number[] = []
+  let failed = 0
+
+  try {
+    console.log(`📨 ${SENDERS} souběžných odesílatelů × ${MESSAGES_PER_SENDER} zpráv, jedna konverzace...`)
+    const started = Date.now()
+
+    await Promise.all(
+      Array.from({ length: SENDERS }, async (_, sender) => {
+        // Střídání stran - polovina odesílatelů píše za kupujícího, polovina za prodejce
+        const senderId = sender % 2 === 0 ? fixtures.buyer : fixtures.seller
+        const receiverId = senderId === fixtures.buyer ? fixtures.seller : fixtures.buyer
+        for (let i = 0; i < MESSAGES_PER_SENDER; i++) {
+          const sendStarted = process.hrtime.bigint()
+          try {
+            const result = await sendMessage({
+              conversationId: fixtures.conversationId,
+              senderId,
+              receiverId,
+              content: `Zpráva ${i} od odesílatele ${sender}`,
+            })
+            if (result.status !== 'sent') failed++
+          } catch (error) {
+            failed++
+            console.error('❌ Odeslání selhalo:', error)
+          }
+          latencies.push(Number(process.hrtime.bigint() - sendStarted) / 1e6)
+        }
+      })
+    )
+
+    const elapsedMs = Date.now() - started
+    const sent = SENDERS * MESSAGES_PER_SENDER - failed
+    latencies.sort((a, b) => a - b)
+
+    const [[counts]] = (await pool.execute(
+      `SELECT COUNT(*) as stored,
+              (SELECT id FROM messages WHERE conversationId = ? ORDER BY createdAt DESC, id DESC LIMIT 1) as newestId,
+              (SELECT COUNT(DISTINCT createdAt) FROM messages WHERE conversationId = ?) as distinctTimes
+       FROM messages WHERE conversationId = ?`,
+      [fixtures.conversationId, fixtures.conversationId, fixtures.conversationId]
+    )) as any
+    const [[conversation]] = (await pool.execute(
+      'SELECT lastMessageId FROM conversations WHERE id = ?',
+      [fixtures.conversationId]
+    )) as any
+
+    const report = {
+      senders: SENDERS,
+      messagesPerSender: MESSAGES_PER_SENDER,
+      sent,
+      failed,
+      elapsedMs,
+      messagesPerSecond: Math.round((sent / Math.max(1, elapsedMs)) * 1000 * 10) / 10,
+      latencyMs: {
+        p50: Math.round(percentile(latencies, 50) * 10) / 10,
+        p95: Math.round(percentile(latencies, 95) * 10) / 10,
+        p99: Math.round(percentile(latencies, 99) * 10) / 10,
+        max: Math.round((latencies[latencies.length - 1] || 0) * 10) / 10,
+      },
+      stored: Number(counts.stored),
+      lastMessageConsistent: conversation.lastMessageId === counts.newestId,
+      // Čas zprávy v konverzaci je rostoucí - žádné dvě zprávy nesdílí createdAt
+      orderedTimestamps: Number(counts.distinctTimes) === Number(counts.stored),
+    }
+
+    console.log(report)
+
+    const jsonIndex = process.argv.indexOf('--json')
+    if (jsonIndex !== -1 && process.argv[jsonIndex + 1]) {
+      const { writeFileSync } = await import('fs')
+      writeFileSync(process.argv[jsonIndex + 1], JSON.stringify(report, null, 2))
+    }
+
+    if (failed > 0 || report.stored !== sent || !report.lastMessageConsistent || !report.orderedTimestamps) {
+      throw new Error('Výsledek benchmarku není konzistentní')
+    }
+    console.log(`✅ ${report.messagesPerSecond} zpráv/s`)
+  } finally {
+    await cleanup(fixtures)
+  }
+}
+
+main()
+  .then(async () => {
+    await pool.end()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('❌ Benchmark odesílání zpráv selhal:', error)
+    await pool.end()
+    process.exit(1)
+  })
@@ -0,0 +1,208 @@
+import { randomBytes } from 'crypto'
+import { UploadError, UploadLimits, parseMultipartUpload } from '@/lib/multipart'
+
+// Paměť při souběžném nahrávání obrázků: streamový parser (lib/multipart.ts) proti request.formData().
+//
+// Spustí BENCH_UPLOADS souběžných požadavků, každý s BENCH_UPLOAD_FILES obrázky po BENCH_UPLOAD_FILE_MB.
+// Tělo se generuje po 64 kB až při čtení, takže v paměti je jen to, co si drží parser. Vzorkuje
+// heapUsed + arrayBuffers a RSS a vypíše špičku nad výchozím stavem. Pak ověří, že příliš velký
+// soubor a ne-obrázek ukončí čtení hned - kolik bajtů těla se přečetlo, než parser odmítl.
+// Bez DB a úložiště; dočasné soubory parser uklidí.
+//
+//   npm run bench:uploads
+//   BENCH_UPLOADS=50 BENCH_UPLOAD_FILE_MB=4 npm run bench:uploads
+//   npm run bench:uploads -- --json bench-uploads.json
+
+const UPLOADS = Number(process.env.BENCH_UPLOADS || 20)
+const FILES_PER_UPLOAD = Number(process.env.BENCH_UPLOAD_FILES || 5)
+const FILE_SIZE = Math.round(Number(process.env.BENCH_UPLOAD_FILE_MB || 4) * 1024 * 1024)
+const CHUNK_SIZE = 64 * 1024
+const BOUNDARY = '----bench-upload-boundary'
+
+const LIMITS: UploadLimits = {
+  files: { images: FILES_PER_UPLOAD },
+  maxFileSize: FILE_SIZE,
+  maxTotalSize: FILE_SIZE * FILES_PER_UPLOAD,
+}
+
+const JPEG_HEADER = Buffer.from([0xff, 0xd8, 0xff, 0xe0, 0x00, 0x10, 0x4a, 0x46, 0x49, 0x46, 0x00, 0x01])
+// Jeden náhodný blok se opakuje - generování těla nemá zatížit měření
+const FILLER = randomBytes(CHUNK_SIZE)
+
+type Part = { header: Buffer; size: number; signature?: Buffer }
+
+function filePart(index: number, size: number, signature = JPEG_HEADER): Part {
+  return {
+    header: Buffer.from(
+      `--${BOUNDARY}\r\nContent-Disposition: form-data; name="images"; filename="foto_${index}.jpg"\r\n` +
+        'Content-Type: image/jpeg\r\n\r\n'
+    ),
+    size,
+    signature,
+  }
+}
+
+function fieldPart(name: string, value: string): Part {
+  return {
+    header: Buffer.from(`--${BOUNDARY}\r\nContent-Disposition: form-data; name="${name}"\r\n\r\n${value}`),
+    size: 0,
+  }
+}
+
+// Multipart tělo generované po kusech; read = kolik bajtů si čtenář vyžádal
+function multipartBody(parts: Part[]) {
+  const stats = { read: 0 }
+  let partIndex = 0
+  let offset = -1
+
+  const stream = new ReadableStream<Uint8Array>({
+    pull(controller) {
+      if (partIndex >= parts.length) {
+        const closing = Buffer.from(`\r\n--${BOUNDARY}--\r\n`)
+        stats.read += closing.length
+        controller.enqueue(closing)
+        controller.close()
+        return
+      }
+
+      const part = parts[partIndex]
+      let chunk: Buffer
+      if (offset < 0) {
+        chunk = Buffer.concat([partIndex > 0 ? Buffer.from('\r\n') : Buffer.alloc(0), part.header])
+        offset = 0
+      } else {
+        const length = Math.min(CHUNK_SIZE, part.size - offset)
+        chunk = Buffer.from(FILLER.subarray(0, length))
+        if (offset === 0 && part.signature) part.signature.copy(chunk)
+        offset += length
+      }
+      if (offset >= part.size) {
+        partIndex++
+        offset = -1
+      }
+
+      stats.read += chunk.length
+      controller.enqueue(new Uint8Array(chunk.buffer, chunk.byteOffset, chunk.length))
+    },
+  })
+
+  const request = new Request('http://localhost/api/products', {
+    method: 'POST',
+    headers: { 'content-type': `multipart/form-data; boundary=${BOUNDARY}` },
+    body: stream,
+    duplex: 'half',
+  } as RequestInit)
+
+  return { request, stats }
+}
+
+function uploadRequest(parts = FILES_PER_UPLOAD) {
+  const fileParts = Array.from({ length: parts }, (_, index) => filePart(index, FILE_SIZE))
+  return multipartBody([fieldPart('title', 'Benchmark'), ...fileParts]).request
+}
+
+// Špička paměti během fn nad stavem před spuštěním (v MB)
+async function measurePeak(fn: () => Promise<void>) {
+  if (global.gc) global.gc()
+  const before = process.memoryUsage()
+  const peak = { heap: 0, rss: 0 }
+  const sample = () => {
+    const usage = process.memoryUsage()
+    peak.heap = Math.max(peak.heap, usage.heapUsed + usage.arrayBuffers - before.heapUsed - before.arrayBuffers)
+    peak.rss = Math.max(peak.rss, usage.rss - before.rss)
+  }
+  const timer = setInterval(sample, 5)
+
+  const started = Date.now()
+  await fn()
+  sample()
+  clearInterval(timer)
+
+  const mb = (bytes: number) => Math.round((bytes / 1024 / 1024) * 10) / 10
+  return { elapsedMs: Date.now() - started, peakHeapMB: mb(peak.heap), peakRssMB: mb(peak.rss) }
+}
+
+async function runStreaming() {
+  await Promise.all(
+    Array.from({ length: UPLOADS }, async () => {
+      const upload = await parseMultipartUpload(uploadRequest(), LIMITS)
+      try {
+        if (upload.files('images').length !== FILES_PER_UPLOAD) throw new Error('Parser nevrátil všechny soubory')
+      } finally {
+        await upload.cleanup()
+      }
+    })
+  )
+}
+
+async function runFormData() {
+  await Promise.all(
+    Array.from({ length: UPLOADS }, async () => {
+      const formData = await uploadRequest().formData()
+      if (formData.getAll('images').length !== FILES_PER_UPLOAD) throw new Error('formData nevrátil všechny soubory')
+    })
+  )
+}
+
+// Kolik bajtů těla se přečetlo, než parser požadavek odmítl
+async function rejectionCheck(name: string, parts: Part[]) {
+  const { request, stats } = multipartBody(parts)
+  const bodySize = parts.reduce((sum, part) => sum + part.header.length + part.size, 0)
+  try {
+    const upload = await parseMultipartUpload(request, LIMITS)
+    await upload.cleanup()
+    return { name, rejected: false, status: 0, bodyMB: Math.round(bodySize / 1024 / 1024), readKB: Math.round(stats.read / 1024) }
+  } catch (error) {
+    if (!(error instanceof UploadError)) throw error
+    return { name, rejected: true, status: error.status, bodyMB: Math.round(bodySize / 1024 / 1024), readKB: Math.round(stats.read / 1024) }
+  }
+}
+
+async function main() {
+  const totalMB = Math.round((UPLOADS * FILES_PER_UPLOAD * FILE_SIZE) / 1024 / 1024)
+  console.log(`📤 ${UPLOADS} souběžných nahrávání × ${FILES_PER_UPLOAD} obrázků po ${FILE_SIZE / 1024 / 1024} MB (${totalMB} MB)...`)
+  if (!global.gc) console.log('ℹ️  Bez --expose-gc (NODE_OPTIONS=--expose-gc) je výchozí stav méně přesný')
+
+  const streaming = await measurePeak(runStreaming)
+  console.log('🌊 parseMultipartUpload:', streaming)
+  const formData = await measurePeak(runFormData)
+  console.log('📦 request.formData():', formData)
+
+  const rejections = [
+    await rejectionCheck('příliš velký soubor', [filePart(0, FILE_SIZE * 10)]),
+    await rejectionCheck('ne-obrázek', [filePart(0, FILE_SIZE, Buffer.from('<html><body>'))]),
+    await rejectionCheck('příliš mnoho souborů', Array.from({ length: FILES_PER_UPLOAD + 1 }, (_, index) => filePart(index, CHUNK_SIZE))),
+  ]
+  rejections.forEach((check) => console.log(check.rejected ? '🛑' : '⚠️ ', check))
+
+  const report = {
+    uploads: UPLOADS,
+    filesPerUpload: FILES_PER_UPLOAD,
+    fileSizeMB: FILE_SIZE / 1024 / 1024,
+    streaming,
+    formData,
+    // Paměť streamového parseru na jedno souběžné nahrávání
+    streamingHeapPerUploadMB: Math.round((streaming.peakHeapMB / UPLOADS) * 100) / 100,
+    rejections,
+  }
+
+  const jsonIndex = process.argv.indexOf('--json')
+  if (jsonIndex !== -1 && process.argv[jsonIndex + 1]) {
+    const { writeFileSync } = await import('fs')
+    writeFileSync(process.argv[jsonIndex + 1], JSON.stringify(report, null, 2))
+  }
+
+  // Odmítnutí musí přijít dřív, než se přečte celé tělo (nejvýš limit souboru + pár kusů)
+  const lateRejection = rejections.filter((check) => !check.rejected || check.readKB * 1024 > FILE_SIZE + 4 * CHUNK_SIZE)
+  if (lateRejection.length > 0) {
+    throw new Error(`Parser neodmítl požadavek včas: ${lateRejection.map((check) => check.name).join(', ')}`)
+  }
+  console.log(`✅ Špička ${streaming.peakHeapMB} MB (stream) proti ${formData.peakHeapMB} MB (formData)`)
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error('❌ Benchmark nahrávání selhal:', error)
+    process.exit(1)
+  })
@@ -0,0 +1,138 @@
+import { createHash, randomBytes } from 'crypto'
+import pool from '@/lib/mysql'
+import { UploadError } from '@/lib/multipart'
+import { deleteObject, getStorageProvider, readObject } from '@/lib/storage'
+import { commitUploadSession, createUploadSession } from '@/lib/upload-sessions'
+
+// Kontrola přímého nahrávání přes podepsané URL (lib/upload-sessions.ts) proti skutečnému S3 API.
+// Lokálně stačí MinIO:
+//
+//   docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+//   (bucket vytvořte v konzoli nebo přes mc mb)
+//   STORAGE_PROVIDER=s3 S3_ENDPOINT=http://localhost:9000 S3_FORCE_PATH_STYLE=1 S3_BUCKET=airsoft \
+//     S3_ACCESS_KEY_ID=minio S3_SECRET_ACCESS_KEY=minio123 S3_OBJECT_ACL=private npm run uploads:check
+//
+// Založí dočasného uživatele (prefix check_upload_) a ověří:
+//   - platný obrázek projde celým tokem (relace -> PUT -> commit) a v úložišti je přesně nahraný obsah,
+//   - relaci nelze použít podruhé,
+//   - úložiště odmítne PUT jiných dat, než jaká byla ohlášena (SHA-256 v podpisu),
+//   - commit odmítne ne-obrázek se správným hashem (magic bytes) a objekt smaže,
+//   - commit odmítne relaci, do které se nic nenahrálo.
+// Nakonec po sobě uklidí uživatele, relace i vytvořené objekty.
+
+const PREFIX = `check_upload_${Date.now()}`
+
+type Check = { name: string; ok: boolean; detail?: string }
+
+function describe(content: Buffer, contentType: string) {
+  return { size: content.length, contentType, sha256: createHash('sha256').update(content).digest('hex') }
+}
+
+// Malý "JPEG" - pro kontrolu stačí signatura a unikátní obsah
+function fakeJpeg() {
+  return Buffer.concat([Buffer.from([0xff, 0xd8, 0xff, 0xe0]), randomBytes(4096)])
+}
+
+async function put(upload: { method: string; url: string; headers: Record<string, string> }, body: Buffer) {
+  const response = await fetch(upload.url, { method: upload.method, headers: upload.headers, body })
+  return response.status
+}
+
+async function expectUploadError(fn: () => Promise<unknown>) {
+  try {
+    await fn()
+    return 'commit prošel'
+  } catch (error) {
+    if (error instanceof UploadError) return null
+    throw error
+  }
+}
+
+async function main() {
+  if (getStorageProvider() !== 's3') {
+    throw new Error('Kontrola vyžaduje STORAGE_PROVIDER=s3 (např. MinIO, viz hlavička skriptu)')
+  }
+
+  const userId = `${PREFIX}_user`
+  await pool.execute(
+    'INSERT INTO users (id, email, name, createdAt, updatedAt) VALUES (?, ?, ?, NOW(3), NOW(3))',
+    [userId, `${userId}@check.local`, userId]
+  )
+  const hashes: string[] = []
+  const keys: string[] = []
+  const checks: Check[] = []
+
+  try {
+    // 1. Platný obrázek
+    const image = fakeJpeg()
+    const session = await createUploadSession(userId, 'products', [describe(image, 'image/jpeg')])
+    const upload = session.uploads[0].upload
+    if (!upload) throw new Error('Nový obsah nemá podepsanou URL')
+    hashes.push(describe(image, 'image/jpeg').sha256)
+    const status = await put(upload, image)
+    const committed = status === 200 ? await commitUploadSession(session.sessionId, userId, 'products') : []
+    keys.push(...committed.map((entry) => entry.file.key))
+    const stored = committed[0] ? await readObject(committed[0].file.key) : null
+    checks.push({
+      name: 'platný obrázek',
+      ok: status === 200 && !!stored && stored.equals(image),
+      detail: `PUT ${status}`,
+    })
+
+    // 2. Opakované použití relace
+    const reuse = await expectUploadError(() => commitUploadSession(session.sessionId, userId, 'products'))
+    checks.push({ name: 'relace jen jednou', ok: reuse === null, detail: reuse || undefined })
+
+    // 3. Jiná data než ohlášená
+    const announced = fakeJpeg()
+    const tampered = await createUploadSession(userId, 'products', [describe(announced, 'image/jpeg')])
+    hashes.push(describe(announced, 'image/jpeg').sha256)
+    const tamperedStatus = await put(tampered.uploads[0].upload!, fakeJpeg())
+    checks.push({ name: 'podvržený obsah', ok: tamperedStatus >= 400, detail: `PUT ${tamperedStatus}` })
+
+    // 4. Ne-obrázek se správným hashem
+    const html = Buffer.concat([Buffer.from('<html><body>'), randomBytes(1024)])
+    const disguised = await createUploadSession(userId, 'products', [describe(html, 'image/jpeg')])
+    hashes.push(describe(html, 'image/jpeg').sha256)
+    const disguisedStatus = await put(disguised.uploads[0].upload!, html)
+    const disguisedError = await expectUploadError(() => commitUploadSession(disguised.sessionId, userId, 'products'))
+    const leftover = await readObject(`products/${describe(html, 'image/jpeg').sha256}.jpg`)
+    checks.push({
+      name: 'ne-obrázek',
+      ok: disguisedStatus === 200 && disguisedError === null && !leftover,
+      detail: disguisedError || (leftover ? 'objekt nebyl smazán' : `PUT ${disguisedStatus}`),
+    })
+
+    // 5. Nic nenahráno
+    const missing = fakeJpeg()
+    const empty = await createUploadSession(userId, 'products', [describe(missing, 'image/jpeg')])
+    hashes.push(describe(missing, 'image/jpeg').sha256)
+    const emptyError = await expectUploadError(() => commitUploadSession(empty.sessionId, userId, 'products'))
+    checks.push({ name: 'chybějící objekt', ok: emptyError === null, detail: emptyError || undefined })
+  } finally {
+    // Relace se smažou kaskádou s uživatelem
+    await pool.execute('DELETE FROM users WHERE id = ?', [userId])
+    for (const key of keys) await deleteObject(key).catch(() => undefined)
+    if (hashes.length > 0) {
+      const [rows] = await pool.query('SELECT storageKey FROM stored_objects WHERE hash IN (?)', [hashes])
+      for (const row of rows as any[]) await deleteObject(row.storageKey).catch(() => undefined)
+      await pool.query('DELETE FROM stored_objects WHERE hash IN (?)', [hashes])
+    }
+  }
+
+  checks.forEach((check) => console.log(check.ok ? '✅' : '❌', check.name, check.detail || ''))
+  if (checks.some((check) => !check.ok)) {
+    throw new Error('Přímé nahrávání nefunguje podle očekávání')
+  }
+}
+
+main()
+  .then(async () => {
+    await pool.end()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('❌ Kontrola přímého nahrávání selhala:', error)
+    await pool.end()
+    process.exit(1)
+  })
@@ -0,0 +1,181 @@
+import pool from '@/lib/mysql'
+import { buildProductListQuery, productListSql, productCountSql, productSortKeys } from '@/lib/products'
+import { encodeCursor } from '@/lib/pagination'
+
+// Kontrola plánů dotazů pro výpis inzerátů.
+//
+// Projde všechny kombinace filtrů a řazení, které posílá GET /api/products (stejný builder jako route),
+// spustí pro dotaz na stránku i COUNT příkaz EXPLAIN a selže, pokud MySQL čte tabulku products celou
+// (type = ALL) nebo řadí mimo index (Using filesort / Using temporary).
+//
+// Optimalizátor se rozhoduje podle statistik - na prázdné databázi klidně zvolí full scan, proto kontrolu
+// spouštějte nad realistickými daty:
+//
+//   node scripts/seed-bulk-data.js --scale 1
+//   npm run db:check-plans
+//   npm run db:check-plans -- --json plans.json
+
+type ExplainRow = {
+  table: string | null
+  type: string | null
+  key: string | null
+  rows: number | null
+  Extra: string | null
+}
+
+type PlanCheck = {
+  shape: string
+  kind: 'list' | 'count'
+  key: string | null
+  rows: number | null
+  extra: string
+  problems: string[]
+}
+
+const LISTING_TYPES = [null, 'nabizim', 'shanim']
+const CATEGORIES = [null, 'airsoft-weapons', 'military-equipment', 'other']
+const SORTS = Object.keys(productSortKeys)
+
+function querySamples() {
+  const samples: Record<string, string>[] = []
+
+  for (const listingType of LISTING_TYPES) {
+    for (const category of CATEGORIES) {
+      for (const sort of SORTS) {
+        const base: Record<string, string> = { sort, limit: '12' }
+        if (listingType) base.listingType = listingType
+        if (category) base.category = category
+
+        // Číslované stránky, první cursor stránka a další cursor stránka
+        samples.push({ ...base, page: '3' })
+        samples.push({ ...base, cursor: '' })
+        samples.push({
+          ...base,
+          cursor: encodeCursor(
+            { createdAt: new Date(), price: 5000, title: 'M4', id: 'sample' },
+            productSortKeys[sort]
+          ),
+        })
+
+        // Cenové rozpětí se v UI kombinuje hlavně s řazením podle ceny
+        if (sort.startsWith('price')) {
+          samples.push({ ...base, minPrice: '500', maxPrice: '8000' })
+        }
+      }
+    }
+  }
+
+  return samples
+}
+
+function describeShape(sample: Record<string, string>) {
+  return Object.keys(sample)
+    .sort()
+    .map((key) => (key === 'cursor' ? `cursor=${sample.cursor ? '<next>' : '<first>'}` : `${key}=${sample[key]}`))
+    .join('&')
+}
+
+function findProblems(rows: ExplainRow[], checkSort: boolean) {
+  const problems: string[] = []
+  const productRow = rows.find((row) => row.table === 'p')
+  const extra = rows.map((row) => row.Extra || '').join('; ')
+
+  if (!productRow) {
+    problems.push('v plánu chybí tabulka products')
+  } else if (productRow.type === 'ALL') {
+    problems.push('full table scan tabulky products')
+  }
+  if (checkSort && extra.includes('Using filesort')) {
+    problems.push('řazení mimo index (Using filesort)')
+  }
+  if (checkSort && extra.includes('Using temporary')) {
+    problems.push('dočasná tabulka (Using temporary)')
+  }
+
+  return { productRow, extra, problems }
+}
+
+async function explain(sql: string, params: any[]) {
+  const [rows] = await pool.query(`EXPLAIN ${sql}`, params)
+  return rows as unknown as ExplainRow[]
+}
+
+async function checkPlans() {
+  await pool.query('ANALYZE TABLE products')
+
+  const checks: PlanCheck[] = []
+  const seenCounts = new Set<string>()
+
+  for (const sample of querySamples()) {
+    const listQuery = buildProductListQuery(new URLSearchParams(sample))
+    const shape = describeShape(sample)
+
+    const listSql = productListSql(listQuery)
+    const listPlan = findProblems(await explain(listSql.sql, listSql.params), true)
+    checks.push({
+      shape,
+      kind: 'list',
+      key: listPlan.productRow?.key ?? null,
+      rows: listPlan.productRow?.rows ?? null,
+      extra: listPlan.extra,
+      problems: listPlan.problems,
+    })
+
+    // COUNT nezávisí na řazení ani cursoru - stačí jednou pro každý filtr
+    const countSql = productCountSql(listQuery)
+    const countKey = countSql.sql + JSON.stringify(countSql.params)
+    if (seenCounts.has(countKey)) continue
+    seenCounts.add(countKey)
+
+    const countPlan = findProblems(await explain(countSql.sql, countSql.params), false)
+    checks.push({
+      shape,
+      kind: 'count',
+      key: countPlan.productRow?.key ?? null,
+      rows: countPlan.productRow?.rows ?? null,
+      extra: countPlan.extra,
+      problems: countPlan.problems,
+    })
+  }
+
+  return checks
+}
+
+async function main() {
+  const jsonIndex = process.argv.indexOf('--json')
+  const jsonPath = jsonIndex !== -1 ? process.argv[jsonIndex + 1] : null
+
+  console.log('🔍 Kontroluji plány dotazů pro výpis inzerátů...')
+  const checks = await checkPlans()
+  const failed = checks.filter((check) => check.problems.length > 0)
+
+  for (const check of failed) {
+    console.error(`❌ [${check.kind}] ${check.shape}`)
+    console.error(`   index: ${check.key || '-'}, rows: ${check.rows ?? '-'}, extra: ${check.extra || '-'}`)
+    console.error(`   ${check.problems.join(', ')}`)
+  }
+
+  if (jsonPath) {
+    const { writeFileSync } = await import('fs')
+    writeFileSync(jsonPath, JSON.stringify({ checks, failed: failed.length }, null, 2))
+  }
+
+  if (failed.length > 0) {
+    console.error(`❌ ${failed.length} z ${checks.length} plánů nevyhovuje`)
+    return 1
+  }
+
+  console.log(`✅ Všech ${checks.length} plánů používá index bez filesort`)
+  return 0
+}
+
+main()
+  .then(async (code) => {
+    await pool.end()
+    process.exit(code)
+  })
+  .catch(async (error) => {
+    console.error('❌ Kontrola plánů selhala:', error)
+    await pool.end()
+    process.exit(1)
+  })
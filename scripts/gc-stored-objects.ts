@@ -0,0 +1,63 @@
+import pool from '@/lib/mysql'
+import { collectOrphanedObjects } from '@/lib/stored-objects'
+import { collectExpiredUploadSessions } from '@/lib/upload-sessions'
+
+// Úklid uložených souborů, na které neodkazuje žádný inzerát, servis ani recenze (lib/stored-objects.ts).
+// Maže po dávkách STORED_OBJECTS_GC_BATCH_SIZE, dokud je co mazat; soubory mladší než
+// STORED_OBJECTS_GC_GRACE_HOURS nechává být. Nejdřív uklidí vypršelé relace přímého nahrávání
+// (lib/upload-sessions.ts) - jejich nezaevidované objekty. S --dry-run jen vypíše počet kandidátů
+// v první dávce.
+//
+//   npm run storage:gc
+//   npm run storage:gc -- --dry-run
+
+const BATCH_SIZE = Math.max(1, Number(process.env.STORED_OBJECTS_GC_BATCH_SIZE || 100))
+
+async function main() {
+  const dryRun = process.argv.indexOf('--dry-run') !== -1
+
+  if (dryRun) {
+    const result = await collectOrphanedObjects(BATCH_SIZE, true)
+    console.log(`🔍 Objektů bez odkazů k smazání (první dávka, max ${BATCH_SIZE}): ${result.candidates}`)
+    return
+  }
+
+  console.log('🧹 Uklízím vypršelé relace nahrávání...')
+  const sessions = { sessions: 0, deletedObjects: 0 }
+  while (true) {
+    const result = await collectExpiredUploadSessions(BATCH_SIZE)
+    sessions.sessions += result.sessions
+    sessions.deletedObjects += result.deletedObjects
+    if (!result.hasMore) break
+  }
+  console.log('✅ Relace nahrávání:', sessions)
+
+  console.log('🧹 Uklízím soubory bez odkazů...')
+  const started = Date.now()
+  const totals = { prunedRefs: 0, deleted: 0, freedBytes: 0, batches: 0 }
+
+  while (true) {
+    const result = await collectOrphanedObjects(BATCH_SIZE)
+    totals.prunedRefs += result.prunedRefs
+    totals.deleted += result.deleted
+    totals.freedBytes += result.freedBytes
+    totals.batches++
+    if (!result.hasMore) break
+  }
+
+  console.log(`✅ Hotovo za ${Date.now() - started} ms`, {
+    ...totals,
+    freedMB: Math.round((totals.freedBytes / 1024 / 1024) * 10) / 10,
+  })
+}
+
+main()
+  .then(async () => {
+    await pool.end()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('❌ Úklid souborů selhal:', error)
+    await pool.end()
+    process.exit(1)
+  })
@@ -49,6 +49,63 @@ async function ensureIndex(connection, table, indexName, createSql) {
   console.log(`✅ Index ${indexName} byl vytvořen`)
 }
 
+async function ensureTable(connection, table, createSql) {
+  const [tables] = await connection.execute(
+    `
+      SELECT TABLE_NAME
+      FROM INFORMATION_SCHEMA.TABLES
+      WHERE TABLE_SCHEMA = ?
+        AND TABLE_NAME = ?
+    `,
+    [connectionConfig.database, table]
+  )
+  if (tables.length > 0) {
+    console.log(`⏭️  Tabulka ${table} již existuje`)
+    return false
+  }
+
+  console.log(`➕ Přidávám tabulku: ${table}`)
+  await connection.execute(createSql)
+  console.log(`✅ Tabulka ${table} byla úspěšně vytvořena`)
+  return true
+}
+
+async function dropIndexIfExists(connection, table, indexName) {
+  const existingIndexes = await getExistingIndexes(connection, table)
+  if (!existingIndexes.has(indexName)) {
+    return
+  }
+
+  console.log(`➖ Odstraňuji nahrazený index ${indexName} na tabulce ${table}`)
+  await connection.execute(`DROP INDEX ${indexName} ON ${table}`)
+  console.log(`✅ Index ${indexName} byl odstraněn`)
+}
+
+// Kompozitní indexy pro výpis inzerátů (GET /api/products, viz lib/products.ts).
+// Každý dotaz filtruje isActive = 1 AND isSold = 0, volitelně listingType a category, a řadí podle
+// createdAt, price nebo title (+ id). Pro každou kombinaci existuje index, ve kterém jsou rovnostní
+// sloupce před sloupcem řazení - MySQL pak čte řádky rovnou ve správném pořadí a skončí po LIMIT
+// řádcích (bez filesort). Kontrola: npm run db:check-plans
+const productListFilterColumns = [
+  { suffix: '', columns: [] },
+  { suffix: '_lt', columns: ['listingType'] },
+  { suffix: '_cat', columns: ['category'] },
+  { suffix: '_lt_cat', columns: ['listingType', 'category'] },
+]
+const productListSortColumns = ['createdAt', 'price', 'title']
+
+function productListIndexes() {
+  const indexes = []
+  for (const filter of productListFilterColumns) {
+    for (const sortColumn of productListSortColumns) {
+      const name = `idx_products_active${filter.suffix}_${sortColumn}`
+      const columns = ['isActive', 'isSold', ...filter.columns, sortColumn, 'id']
+      indexes.push({ name, columns })
+    }
+  }
+  return indexes
+}
+
 async function migrateDatabase() {
   const connection = await mysql.createConnection(connectionConfig)
   
@@ -141,6 +198,31 @@ async function migrateDatabase() {
       console.log('⏭️  Sloupec viewCount již existuje')
     }
 
+    // Přidání searchText do products (generovaný sloupec pro fulltextové hledání, viz lib/search.ts)
+    if (!existingProductColumns.includes('searchText')) {
+      console.log('➕ Přidávám sloupec: searchText do products')
+      await connection.execute(`
+        ALTER TABLE products 
+        ADD COLUMN searchText TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci
+          GENERATED ALWAYS AS (CONCAT_WS(' ', title, subcategory, description)) STORED INVISIBLE
+      `)
+      console.log('✅ Sloupec searchText byl úspěšně přidán')
+    } else {
+      console.log('⏭️  Sloupec searchText již existuje')
+    }
+
+    // Přidání imageVariants do products (zmenšené varianty obrázků podle URL originálu, viz lib/images.ts)
+    if (!existingProductColumns.includes('imageVariants')) {
+      console.log('➕ Přidávám sloupec: imageVariants do products')
+      await connection.execute(`
+        ALTER TABLE products 
+        ADD COLUMN imageVariants JSON NULL AFTER images
+      `)
+      console.log('✅ Sloupec imageVariants byl úspěšně přidán')
+    } else {
+      console.log('⏭️  Sloupec imageVariants již existuje')
+    }
+
     // Kontrola existence sloupců v conversations
     const existingConversationColumns = await getExistingColumns(connection, 'conversations')
     console.log('💬 Existující sloupce (conversations):', existingConversationColumns)
@@ -166,6 +248,21 @@ async function migrateDatabase() {
         name: 'hiddenForUserId',
         definition: 'VARCHAR(191) NULL',
         description: 'ID uživatele, který skryl konverzaci (po kliknutí na Ok v notifikaci o uzavření)'
+      },
+      {
+        name: 'lastMessageId',
+        definition: 'VARCHAR(191) NULL',
+        description: 'ID poslední zprávy (udržuje POST /api/messages)'
+      },
+      {
+        name: 'lastMessageAt',
+        definition: 'DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3)',
+        description: 'Čas poslední zprávy, bez zpráv čas založení - řadicí klíč inboxu'
+      },
+      {
+        name: 'lastMessagePreview',
+        definition: 'VARCHAR(255) NULL',
+        description: 'Náhled poslední zprávy pro inbox'
       }
     ]
     
@@ -181,6 +278,27 @@ async function migrateDatabase() {
         console.log(`⏭️  Sloupec ${column.name} již existuje`)
       }
     }
+
+    // Jednorázové doplnění poslední zprávy do existujících konverzací (jen při přidání sloupců)
+    if (!existingConversationColumns.includes('lastMessageAt')) {
+      console.log('🔄 Doplňuji poslední zprávu do existujících konverzací')
+      await connection.execute(`
+        UPDATE conversations c
+        SET c.lastMessageId = (
+          SELECT m.id FROM messages m
+          WHERE m.conversationId = c.id
+          ORDER BY m.createdAt DESC, m.id DESC
+          LIMIT 1
+        )
+      `)
+      await connection.execute(`
+        UPDATE conversations c
+        LEFT JOIN messages m ON m.id = c.lastMessageId
+        SET c.lastMessageAt = COALESCE(m.createdAt, c.createdAt),
+            c.lastMessagePreview = LEFT(m.content, 255)
+      `)
+      console.log('✅ Poslední zprávy doplněny')
+    }
     
     // Kontrola existence tabulky services
     const [servicesTables] = await connection.execute(`
@@ -234,6 +352,18 @@ async function migrateDatabase() {
     } else {
       console.log('⏭️  Sloupec additionalImages již existuje')
     }
+
+    // Přidání imageVariants do services (viz lib/images.ts)
+    if (!existingServiceColumns.includes('imageVariants')) {
+      console.log('➕ Přidávám sloupec: imageVariants do services')
+      await connection.execute(`
+        ALTER TABLE services 
+        ADD COLUMN imageVariants JSON NULL AFTER additionalImages
+      `)
+      console.log('✅ Sloupec imageVariants byl úspěšně přidán')
+    } else {
+      console.log('⏭️  Sloupec imageVariants již existuje')
+    }
     
     // Kontrola existence tabulky service_reviews
     const [reviewsTables] = await connection.execute(`
@@ -299,6 +429,87 @@ async function migrateDatabase() {
       console.log('⏭️  Tabulka reports již existuje')
     }
     
+    // Průběžně udržované statistiky tržiště (lib/stats.ts)
+    await ensureTable(connection, 'stats_counters', `
+      CREATE TABLE stats_counters (
+        name VARCHAR(64) PRIMARY KEY,
+        value BIGINT NOT NULL DEFAULT 0,
+        updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3)
+      )
+    `)
+    await connection.execute(`
+      INSERT IGNORE INTO stats_counters (name, value) VALUES
+        ('productsTotal', 0), ('productsActive', 0), ('productsInactive', 0),
+        ('offersOpen', 0), ('offerViews', 0), ('offerSellers', 0), ('usersTotal', 0)
+    `)
+    await ensureTable(connection, 'stats_listing_buckets', `
+      CREATE TABLE stats_listing_buckets (
+        bucketStart DATETIME PRIMARY KEY,
+        listings INT NOT NULL DEFAULT 0
+      )
+    `)
+    await ensureTable(connection, 'stats_sellers', `
+      CREATE TABLE stats_sellers (
+        userId VARCHAR(191) PRIMARY KEY,
+        listings INT NOT NULL DEFAULT 0
+      )
+    `)
+    console.log('ℹ️  Čítače statistik naplníte příkazem: npm run stats:reconcile')
+
+    // Soubory adresované hashem obsahu a odkazy záznamů na ně (lib/storage.ts, lib/stored-objects.ts)
+    await ensureTable(connection, 'stored_objects', `
+      CREATE TABLE stored_objects (
+        hash CHAR(64) PRIMARY KEY,
+        storageKey VARCHAR(512) NOT NULL,
+        url VARCHAR(512) NOT NULL,
+        size BIGINT NOT NULL,
+        contentType VARCHAR(100) NOT NULL,
+        createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        updatedAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        INDEX idx_stored_objects_url (url),
+        INDEX idx_stored_objects_updatedAt (updatedAt)
+      )
+    `)
+    await ensureTable(connection, 'stored_object_refs', `
+      CREATE TABLE stored_object_refs (
+        ownerType ENUM('product', 'service', 'review') NOT NULL,
+        ownerId VARCHAR(191) NOT NULL,
+        hash CHAR(64) NOT NULL,
+        createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        PRIMARY KEY (ownerType, ownerId, hash),
+        INDEX idx_stored_object_refs_hash (hash),
+        FOREIGN KEY (hash) REFERENCES stored_objects(hash)
+      )
+    `)
+
+    // Relace přímého nahrávání do S3 přes podepsané URL (lib/upload-sessions.ts)
+    await ensureTable(connection, 'upload_sessions', `
+      CREATE TABLE upload_sessions (
+        id CHAR(32) PRIMARY KEY,
+        userId VARCHAR(191) NOT NULL,
+        purpose VARCHAR(32) NOT NULL,
+        status ENUM('pending', 'committed', 'rejected') NOT NULL DEFAULT 'pending',
+        expiresAt DATETIME(3) NOT NULL,
+        createdAt DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+        committedAt DATETIME(3) NULL,
+        INDEX idx_upload_sessions_user_createdAt (userId, createdAt),
+        INDEX idx_upload_sessions_expiresAt (expiresAt),
+        FOREIGN KEY (userId) REFERENCES users(id) ON DELETE CASCADE
+      )
+    `)
+    await ensureTable(connection, 'upload_session_files', `
+      CREATE TABLE upload_session_files (
+        sessionId CHAR(32) NOT NULL,
+        fileIndex INT NOT NULL,
+        hash CHAR(64) NOT NULL,
+        storageKey VARCHAR(512) NOT NULL,
+        size BIGINT NOT NULL,
+        contentType VARCHAR(100) NOT NULL,
+        PRIMARY KEY (sessionId, fileIndex),
+        FOREIGN KEY (sessionId) REFERENCES upload_sessions(id) ON DELETE CASCADE
+      )
+    `)
+
     // Indexy pro products (odpovídají aktuálnímu schématu)
     await ensureIndex(
       connection,
@@ -312,18 +523,6 @@ async function migrateDatabase() {
       'idx_products_createdAt',
       'CREATE INDEX idx_products_createdAt ON products (createdAt)'
     )
-    await ensureIndex(
-      connection,
-      'products',
-      'idx_products_category_listingType',
-      'CREATE INDEX idx_products_category_listingType ON products (category, listingType)'
-    )
-    await ensureIndex(
-      connection,
-      'products',
-      'idx_products_price',
-      'CREATE INDEX idx_products_price ON products (price)'
-    )
     await ensureIndex(
       connection,
       'products',
@@ -343,6 +542,27 @@ async function migrateDatabase() {
       'CREATE INDEX idx_products_userId ON products (userId)'
     )
 
+    // Kompozitní indexy pro výpis inzerátů - nahrazují idx_products_category_listingType a idx_products_price
+    for (const index of productListIndexes()) {
+      await ensureIndex(
+        connection,
+        'products',
+        index.name,
+        `CREATE INDEX ${index.name} ON products (${index.columns.join(', ')})`
+      )
+    }
+    await dropIndexIfExists(connection, 'products', 'idx_products_category_listingType')
+    await dropIndexIfExists(connection, 'products', 'idx_products_price')
+
+    // Fulltextový index pro vyhledávání v inzerátech. Pro hledání dvouznakových výrazů ("m4", "ak")
+    // nastavte na serveru innodb_ft_min_token_size=2, přebudujte index a PRODUCTS_FT_MIN_TOKEN_SIZE=2.
+    await ensureIndex(
+      connection,
+      'products',
+      'ft_products_search',
+      'CREATE FULLTEXT INDEX ft_products_search ON products (searchText)'
+    )
+
     // Indexy pro conversations
     await ensureIndex(
       connection,
@@ -356,6 +576,20 @@ async function migrateDatabase() {
       'idx_conversations_participants',
       'CREATE INDEX idx_conversations_participants ON conversations (participant1Id, participant2Id)'
     )
+    // Inbox (GET /api/conversations) - jeden rozsahový průchod na roli účastníka, seřazený podle
+    // poslední zprávy, bez filesortu
+    await ensureIndex(
+      connection,
+      'conversations',
+      'idx_conversations_inbox_participant1',
+      'CREATE INDEX idx_conversations_inbox_participant1 ON conversations (participant1Id, lastMessageAt, id)'
+    )
+    await ensureIndex(
+      connection,
+      'conversations',
+      'idx_conversations_inbox_participant2',
+      'CREATE INDEX idx_conversations_inbox_participant2 ON conversations (participant2Id, lastMessageAt, id)'
+    )
 
     // Indexy pro messages
     await ensureIndex(
@@ -391,6 +625,14 @@ async function migrateDatabase() {
       'CREATE INDEX idx_services_userId ON services (userId)'
     )
 
+    // Úklid relací nahrávání hledá, zda objekt nečeká na commit v jiné relaci (lib/upload-sessions.ts)
+    await ensureIndex(
+      connection,
+      'upload_session_files',
+      'idx_upload_session_files_storageKey',
+      'CREATE INDEX idx_upload_session_files_storageKey ON upload_session_files (storageKey)'
+    )
+
     console.log('🎉 Migrace databáze dokončena!')
     
   } catch (error) {
@@ -0,0 +1,27 @@
+import pool from '@/lib/mysql'
+import { reconcileMarketplaceStats, readMarketplaceStats } from '@/lib/stats'
+
+// Přepočet průběžně udržovaných statistik (lib/stats.ts) z tabulek products a users.
+// Aplikace ho spouští sama jednou za STATS_RECONCILE_INTERVAL_MS a scripts/seed-bulk-data.js po seedu;
+// ručně po migraci, jiném hromadném importu nebo zásahu přímo v databázi:
+//
+//   npm run stats:reconcile
+
+async function main() {
+  console.log('🔄 Přepočítávám statistiky tržiště...')
+  const started = Date.now()
+  await reconcileMarketplaceStats()
+  const stats = await readMarketplaceStats()
+  console.log(`✅ Hotovo za ${Date.now() - started} ms`, stats)
+}
+
+main()
+  .then(async () => {
+    await pool.end()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('❌ Přepočet statistik selhal:', error)
+    await pool.end()
+    process.exit(1)
+  })
@@ -0,0 +1,520 @@
+const mysql = require('mysql2/promise')
+
+// Hromadný generátor syntetických dat pro výkonnostní testy.
+//
+// Použití:
+//   node scripts/seed-bulk-data.js --scale=1 --seed=42
+//   node scripts/seed-bulk-data.js --scale=0.1 --reset
+//
+// --scale    násobek základních počtů (scale=1 ≈ 500k inzerátů, ~1,3M zpráv)
+// --seed     seed generátoru náhodných čísel - stejný seed = stejná data
+// --batch    počet řádků v jednom multi-row INSERTu (výchozí 2000)
+// --parallel počet souběžně odesílaných dávek (výchozí 4)
+// --reset    před vložením smaže dříve vygenerovaná data (id s prefixem bulk_)
+//
+// Na konci přepočítá statistiky tržiště (stats_counters, stats_listing_buckets, stats_sellers).
+
+const args = Object.fromEntries(
+  process.argv.slice(2).map((arg) => {
+    const [key, value] = arg.replace(/^--/, '').split('=')
+    return [key, value === undefined ? true : value]
+  })
+)
+
+const SCALE = Number(args.scale || 1)
+const SEED = Number(args.seed || 42)
+const BATCH_SIZE = Number(args.batch || 2000)
+const PARALLEL = Number(args.parallel || 4)
+const RESET = Boolean(args.reset)
+
+const connectionConfig = {
+  host: process.env.DB_HOST || '127.0.0.1',
+  port: Number(process.env.DB_PORT || 3306),
+  user: process.env.DB_USER || 'root',
+  password: process.env.DB_PASSWORD || '',
+  database: process.env.DB_NAME || 'burza_web',
+  waitForConnections: true,
+  connectionLimit: PARALLEL,
+  queueLimit: 0,
+  charset: 'utf8mb4',
+}
+
+const counts = {
+  users: Math.max(10, Math.round(20_000 * SCALE)),
+  products: Math.max(20, Math.round(500_000 * SCALE)),
+  conversations: Math.max(10, Math.round(100_000 * SCALE)),
+  services: Math.max(5, Math.round(2_000 * SCALE)),
+  reports: Math.max(5, Math.round(5_000 * SCALE)),
+}
+
+// Deterministický PRNG (mulberry32)
+function createRandom(seed) {
+  let state = seed >>> 0
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0
+    let t = state
+    t = Math.imul(t ^ (t >>> 15), t | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const random = createRandom(SEED)
+const randomInt = (min, max) => min + Math.floor(random() * (max - min + 1))
+const pick = (items) => items[Math.floor(random() * items.length)]
+
+function pickWeighted(entries) {
+  const total = entries.reduce((sum, [, weight]) => sum + weight, 0)
+  let roll = random() * total
+  for (const [value, weight] of entries) {
+    roll -= weight
+    if (roll <= 0) return value
+  }
+  return entries[entries.length - 1][0]
+}
+
+// Mocninné rozdělení - malá část prodejců má většinu inzerátů
+const skewedIndex = (count, exponent = 3) => Math.min(count - 1, Math.floor(count * random() ** exponent))
+
+// Log-normální rozdělení cen, zaokrouhlené na celé desítky
+function logNormal(median, sigma) {
+  const u = Math.max(random(), 1e-9)
+  const v = random()
+  const z = Math.sqrt(-2 * Math.log(u)) * Math.cos(2 * Math.PI * v)
+  return Math.max(10, Math.round((median * Math.exp(sigma * z)) / 10) * 10)
+}
+
+const NOW = Date.now()
+const TWO_YEARS_MS = 2 * 365 * 24 * 60 * 60 * 1000
+
+// Novější data jsou častější (aktivita marketplace roste)
+const recentTimestamp = () => NOW - Math.floor(TWO_YEARS_MS * random() ** 2)
+const toSqlDate = (ms) => new Date(ms).toISOString().slice(0, 23).replace('T', ' ')
+
+const LOCATIONS = [
+  ['Praha', 30], ['Brno', 12], ['Ostrava', 8], ['Plzeň', 5], ['Liberec', 3], ['Olomouc', 3],
+  ['České Budějovice', 3], ['Hradec Králové', 3], ['Pardubice', 3], ['Ústí nad Labem', 2],
+  ['Zlín', 2], ['Jihlava', 1], ['Karlovy Vary', 1], ['Kladno', 2], ['Opava', 1], ['Frýdek-Místek', 1],
+]
+const FIRST_NAMES = ['Tomáš', 'Jan', 'Petr', 'Martin', 'Lukáš', 'David', 'Jakub', 'Ondřej', 'Michal', 'Filip', 'Vojtěch', 'Adam', 'Eva', 'Tereza', 'Lucie', 'Kateřina']
+const LAST_NAMES = ['Novák', 'Svoboda', 'Novotný', 'Dvořák', 'Černý', 'Procházka', 'Kučera', 'Veselý', 'Horák', 'Němec', 'Marek', 'Pokorný', 'Král', 'Růžička']
+const REPUTATIONS = [['VERY_GOOD', 15], ['GOOD', 40], ['NEUTRAL', 35], ['BAD', 7], ['VERY_BAD', 3]]
+const CONDITIONS = [['NEW', 25], ['LIGHT_DAMAGE', 50], ['MAJOR_DAMAGE', 15], ['NON_FUNCTIONAL', 5], ['Po servisu', 5]]
+
+const CATALOG = {
+  AIRSOFT_WEAPONS: {
+    weight: 50,
+    median: 4500,
+    subcategories: ['AEG', 'GBB', 'Sniper', 'HPA', 'Brokovnice', 'Pistole'],
+    items: ['M4 CQB', 'AK-74', 'G36C', 'MP5', 'HK416', 'Glock 17', 'VSR-10', 'SCAR-L', 'M870', 'Hi-Capa', 'P90', 'SA-E10'],
+    brands: ['Specna Arms', 'Tokyo Marui', 'Cyma', 'G&G', 'E&L', 'ICS', 'VFC', 'Krytac', 'ASG', 'WE'],
+  },
+  MILITARY_EQUIPMENT: {
+    weight: 35,
+    median: 1200,
+    subcategories: ['vystroje', 'maskovani', 'obuv', 'helmy', 'batohy', 'optika'],
+    items: ['Plate carrier', 'Chest rig', 'Helma FAST', 'Taktické boty', 'Maskáče Multicam', 'Batoh 30L', 'Opasek', 'Holster', 'Rukavice', 'Red dot'],
+    brands: ['5.11', 'Invader Gear', 'Emerson', 'Helikon-Tex', 'Mil-Tec', 'Condor', 'Crye'],
+  },
+  OTHER: {
+    weight: 15,
+    median: 400,
+    subcategories: ['baterie', 'kulicky', 'nabijecky', 'nahradni-dily', 'ostatni'],
+    items: ['LiPo baterie 11.1V', 'Kuličky 0.28g', 'Nabíječka', 'Hop-up gumička', 'Přesná hlaveň', 'Mosfet', 'Zásobník hi-cap', 'Plyn green gas'],
+    brands: ['Titan', 'BLS', 'Prometheus', 'Maple Leaf', 'Gate', 'Nuprol'],
+  },
+}
+const CATEGORY_WEIGHTS = Object.entries(CATALOG).map(([key, value]) => [key, value.weight])
+
+const SENTENCES = [
+  'Prodávám z důvodu přechodu na jiný systém.',
+  'Zbraň je po kompletním servisu, vyměněné pístnice a těsnění.',
+  'Použito na několika hrách, funkčně bez vady.',
+  'K tomu přidám dva zásobníky a popruh.',
+  'Možnost vyzkoušení na hřišti po domluvě.',
+  'Osobní předání možné, jinak posílám Zásilkovnou.',
+  'Drobné oděrky na povrchu, viz fotky.',
+  'Kadence kolem 25 rps na 11.1V LiPo.',
+  'Výkon změřen na 0.20g kuličkách, cca 1.3 J.',
+  'Originální krabice a manuál jsou součástí.',
+  'Cena je k jednání, výměny nenabízejte.',
+  'Hop-up drží rovně i na delší vzdálenosti.',
+  'Velikost univerzální, nastavitelné popruhy.',
+  'Kupováno v obchodě před rokem, faktura k dispozici.',
+  'Při rychlém jednání sleva.',
+  'Nekouřící domácnost, skladováno v suchu.',
+]
+const MESSAGE_LINES = [
+  'Dobrý den, je inzerát ještě aktuální?', 'Ano, stále k dispozici.', 'Šlo by něco dolů z ceny?',
+  'Max. o 300 Kč, níž jít nemůžu.', 'Můžete poslat více fotek?', 'Posílám, stačí?', 'Kde je možné předání?',
+  'Jsem z Prahy, můžeme se potkat na Florenci.', 'Beru, pošlete prosím číslo účtu.', 'Odesláno, díky!',
+  'Je tam i baterie?', 'Baterie není součástí.', 'Jaká je kadence?', 'Domluveno, zítra v 17:00.',
+  'Omlouvám se, už je prodáno.', 'Ještě bych se zeptal na stav hop-upu.',
+]
+
+function productDescription() {
+  const sentenceCount = randomInt(3, 14)
+  const parts = []
+  for (let i = 0; i < sentenceCount; i++) parts.push(pick(SENTENCES))
+  return parts.join(' ')
+}
+
+function imageList() {
+  const count = pickWeighted([[1, 20], [2, 25], [3, 20], [4, 15], [6, 12], [8, 6], [10, 2]])
+  const images = []
+  for (let i = 0; i < count; i++) images.push(`/images/picture${randomInt(1, 10)}.jpg`)
+  return images
+}
+
+// Generátor dávek řádků → multi-row INSERT, několik dávek souběžně
+async function insertRows(pool, table, columns, rowCount, makeRow) {
+  const started = Date.now()
+  const sql = `INSERT INTO ${table} (${columns.map((c) => `\`${c}\``).join(', ')}) VALUES ?`
+  const inFlight = new Set()
+  let batch = []
+  let inserted = 0
+
+  const flush = async (rows) => {
+    const task = pool.query(sql, [rows]).then(() => {
+      inserted += rows.length
+      inFlight.delete(task)
+    })
+    inFlight.add(task)
+    if (inFlight.size >= PARALLEL) {
+      await Promise.race(inFlight)
+    }
+  }
+
+  for (let i = 0; i < rowCount; i++) {
+    const row = makeRow(i)
+    if (!row) continue
+    batch.push(row)
+    if (batch.length >= BATCH_SIZE) {
+      await flush(batch)
+      batch = []
+    }
+  }
+  if (batch.length) await flush(batch)
+  await Promise.all(inFlight)
+
+  const seconds = (Date.now() - started) / 1000
+  console.log(`✅ ${table}: ${inserted.toLocaleString('cs-CZ')} řádků za ${seconds.toFixed(1)} s`)
+  return inserted
+}
+
+async function resetBulkData(pool) {
+  console.log('🧹 Mažu dříve vygenerovaná data (bulk_*)...')
+  const tables = ['messages', 'conversations', 'service_reviews', 'services', 'reports', 'products', 'sessions', 'accounts', 'verification_tokens', 'users']
+  for (const table of tables) {
+    const column = table === 'verification_tokens' ? 'identifier' : 'id'
+    await pool.query(`DELETE FROM ${table} WHERE ${column} LIKE 'bulk\\_%'`)
+  }
+}
+
+// Hromadný seed a --reset obcházejí aplikaci, takže průběžně udržované statistiky (lib/stats.ts) se
+// musí přepočítat. Stejné dotazy jako reconcileMarketplaceStats - seeder je čistý JS a lib/stats.ts
+// importovat nemůže, při změně je držte v souladu.
+const BUCKET_RETENTION_DAYS = 31
+
+async function reconcileStats(pool) {
+  const [tables] = await pool.query(
+    `SELECT COUNT(*) as count FROM information_schema.tables
+     WHERE table_schema = DATABASE() AND table_name IN ('stats_counters', 'stats_listing_buckets', 'stats_sellers')`
+  )
+  if (Number(tables[0].count) < 3) {
+    console.log('ℹ️  Tabulky statistik chybí - spusťte migraci a pak npm run stats:reconcile')
+    return
+  }
+
+  console.log('🔄 Přepočítávám statistiky tržiště...')
+  const started = Date.now()
+  const connection = await pool.getConnection()
+  try {
+    await connection.beginTransaction()
+    await connection.query('SELECT name FROM stats_counters FOR UPDATE')
+
+    const [[totals]] = await connection.query(
+      `SELECT
+         COUNT(*) as productsTotal,
+         COALESCE(SUM(isActive = 1 AND isSold = 0), 0) as productsActive,
+         COALESCE(SUM(isActive = 0), 0) as productsInactive,
+         COALESCE(SUM(listingType = 'NABIZIM' AND isSold = 0), 0) as offersOpen,
+         COALESCE(SUM(CASE WHEN listingType = 'NABIZIM' THEN COALESCE(viewCount, 0) END), 0) as offerViews,
+         COUNT(DISTINCT CASE WHEN listingType = 'NABIZIM' AND isSold = 0 THEN userId END) as offerSellers
+       FROM products`
+    )
+    const [[users]] = await connection.query('SELECT COUNT(*) as usersTotal FROM users')
+
+    const values = {
+      productsTotal: Number(totals.productsTotal) || 0,
+      productsActive: Number(totals.productsActive) || 0,
+      productsInactive: Number(totals.productsInactive) || 0,
+      offersOpen: Number(totals.offersOpen) || 0,
+      offerViews: Number(totals.offerViews) || 0,
+      offerSellers: Number(totals.offerSellers) || 0,
+      usersTotal: Number(users.usersTotal) || 0,
+    }
+    await connection.query(
+      'INSERT INTO stats_counters (name, value) VALUES ? ON DUPLICATE KEY UPDATE value = VALUES(value)',
+      [Object.keys(values).map((name) => [name, values[name]])]
+    )
+
+    await connection.query('DELETE FROM stats_listing_buckets')
+    await connection.query(
+      `INSERT INTO stats_listing_buckets (bucketStart, listings)
+       SELECT DATE_FORMAT(createdAt, '%Y-%m-%d %H:00:00') as bucketStart, COUNT(*)
+       FROM products
+       WHERE listingType = 'NABIZIM' AND isSold = 0 AND createdAt >= NOW() - INTERVAL ${BUCKET_RETENTION_DAYS} DAY
+       GROUP BY bucketStart`
+    )
+
+    await connection.query('DELETE FROM stats_sellers')
+    await connection.query(
+      `INSERT INTO stats_sellers (userId, listings)
+       SELECT userId, COUNT(*) FROM products
+       WHERE listingType = 'NABIZIM' AND isSold = 0
+       GROUP BY userId`
+    )
+
+    await connection.commit()
+    console.log(`✅ Statistiky přepočítány za ${((Date.now() - started) / 1000).toFixed(1)} s`, values)
+  } catch (error) {
+    await connection.rollback()
+    throw error
+  } finally {
+    connection.release()
+  }
+}
+
+async function seedBulk() {
+  const pool = mysql.createPool(connectionConfig)
+
+  // Pro hromadný import vypnout kontroly na úrovni session (platí pro každé spojení poolu)
+  pool.on('connection', (connection) => {
+    connection.query('SET SESSION foreign_key_checks = 0, unique_checks = 0')
+  })
+
+  try {
+    console.log(`🌱 Hromadný seed: scale=${SCALE}, seed=${SEED}, batch=${BATCH_SIZE}, parallel=${PARALLEL}`)
+    console.log('📊 Cílové počty:', counts)
+    if (RESET) await resetBulkData(pool)
+
+    const userId = (i) => `bulk_user_${i}`
+    const productId = (i) => `bulk_product_${i}`
+    const serviceId = (i) => `bulk_service_${i}`
+    const conversationId = (i) => `bulk_conv_${i}`
+
+    const userCreatedAt = new Float64Array(counts.users)
+    await insertRows(
+      pool,
+      'users',
+      ['id', 'name', 'email', 'image', 'phone', 'nickname', 'city', 'bio', 'reputation', 'createdAt', 'updatedAt', 'isVerified', 'isBanned', 'isAdmin', 'lastLoginAt'],
+      counts.users,
+      (i) => {
+        const first = pick(FIRST_NAMES)
+        const last = pick(LAST_NAMES)
+        const createdAt = recentTimestamp()
+        userCreatedAt[i] = createdAt
+        return [
+          userId(i), `${first} ${last}`, `bulk.user.${i}@example.com`, `/images/picture${randomInt(1, 10)}.jpg`,
+          random() < 0.6 ? `+420 ${randomInt(600, 799)} ${randomInt(100, 999)} ${randomInt(100, 999)}` : null,
+          random() < 0.7 ? `${first.toLowerCase()}_${i}` : null, pickWeighted(LOCATIONS),
+          random() < 0.3 ? productDescription() : null, pickWeighted(REPUTATIONS),
+          toSqlDate(createdAt), toSqlDate(createdAt), random() < 0.4 ? 1 : 0, random() < 0.01 ? 1 : 0,
+          i === 0 ? 1 : 0, toSqlDate(createdAt + (NOW - createdAt) * random()),
+        ]
+      }
+    )
+
+    await insertRows(
+      pool,
+      'accounts',
+      ['id', 'userId', 'type', 'provider', 'providerAccountId', 'access_token', 'expires_at', 'token_type', 'scope'],
+      counts.users,
+      (i) => random() < 0.85
+        ? [`bulk_account_${i}`, userId(i), 'oauth', 'google', `bulk_google_${i}`, `bulk_token_${i}`, Math.floor(NOW / 1000) + 3600, 'Bearer', 'openid email profile']
+        : null
+    )
+
+    await insertRows(pool, 'sessions', ['id', 'sessionToken', 'userId', 'expires'], counts.users, (i) =>
+      random() < 0.05 ? [`bulk_session_${i}`, `bulk_session_token_${i}`, userId(i), toSqlDate(NOW + 30 * 86_400_000)] : null
+    )
+
+    await insertRows(pool, 'verification_tokens', ['identifier', 'token', 'expires'], counts.users, (i) =>
+      random() < 0.01 ? [`bulk_user_${i}`, `bulk_verification_${i}`, toSqlDate(NOW + 86_400_000)] : null
+    )
+
+    // Prodejce a čas vzniku každého inzerátu potřebujeme pro konverzace
+    const productSeller = new Int32Array(counts.products)
+    const productCreatedAt = new Float64Array(counts.products)
+    await insertRows(
+      pool,
+      'products',
+      ['id', 'title', 'description', 'price', 'listingType', 'category', 'subcategory', 'condition', 'mainImage', 'images', 'location', 'isActive', 'isSold', 'viewCount', 'createdAt', 'updatedAt', 'userId'],
+      counts.products,
+      (i) => {
+        const category = pickWeighted(CATEGORY_WEIGHTS)
+        const catalog = CATALOG[category]
+        const seller = skewedIndex(counts.users)
+        const createdAt = Math.max(userCreatedAt[seller], recentTimestamp())
+        const images = imageList()
+        const isSold = random() < 0.15
+        productSeller[i] = seller
+        productCreatedAt[i] = createdAt
+        return [
+          productId(i), `${pick(catalog.items)} ${pick(catalog.brands)}`.slice(0, 191), productDescription(),
+          logNormal(catalog.median, 0.8), random() < 0.8 ? 'NABIZIM' : 'SHANIM', category, pick(catalog.subcategories),
+          pickWeighted(CONDITIONS), images[0], JSON.stringify(images), pickWeighted(LOCATIONS),
+          random() < 0.9 ? 1 : 0, isSold ? 1 : 0, Math.floor(logNormal(40, 1.4) / 10),
+          toSqlDate(createdAt), toSqlDate(createdAt + (NOW - createdAt) * random() * 0.2), userId(seller),
+        ]
+      }
+    )
+
+    // Konverzace: populární inzeráty mají více zájemců; dvojice (inzerát, kupující) je unikátní
+    const conversationPairs = new Set()
+    const conversations = []
+    while (conversations.length < counts.conversations && conversationPairs.size < counts.products * (counts.users - 1)) {
+      const product = skewedIndex(counts.products, 2)
+      const buyer = randomInt(0, counts.users - 1)
+      const seller = productSeller[product]
+      const key = `${product}|${buyer}`
+      if (buyer === seller || conversationPairs.has(key)) continue
+      conversationPairs.add(key)
+      conversations.push({ product, buyer, seller, startedAt: productCreatedAt[product] + (NOW - productCreatedAt[product]) * random() * 0.5 })
+    }
+    conversationPairs.clear()
+
+    // Délka vláken má dlouhý chvost - většina pár zpráv, někteří vyjednávají stovky
+    const messageCounts = conversations.map(() => Math.min(400, Math.max(1, Math.round(logNormal(60, 1.1) / 10))))
+    const lastMessageAt = new Float64Array(conversations.length)
+    const lastMessageIndex = new Int32Array(conversations.length).fill(-1)
+    const lastMessagePreview = new Array(conversations.length)
+    const totalMessages = messageCounts.reduce((sum, count) => sum + count, 0)
+
+    let conversationCursor = 0
+    let messageCursor = 0
+    let messageTime = 0
+    await insertRows(
+      pool,
+      'messages',
+      ['id', 'content', 'createdAt', 'conversationId', 'senderId', 'receiverId'],
+      totalMessages,
+      (i) => {
+        if (messageCursor === 0) messageTime = conversations[conversationCursor].startedAt
+        const conversation = conversations[conversationCursor]
+        const fromBuyer = messageCursor % 2 === 0 ? random() < 0.85 : random() < 0.3
+        messageTime = Math.min(NOW, messageTime + Math.floor(60_000 * logNormal(30, 2) / 10))
+        const content = pick(MESSAGE_LINES)
+        const row = [
+          `bulk_msg_${i}`, content, toSqlDate(messageTime), conversationId(conversationCursor),
+          userId(fromBuyer ? conversation.buyer : conversation.seller), userId(fromBuyer ? conversation.seller : conversation.buyer),
+        ]
+        lastMessageAt[conversationCursor] = messageTime
+        lastMessageIndex[conversationCursor] = i
+        lastMessagePreview[conversationCursor] = content.slice(0, 255)
+        messageCursor++
+        if (messageCursor >= messageCounts[conversationCursor]) {
+          conversationCursor++
+          messageCursor = 0
+        }
+        return row
+      }
+    )
+
+    await insertRows(
+      pool,
+      'conversations',
+      ['id', 'productId', 'participant1Id', 'participant2Id', 'createdAt', 'updatedAt', 'lastMessageId', 'lastMessageAt', 'lastMessagePreview'],
+      conversations.length,
+      (i) => {
+        const conversation = conversations[i]
+        const lastActivity = toSqlDate(lastMessageAt[i] || conversation.startedAt)
+        return [
+          conversationId(i), productId(conversation.product), userId(conversation.buyer), userId(conversation.seller),
+          toSqlDate(conversation.startedAt), lastActivity,
+          lastMessageIndex[i] >= 0 ? `bulk_msg_${lastMessageIndex[i]}` : null, lastActivity, lastMessagePreview[i] || null,
+        ]
+      }
+    )
+
+    // Recenze nejdřív, aby rating a reviewCount servisu odpovídaly skutečným recenzím
+    const reviewsPerService = Array.from({ length: counts.services }, () => Math.min(counts.users - 1, Math.round(logNormal(200, 1.2) / 10)))
+    const serviceRatings = reviewsPerService.map(() => ({ sum: 0, count: 0 }))
+    const reviewRows = []
+    reviewsPerService.forEach((reviewCount, service) => {
+      const reviewers = new Set()
+      while (reviewers.size < reviewCount) reviewers.add(randomInt(0, counts.users - 1))
+      const quality = 2.5 + random() * 2.5
+      for (const reviewer of reviewers) reviewRows.push([service, reviewer, quality])
+    })
+
+    await insertRows(
+      pool,
+      'service_reviews',
+      ['id', 'serviceId', 'userId', 'ratingSpeed', 'ratingQuality', 'ratingCommunication', 'ratingPrice', 'ratingOverall', 'comment', 'images', 'createdAt', 'updatedAt'],
+      reviewRows.length,
+      (i) => {
+        const [service, reviewer, quality] = reviewRows[i]
+        const rate = () => Math.min(5, Math.max(1, Math.round(quality + (random() - 0.5) * 2)))
+        const overall = rate()
+        const createdAt = toSqlDate(recentTimestamp())
+        serviceRatings[service].sum += overall
+        serviceRatings[service].count++
+        return [
+          `bulk_review_${i}`, serviceId(service), userId(reviewer), rate(), rate(), rate(), rate(), overall,
+          random() < 0.7 ? productDescription() : null, random() < 0.2 ? JSON.stringify(imageList().slice(0, 3)) : null,
+          createdAt, createdAt,
+        ]
+      }
+    )
+
+    await insertRows(
+      pool,
+      'services',
+      ['id', 'name', 'description', 'location', 'contactEmail', 'contactPhone', 'image', 'additionalImages', 'rating', 'reviewCount', 'isActive', 'createdAt', 'updatedAt', 'userId'],
+      counts.services,
+      (i) => {
+        const { sum, count } = serviceRatings[i]
+        const createdAt = toSqlDate(recentTimestamp())
+        return [
+          serviceId(i), `Airsoft servis ${pick(LAST_NAMES)} ${i}`, productDescription(), pickWeighted(LOCATIONS),
+          `bulk.service.${i}@example.com`, `+420 ${randomInt(600, 799)} ${randomInt(100, 999)} ${randomInt(100, 999)}`,
+          `/images/picture${randomInt(1, 10)}.jpg`, JSON.stringify(imageList().slice(0, 4)),
+          count ? (sum / count).toFixed(2) : null, count, random() < 0.95 ? 1 : 0, createdAt, createdAt,
+          userId(skewedIndex(counts.users)),
+        ]
+      }
+    )
+
+    await insertRows(
+      pool,
+      'reports',
+      ['id', 'type', 'title', 'description', 'email', 'url', 'status', 'userId', 'createdAt', 'updatedAt'],
+      counts.reports,
+      (i) => {
+        const createdAt = toSqlDate(recentTimestamp())
+        const reporter = random() < 0.7 ? randomInt(0, counts.users - 1) : null
+        return [
+          `bulk_report_${i}`, pickWeighted([['BUG', 50], ['FEATURE', 30], ['SECURITY', 5], ['OTHER', 15]]),
+          `Hlášení ${i}`, productDescription(), reporter === null ? `anon${i}@example.com` : null,
+          random() < 0.5 ? `/products/${productId(randomInt(0, counts.products - 1))}` : null,
+          pickWeighted([['PENDING', 40], ['IN_PROGRESS', 15], ['RESOLVED', 35], ['REJECTED', 10]]),
+          reporter === null ? null : userId(reporter), createdAt, createdAt,
+        ]
+      }
+    )
+
+    await reconcileStats(pool)
+
+    console.log('🎉 Hromadný seed byl úspěšně dokončen!')
+  } catch (error) {
+    console.error('❌ Hromadný seed selhal:', error)
+    console.log('ℹ️  Čítače statistik po částečném seedu opravíte příkazem: npm run stats:reconcile')
+    process.exitCode = 1
+  } finally {
+    await pool.end()
+  }
+}
+
+seedBulk()
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -52,15 +57,15 @@ async def run_test():
             await expect(frame.locator('text=Registration Complete! Welcome to Your New Account').first).to_be_visible(timeout=30000)
         except AssertionError:
             raise AssertionError("Test case failed: The user registration did not complete successfully or the confirmation was not received as expected based on the test plan.")
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,21 +55,21 @@ async def run_test():
         frame = context.pages[-1]
         # Click 'Přijmout vše' to accept cookies and remove cookie banner
         elem = frame.locator('xpath=html/body/div[3]/div/div/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click the 'Přihlásit se' button to navigate to the login page.
         frame = context.pages[-1]
         # Click 'Přihlásit se' button to go to the login page
         elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click the 'Přihlásit se s Google' button to start the Google OAuth authentication process.
         frame = context.pages[-1]
         # Click 'Přihlásit se s Google' button to initiate Google OAuth login
         elem = frame.locator('xpath=html/body/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -73,15 +78,15 @@ async def run_test():
             await expect(frame.locator('text=Authentication Successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The login flow using Google OAuth did not succeed as expected. The user was not authenticated or redirected to the dashboard/homepage.")
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,62 +55,62 @@ async def run_test():
         frame = context.pages[-1]
         # Click on 'Přihlásit se' (Login) button to open login form
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/section[4]/div/div/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přihlásit se' (Login) button to start login process.
         frame = context.pages[-1]
         # Click on 'Přihlásit se' (Login) button to start login process
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[5]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Domů' (Home) to return to homepage and then click 'Přihlásit se' (Login) button.
         frame = context.pages[-1]
         # Click on 'Domů' (Home) to return to homepage
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přihlásit se' (Login) button to open login form.
         frame = context.pages[-1]
         # Click on 'Přihlásit se' (Login) button to open login form
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Dismiss or accept the cookie consent banner to ensure it does not block interaction, then locate and click the 'Přihlásit se' button to open login form.
         frame = context.pages[-1]
         # Click 'Přijmout vše' (Accept all) on cookie consent banner to remove it
         elem = frame.locator('xpath=html/body/div[3]/div/div/div/button[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přihlásit se' (Login) button to open login form.
         frame = context.pages[-1]
         # Click on 'Přihlásit se' (Login) button to open login form
         elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přihlásit se s Google' button to login.
         frame = context.pages[-1]
         # Click on 'Přihlásit se s Google' button to login via Google account
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Input the valid user's email into the email input field and click 'Next' to proceed with Google login.
         frame = context.pages[-1]
         # Input the valid user's email into the email input field
         elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/c-wiz/main/div[2]/div/div/div/form/span/section/div/div/div/div/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validuser@example.com')
+        await waits.ready(elem); await elem.fill('validuser@example.com')
         
 
         frame = context.pages[-1]
         # Click the 'Next' button to proceed with Google login
         elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/c-wiz/main/div[3]/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -114,15 +119,15 @@ async def run_test():
             await expect(frame.locator('text=Product Listing Created Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The product listing creation did not succeed as expected. The success notification 'Product Listing Created Successfully' was not found on the page, indicating failure in creating a detailed product listing with proper category, type, and image uploads.")
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,28 +55,28 @@ async def run_test():
         frame = context.pages[-1]
         # Click on 'Nabídka' link to go to the products page
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Try clicking the 'Prohlédnout nabídky' button (index 18) which might lead to the product listings page.
         frame = context.pages[-1]
         # Click on 'Prohlédnout nabídky' button to try navigating to product listings
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/section[4]/div/div/div/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on a product category filter link (index 8, 9, or 10) to filter products by category.
         frame = context.pages[-1]
         # Click on 'Airsoft zbraně' category filter to filter products by this category
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Input a keyword into the product search box (index 8) and click the search button (index 9) to filter products by the search term.
         frame = context.pages[-1]
         # Input 'L96' into the product search box to filter products by this keyword
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[2]/div/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('L96')
+        await waits.ready(elem); await elem.fill('L96')
         
 
         # --> Assertions to verify final state
@@ -80,15 +85,15 @@ async def run_test():
             await expect(frame.locator('text=Exclusive Product Not Found').first).to_be_visible(timeout=30000)
         except AssertionError:
             raise AssertionError("Test case failed: The test plan execution failed while verifying product filtering by categories and search terms. Expected filtered products to be displayed, but they were not found on the page.")
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,17 +55,17 @@ async def run_test():
         frame = context.pages[-1]
         # Click 'Zaregistrovat se zdarma' to try to access registration or login for user context.
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/section[4]/div/div/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Attempt unauthorized edit or delete API request on product listing and verify authorization enforcement.
         await page.goto('http://localhost:3000/api/products/product_1761905158923_qt4g55rsl', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # -> Send unauthorized PUT request to edit product and verify it is denied with proper error code.
         await page.goto('http://localhost:3000/api/products/product_1761905158923_qt4g55rsl', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # --> Assertions to verify final state
@@ -70,15 +75,15 @@ async def run_test():
         await expect(frame.locator('text=Vyhledávání podle kategorie, ceny, stavu a lokace.').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Připojte se k největší airsoft komunitě v České republice. Prodávejte a nakupujte airsoft vybavení, vytvářejte inzeráty, prohlížejte nabídky a propojte se s dalšími hráči.').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=© 2025 Airsoft Burza. Všechna práva vyhrazena.').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,42 +55,42 @@ async def run_test():
         frame = context.pages[-1]
         # Click on 'Poptávka' (Demand) to navigate to product/service creation or relevant upload page.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Try clicking 'Nabídka' or 'Servisy' to find upload functionality or report the website issue if no navigation to upload page is possible.
         frame = context.pages[-1]
         # Click on 'Nabídka' to try alternative navigation to upload or product creation page.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Airsoft zbraně' category to proceed to product listing or creation page where upload might be available.
         frame = context.pages[-1]
         # Click on 'Airsoft zbraně' category to check for upload or product creation options.
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přidat inzerát' button to access product creation/upload page for file upload validation.
         frame = context.pages[-1]
         # Click on 'Přidat inzerát' button to open product creation/upload page.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[5]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click 'Domů' link to return to homepage and then locate 'Přidat inzerát' button to access upload page.
         frame = context.pages[-1]
         # Click on 'Domů' link to return to homepage.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click on 'Přidat inzerát' button in the sidebar to open product creation/upload page.
         frame = context.pages[-1]
         # Click on 'Přidat inzerát' button in the sidebar to access upload page.
         elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # --> Assertions to verify final state
@@ -94,15 +99,15 @@ async def run_test():
             await expect(frame.locator('text=File upload validation successful').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: File uploads did not validate file type and size limits correctly on client and server sides as per the test plan.")
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -48,37 +53,37 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # -> Navigate to a non-existent route to verify the custom 404 'not found' page.
         await page.goto('http://localhost:3000/non-existent-route', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # -> Trigger a server or client error to verify if a custom error page or user-friendly error message is displayed.
         await page.goto('http://localhost:3000/api/trigger-error', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # -> Retry triggering server error to verify custom error page.
         await page.goto('http://localhost:3000/api/trigger-error', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # -> Test triggering a server or client error to verify if a custom error page or user-friendly error message is displayed gracefully.
         await page.goto('http://localhost:3000/api/trigger-error', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # --> Assertions to verify final state
         frame = context.pages[-1]
         await expect(frame.locator('text=Stránka nenalezena').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Omlouváme se, ale stránka kterou hledáte neexistuje nebo byla přesunuta.').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -2,32 +2,37 @@ import asyncio
 from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
+import waits
+
+async def run_test(context=None):
     pw = None
     browser = None
-    context = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
     
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
         page = await context.new_page()
+        waits.track(page)
         
         # Navigate to your target URL and wait until the network request is committed
         await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
@@ -50,85 +55,85 @@ async def run_test():
         frame = context.pages[-1]
         # Click on 'Nabídka' menu to trigger product list loading and observe loading spinner.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Try clicking 'Poptávka' to see if it triggers a loading spinner or asynchronous operation.
         frame = context.pages[-1]
         # Click on 'Poptávka' menu to trigger data fetch and observe loading spinner.
         elem = frame.locator('xpath=html/body/div[2]/div/div/nav/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Dismiss the cookie consent banner by clicking 'Přijmout vše' to avoid interference with further UI interactions.
         frame = context.pages[-1]
         # Click 'Přijmout vše' button to accept cookies and dismiss the cookie consent banner.
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[2]/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Try clicking 'Odmítnout nepodstatné' button to dismiss cookie banner alternatively.
         frame = context.pages[-1]
         # Click 'Odmítnout nepodstatné' button to try dismissing the cookie consent banner alternatively.
         elem = frame.locator('xpath=html/body/div[3]/div/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Click 'Přidat první inzerát' button to add a new listing and trigger asynchronous operations and confirmation dialogs.
         frame = context.pages[-1]
         # Click 'Přidat první inzerát' button to add a new listing and trigger asynchronous operations and confirmation dialogs.
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[3]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Fill the 'Název produktu' input with 'Test Product', select 'Nabídka' for 'Sekce', select 'Airsoft zbraně' for 'Kategorie', fill 'Popis' with 'Test description', set 'Cena' to 1000, select 'Nový' for 'Stav', then submit the form.
         frame = context.pages[-1]
         # Fill 'Název produktu' input with 'Test Product'
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test Product')
+        await waits.ready(elem); await elem.fill('Test Product')
         
 
         frame = context.pages[-1]
         # Fill 'Popis' textarea with 'Test description'
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div/div[2]/div[4]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test description')
+        await waits.ready(elem); await elem.fill('Test description')
         
 
         frame = context.pages[-1]
         # Fill 'Cena' input with 1000
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div/div[2]/div[5]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1000')
+        await waits.ready(elem); await elem.fill('1000')
         
 
         frame = context.pages[-1]
         # Click 'Zveřejnit inzerát' button to submit the form and trigger asynchronous operation and confirmation dialog
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Fill the required 'Město' input field with 'Praha' and then resubmit the form to trigger asynchronous operation and confirmation dialogs.
         frame = context.pages[-1]
         # Fill the required 'Město' input field with 'Praha'
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div[3]/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Praha')
+        await waits.ready(elem); await elem.fill('Praha')
         
 
         frame = context.pages[-1]
         # Click 'Zveřejnit inzerát' button to submit the form and trigger asynchronous operation and confirmation dialog
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/form/div[5]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Test confirmation dialogs by attempting to delete or toggle state of an existing listing if accessible, or report that confirmation dialogs cannot be tested due to lack of authorization.
         await page.goto('http://localhost:3000/products', timeout=10000)
-        await asyncio.sleep(3)
+        await waits.network_idle(page)
         
 
         # -> Click 'Zobrazit podrobnosti' button on the first product to open details and look for delete or toggle state options to trigger confirmation dialogs.
         frame = context.pages[-1]
         # Click 'Zobrazit podrobnosti' button on the first product to open details and check for delete or toggle state options.
         elem = frame.locator('xpath=html/body/div[2]/main/div/div/main/div/div[3]/div/div[2]/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.ready(elem); await elem.click(timeout=5000)
         
 
         # -> Scroll down to find delete or toggle state buttons to trigger confirmation dialogs.
@@ -147,15 +152,15 @@ async def run_test():
         await expect(frame.locator('text=Zveřejnit inzerát').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Praha').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Prodávám za 6000 Kč, nová stála okolo 12500 Kč. Zbraň Well L96 s přesnou nerezovou hlavní 6,01 mm, hop up komorou na AEG hop up gumičky airsoftpro, hop up gumičkou Maple Leaf Maracon 70°, hliníkovou přechodkou na 14 mm AEG závit, ocelovým válcem, pístem s pružinou asi M150, kovovým CNC spoušťovým mechanismem airsoftpro, nerezovou hlavou válce, možná ocelovou vzpěrou trnu, centrovacími kroužky (3 černé). Součástí jsou 3 zásobníky, bipody s kovovou částí do zbraně, optika 3-9x40 s killflashem, popruh a zbytek 0,45 g kuliček. Doporučuji dokoupit kvalitní tlumič za 1000 Kč, se kterým je zbraň hodně tichá. Při rychlém jednání sleva. Osobní odběr v Letohradě nebo Praze, možnost zaslání přes zásilkovnu. Kontakt přes e-mail nebo WhatsApp. Cena k jednání.').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
+        await waits.network_idle(page)
     
     finally:
-        if context:
+        if context and owns_context:
             await context.close()
         if browser:
             await browser.close()
         if pw:
             await pw.stop()
             
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,79 @@
+import asyncio
+from playwright import async_api
+from playwright.async_api import expect
+
+import perf
+
+# Budgeted routes; "/products/[id]" is filled in with the newest active listing
+ROUTES = ["/", "/nabidka", "/poptavka", "/products/[id]", "/services"]
+
+async def run_test(context=None):
+    pw = None
+    browser = None
+    # The suite runner (run_suite.py) passes in a fresh context from a shared browser
+    owns_context = context is None
+    
+    try:
+        if owns_context:
+            # Start a Playwright session in asynchronous mode
+            pw = await async_api.async_playwright().start()
+            
+            # Launch a Chromium browser in headless mode with custom arguments
+            browser = await pw.chromium.launch(
+                headless=True,
+                args=[
+                    "--window-size=1280,720",         # Set the browser window size
+                    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+                    "--ipc=host",                     # Use host-level IPC for better stability
+                    "--single-process"                # Run the browser in a single process mode
+                ],
+            )
+            
+            # Create a new browser context (like an incognito window)
+            context = await browser.new_context()
+        context.set_default_timeout(5000)
+        
+        # Resolve a real product id for the detail page route
+        response = await context.request.get(f"{perf.BASE_URL}/api/products?limit=1&sort=newest")
+        products = (await response.json()).get("products", []) if response.ok else []
+        
+        budgets = perf.load_budgets()
+        results = []
+        violations = []
+        
+        # Measure every route in its own context so each load starts with a cold HTTP cache
+        for route in ROUTES:
+            path = route
+            if route == "/products/[id]":
+                if not products:
+                    violations.append(f"{route}: no active product to measure")
+                    continue
+                path = f"/products/{products[0]['id']}"
+            
+            route_context = await context.browser.new_context()
+            try:
+                await perf.install(route_context)
+                page = await route_context.new_page()
+                metrics = await perf.measure(page, path, route)
+            finally:
+                await route_context.close()
+            
+            results.append(metrics)
+            violations.extend(perf.check(metrics, budgets))
+        
+        perf.write_results(results, violations)
+        
+        # --> Assertions to verify final state
+        if violations:
+            raise AssertionError("Test case failed: page-load budgets exceeded:\n" + "\n".join(violations))
+    
+    finally:
+        if context and owns_context:
+            await context.close()
+        if browser:
+            await browser.close()
+        if pw:
+            await pw.stop()
+            
+if __name__ == "__main__":
+    asyncio.run(run_test())
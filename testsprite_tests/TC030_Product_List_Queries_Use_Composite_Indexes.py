@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+# Repository root - the plan check imports the same query builder as GET /api/products
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def run_test(context=None):
+    # No browser needed: EXPLAIN every product list query shape against the configured MySQL.
+    # Run on realistic data (scripts/seed-bulk-data.js), an empty table makes full scans look cheap.
+    process = await asyncio.create_subprocess_exec(
+        "npx", "tsx", "scripts/check-products-query-plans.ts",
+        cwd=ROOT,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    output, _ = await process.communicate()
+    
+    # --> Assertions to verify final state
+    if process.returncode != 0:
+        raise AssertionError(
+            "Test case failed: product list queries scan the table or sort without an index:\n"
+            + output.decode("utf-8", "replace")
+        )
+            
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,124 @@
+"""Cached authenticated sessions for the TestSprite Playwright scripts.
+
+Logs in once per role through the NextAuth ``e2e`` credentials provider
+(enabled on the server by ``E2E_LOGIN_SECRET``, see lib/auth.ts), saves the
+Playwright storage state to ``.auth/<role>.json`` and reuses it across contexts
+and runs until the session cookie is about to expire.
+
+    state = await auth_state.storage_state(browser, "user")
+    context = await browser.new_context(storage_state=state)
+
+Environment:
+    E2E_BASE_URL        app URL (default http://localhost:3000)
+    E2E_LOGIN_SECRET    must match the server's value
+    E2E_USER_EMAIL      account used for the "user" role (default demo1@example.com)
+    E2E_ADMIN_EMAIL     account used for the "admin" role (must have isAdmin = 1)
+"""
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+from playwright import async_api
+
+BASE_URL = os.environ.get("E2E_BASE_URL", "http://localhost:3000").rstrip("/")
+STATE_DIR = Path(__file__).resolve().parent / ".auth"
+
+ROLE_EMAILS = {
+    "user": os.environ.get("E2E_USER_EMAIL", "demo1@example.com"),
+    "admin": os.environ.get("E2E_ADMIN_EMAIL"),
+}
+
+SESSION_COOKIES = ("next-auth.session-token", "__Secure-next-auth.session-token")
+# Re-login when the session has less than this left, so a run never starts on a dying cookie
+EXPIRY_MARGIN_SECONDS = 15 * 60
+
+# Same value the cookie banner stores after "Přijmout vše" (components/cookies/CookieConsent.tsx)
+CONSENT_COOKIE = {
+    "name": "cookie-consent",
+    "value": quote(json.dumps({"necessary": True, "analytics": True, "marketing": True}, separators=(",", ":"))),
+    "url": BASE_URL,
+}
+
+
+def state_path(role):
+    return STATE_DIR / f"{role}.json"
+
+
+def is_fresh(path):
+    """True if the saved state holds a session cookie that outlives the margin."""
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+
+    now = time.time()
+    for cookie in state.get("cookies", []):
+        if cookie.get("name") in SESSION_COOKIES:
+            expires = cookie.get("expires", -1)
+            return expires == -1 or expires - now > EXPIRY_MARGIN_SECONDS
+    return False
+
+
+async def login(browser, role):
+    email = ROLE_EMAILS.get(role)
+    secret = os.environ.get("E2E_LOGIN_SECRET")
+    if not email:
+        raise RuntimeError(f"No account configured for role '{role}' (set E2E_{role.upper()}_EMAIL)")
+    if not secret:
+        raise RuntimeError("E2E_LOGIN_SECRET is not set")
+
+    context = await browser.new_context()
+    try:
+        request = context.request
+        csrf = await (await request.get(f"{BASE_URL}/api/auth/csrf")).json()
+        await request.post(
+            f"{BASE_URL}/api/auth/callback/e2e",
+            form={"csrfToken": csrf["csrfToken"], "email": email, "secret": secret, "json": "true"},
+        )
+
+        session = await (await request.get(f"{BASE_URL}/api/auth/session")).json()
+        if not (session or {}).get("user"):
+            raise RuntimeError(f"NextAuth login failed for role '{role}' ({email})")
+        if role == "admin" and not session["user"].get("isAdmin"):
+            raise RuntimeError(f"{email} is not an admin")
+
+        await context.add_cookies([CONSENT_COOKIE])
+
+        path = state_path(role)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so parallel readers never see a half-written state
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        await context.storage_state(path=str(tmp_path))
+        os.replace(tmp_path, path)
+        return path
+    finally:
+        await context.close()
+
+
+async def storage_state(browser, role):
+    """Path to a fresh storage state for ``role``, logging in only if needed."""
+    path = state_path(role)
+    if is_fresh(path):
+        return str(path)
+    return str(await login(browser, role))
+
+
+async def ensure(roles, headless=True):
+    """Bootstrap states for several roles with one short-lived browser."""
+    stale = [role for role in roles if not is_fresh(state_path(role))]
+    if not stale:
+        return
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=headless)
+        try:
+            for role in stale:
+                await login(browser, role)
+        finally:
+            await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(ensure([role for role, email in ROLE_EMAILS.items() if email]))
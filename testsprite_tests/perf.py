@@ -0,0 +1,96 @@
+"""Page-load and Web Vitals measurements for the TestSprite Playwright suite.
+
+Collects, per route, navigation timing (TTFB, DOMContentLoaded, load), LCP,
+CLS, JavaScript bytes transferred and the number of /api/* calls, checks them
+against ``perf_budgets.json`` and writes the results as JSON.
+
+    await perf.install(context)                  # before the first page opens
+    metrics = await perf.measure(page, "/nabidka")
+    violations = perf.check(metrics, perf.load_budgets())
+"""
+import json
+import os
+from pathlib import Path
+
+import waits
+
+BASE_URL = os.environ.get("E2E_BASE_URL", "http://localhost:3000").rstrip("/")
+SUITE_DIR = Path(__file__).resolve().parent
+BUDGETS_PATH = SUITE_DIR / "perf_budgets.json"
+RESULTS_PATH = Path(os.environ.get("PERF_RESULTS_PATH", SUITE_DIR / "perf_results.json"))
+
+# Buffered observers pick up entries recorded before the script ran
+_OBSERVERS_JS = """
+(() => {
+  window.__perf = { lcp: 0, cls: 0 }
+  try {
+    new PerformanceObserver((list) => {
+      const entries = list.getEntries()
+      const last = entries[entries.length - 1]
+      if (last) window.__perf.lcp = last.renderTime || last.loadTime || last.startTime
+    }).observe({ type: 'largest-contentful-paint', buffered: true })
+    new PerformanceObserver((list) => {
+      for (const entry of list.getEntries()) {
+        if (!entry.hadRecentInput) window.__perf.cls += entry.value
+      }
+    }).observe({ type: 'layout-shift', buffered: true })
+  } catch (e) {}
+})()
+"""
+
+_COLLECT_JS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0] || {}
+  const resources = performance.getEntriesByType('resource')
+  const isScript = (e) => e.initiatorType === 'script' || /\\.m?js(\\?|$)/.test(e.name)
+  return {
+    ttfbMs: nav.responseStart || 0,
+    domContentLoadedMs: nav.domContentLoadedEventEnd || 0,
+    loadMs: nav.loadEventEnd || 0,
+    lcpMs: (window.__perf && window.__perf.lcp) || 0,
+    cls: (window.__perf && window.__perf.cls) || 0,
+    jsBytes: resources.filter(isScript).reduce((sum, e) => sum + (e.transferSize || e.encodedBodySize || 0), 0),
+    apiCalls: resources.filter((e) => new URL(e.name).pathname.startsWith('/api/')).length,
+  }
+}
+"""
+
+
+async def install(context):
+    await context.add_init_script(_OBSERVERS_JS)
+
+
+async def measure(page, path, route=None):
+    """Load ``path`` and return its metrics; ``route`` names the budget entry (defaults to path)."""
+    waits.track(page)
+    await page.goto(f"{BASE_URL}{path}", wait_until="load", timeout=30000)
+    # Client components (product grid, StatsSection) fetch after hydration
+    await waits.network_idle(page, idle_ms=500)
+    metrics = await page.evaluate(_COLLECT_JS)
+    metrics = {key: round(value, 4) if key == "cls" else round(value) for key, value in metrics.items()}
+    return {"route": route or path, "path": path, **metrics}
+
+
+def load_budgets(path=BUDGETS_PATH):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def budget_for(route, budgets):
+    return {**budgets.get("default", {}), **budgets.get("routes", {}).get(route, {})}
+
+
+def check(metrics, budgets):
+    """List human-readable budget violations for one route's metrics."""
+    violations = []
+    for metric, limit in budget_for(metrics["route"], budgets).items():
+        value = metrics.get(metric)
+        if value is not None and value > limit:
+            violations.append(f"{metrics['route']}: {metric} {value} > {limit}")
+    return violations
+
+
+def write_results(results, violations, path=RESULTS_PATH):
+    Path(path).write_text(
+        json.dumps({"results": results, "violations": violations}, indent=2, ensure_ascii=False),
+        encoding="utf-8",
+    )
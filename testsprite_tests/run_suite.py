@@ -0,0 +1,187 @@
+"""Parallel runner for the TestSprite Playwright suite.
+
+Each worker process starts Playwright once, launches a small pool of Chromium
+browsers and hands a fresh BrowserContext to every ``run_test()`` coroutine,
+so test cases no longer pay a cold browser launch each.
+
+Usage:
+    python run_suite.py                      # all TC*.py, one worker per CPU
+    python run_suite.py -w 8 -c 4            # 8 processes, 4 tests in flight each
+    python run_suite.py -k TC01 --json report.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from playwright import async_api
+
+import auth_state
+import waits
+
+SUITE_DIR = Path(__file__).resolve().parent
+
+# Same flags the generated scripts use, minus --single-process: a shared
+# browser serves many contexts at once and must keep its renderer processes.
+BROWSER_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+]
+
+
+def discover_tests(pattern=None):
+    tests = sorted(SUITE_DIR.glob("TC*.py"))
+    if pattern:
+        tests = [path for path in tests if pattern.lower() in path.name.lower()]
+    return tests
+
+
+def load_test(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def required_roles(tests):
+    # Authenticated scripts declare a module-level ROLE = "user" / "admin"
+    roles = set()
+    for path in tests:
+        match = re.search(r'^ROLE = "(\w+)"', path.read_text(encoding="utf-8"), re.MULTILINE)
+        if match:
+            roles.add(match.group(1))
+    return sorted(roles)
+
+
+async def run_one(path, browser, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        wait_log = waits.start_log()
+        context = None
+        try:
+            module = load_test(path)
+            context_options = {}
+            role = getattr(module, "ROLE", None)
+            if role:
+                # Bootstrapped by main() before the workers start
+                context_options["storage_state"] = str(auth_state.state_path(role))
+            context = await browser.new_context(**context_options)
+            await module.run_test(context)
+            status, error = "passed", None
+        except AssertionError as exc:
+            status, error = "failed", str(exc)
+        except Exception as exc:
+            status, error = "error", "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        finally:
+            if context:
+                try:
+                    await context.close()
+                except async_api.Error:
+                    pass
+        return {
+            "test": path.stem,
+            "status": status,
+            "seconds": round(time.perf_counter() - started, 3),
+            "error": error,
+            "waits": waits.summarize(wait_log),
+        }
+
+
+async def run_worker_async(paths, concurrency, browsers, headless):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with async_api.async_playwright() as pw:
+        pool = [
+            await pw.chromium.launch(headless=headless, args=BROWSER_ARGS)
+            for _ in range(max(1, min(browsers, len(paths))))
+        ]
+        try:
+            # Round-robin tests over the browser pool
+            results = await asyncio.gather(*[
+                run_one(path, pool[index % len(pool)], semaphore)
+                for index, path in enumerate(paths)
+            ])
+        finally:
+            for browser in pool:
+                await browser.close()
+    return list(results)
+
+
+def run_worker(paths, concurrency, browsers, headless):
+    # Scripts may import sibling helper modules by bare name
+    if str(SUITE_DIR) not in sys.path:
+        sys.path.insert(0, str(SUITE_DIR))
+    return asyncio.run(run_worker_async([Path(p) for p in paths], concurrency, browsers, headless))
+
+
+def print_report(results, wall_seconds):
+    width = max((len(r["test"]) for r in results), default=10)
+    for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        print(f"{result['test']:<{width}}  {result['status']:<6}  {result['seconds']:>8.2f}s"
+              f"  (waits {result['waits']['count']} / {result['waits']['seconds']:.2f}s)")
+        if result["error"]:
+            print(f"{'':<{width}}    {result['error'].splitlines()[0]}")
+
+    passed = sum(1 for r in results if r["status"] == "passed")
+    serial = sum(r["seconds"] for r in results)
+    waited = sum(r["waits"]["seconds"] for r in results)
+    print()
+    print(f"{passed}/{len(results)} passed in {wall_seconds:.2f}s wall "
+          f"({serial:.2f}s summed test time, {serial / wall_seconds if wall_seconds else 0:.1f}x, "
+          f"{waited:.2f}s of it waiting on the app)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("-c", "--concurrency", type=int, default=2,
+                        help="tests running at once inside each worker (default: 2)")
+    parser.add_argument("-b", "--browsers", type=int, default=1,
+                        help="browsers launched per worker (default: 1)")
+    parser.add_argument("-k", dest="pattern", help="only run tests whose file name contains this text")
+    parser.add_argument("--headed", action="store_true", help="show browser windows")
+    parser.add_argument("--json", dest="json_path", help="write per-test results to this file")
+    args = parser.parse_args(argv)
+
+    tests = discover_tests(args.pattern)
+    if not tests:
+        print("No tests matched.")
+        return 1
+
+    # Log in once per role up front; workers only read the saved storage state
+    asyncio.run(auth_state.ensure(required_roles(tests), headless=not args.headed))
+
+    workers = max(1, min(args.workers, len(tests)))
+    # Interleave so slow and fast cases spread evenly over the workers
+    shards = [[str(p) for p in tests[i::workers]] for i in range(workers)]
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_worker, shard, max(1, args.concurrency), args.browsers, not args.headed)
+            for shard in shards
+        ]
+        for future in futures:
+            results.extend(future.result())
+    wall_seconds = time.perf_counter() - started
+
+    print_report(results, wall_seconds)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump({"wallSeconds": round(wall_seconds, 3), "results": results}, handle, indent=2)
+
+    return 0 if all(r["status"] == "passed" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
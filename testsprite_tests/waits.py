@@ -0,0 +1,131 @@
+"""Event-driven waits for the TestSprite Playwright scripts.
+
+Replaces the fixed ``page.wait_for_timeout(3000)`` / ``asyncio.sleep(n)`` pauses
+with waits on concrete signals, and records how long each one actually took:
+
+    waits.track(page)                  # right after context.new_page()
+    await waits.ready(elem)            # locator is visible and enabled
+    await waits.network_idle(page)     # no /api/* request in flight
+    await waits.dom_settled(page)      # no DOM mutation for a short quiet period
+
+Timings go to a per-task log (see ``start_log``), so tests running concurrently
+inside one run_suite.py worker do not mix their numbers.
+"""
+import asyncio
+import time
+import weakref
+from contextvars import ContextVar
+
+from playwright import async_api
+from playwright.async_api import expect
+
+API_PREFIX = "/api/"
+
+_log = ContextVar("waits_log", default=None)
+_trackers = weakref.WeakKeyDictionary()
+
+
+def start_log():
+    """Start a fresh wait log for the current task and return it."""
+    log = []
+    _log.set(log)
+    return log
+
+
+def current_log():
+    log = _log.get()
+    return log if log is not None else start_log()
+
+
+def summarize(log):
+    total = sum(entry["seconds"] for entry in log)
+    return {"count": len(log), "seconds": round(total, 3), "slowest": sorted(log, key=lambda e: e["seconds"])[-3:][::-1]}
+
+
+def _record(kind, label, started):
+    current_log().append({"kind": kind, "label": label, "seconds": round(time.perf_counter() - started, 3)})
+
+
+class _ApiTracker:
+    def __init__(self, page, url_part):
+        self.url_part = url_part
+        self.inflight = set()
+        self.changed = asyncio.Event()
+        page.on("request", self._started)
+        page.on("requestfinished", self._finished)
+        page.on("requestfailed", self._finished)
+
+    def _started(self, request):
+        if self.url_part in request.url:
+            self.inflight.add(request)
+            self.changed.set()
+
+    def _finished(self, request):
+        if request in self.inflight:
+            self.inflight.discard(request)
+            self.changed.set()
+
+
+def track(page, url_part=API_PREFIX):
+    """Start counting in-flight requests whose URL contains ``url_part``."""
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _trackers[page] = _ApiTracker(page, url_part)
+    return tracker
+
+
+async def ready(locator, timeout=5000):
+    """Wait until the locator is visible and enabled, i.e. clickable/fillable."""
+    started = time.perf_counter()
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+        await expect(locator).to_be_enabled(timeout=timeout)
+    finally:
+        _record("ready", str(locator), started)
+
+
+async def network_idle(page, idle_ms=250, timeout=10000):
+    """Wait until no tracked /api/* request has been in flight for ``idle_ms``.
+
+    Gives up silently after ``timeout`` so long-polling endpoints cannot hang a test.
+    """
+    tracker = track(page)
+    started = time.perf_counter()
+    deadline = started + timeout / 1000
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            tracker.changed.clear()
+            wait_for = idle_ms / 1000 if not tracker.inflight else remaining
+            try:
+                await asyncio.wait_for(tracker.changed.wait(), timeout=min(wait_for, remaining))
+            except asyncio.TimeoutError:
+                if not tracker.inflight:
+                    return
+    finally:
+        _record("network_idle", page.url, started)
+
+
+_DOM_SETTLED_JS = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+  const done = () => { observer.disconnect(); clearTimeout(quiet); clearTimeout(deadline); resolve() }
+  const observer = new MutationObserver(() => { clearTimeout(quiet); quiet = setTimeout(done, quietMs) })
+  let quiet = setTimeout(done, quietMs)
+  const deadline = setTimeout(done, timeoutMs)
+  observer.observe(document.documentElement, { subtree: true, childList: true, attributes: true, characterData: true })
+})
+"""
+
+
+async def dom_settled(page, quiet_ms=150, timeout=5000):
+    """Wait until the DOM has not mutated for ``quiet_ms`` (or ``timeout`` passes)."""
+    started = time.perf_counter()
+    try:
+        await page.evaluate(_DOM_SETTLED_JS, [quiet_ms, timeout])
+    except async_api.Error:
+        # Navigation destroyed the execution context - the new document is what we wait on next
+        pass
+    finally:
+        _record("dom_settled", page.url, started)